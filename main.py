@@ -1,18 +1,64 @@
 """CLI entry point for the systems-theory-task pipeline.
 
-Minimal runner that will be extended as pipeline components are implemented.
+`--action run` executes the stage DAG in src/pipeline.py (load -> select ->
+explode -> preprocess -> metrics -> models -> report), reusing cached stage
+outputs whose inputs and parameters are unchanged; `--action status` shows
+which stages are cached for the current configuration. `--trace trace.json`
+records wall/CPU time, peak RSS and row counts per stage and per instrumented
+function (src/instrumentation.py); `--profile cprofile|pyinstrument` also
+profiles each pipeline stage.
 """
 import argparse
+from contextlib import nullcontext
+from pathlib import Path
+
+from src import instrumentation, pipeline
 
 
 def main():
     parser = argparse.ArgumentParser(description="Run systems theory pipeline")
     parser.add_argument("--action", choices=["run", "status"], default="status")
+    parser.add_argument("--config", type=Path, default=Path("config/params.yaml"))
+    parser.add_argument(
+        "--stages",
+        nargs="+",
+        choices=pipeline.STAGE_NAMES,
+        help="Target stages (their upstream stages run as needed); default: all",
+    )
+    parser.add_argument(
+        "--force",
+        nargs="*",
+        default=[],
+        choices=[*pipeline.STAGE_NAMES, "all"],
+        help="Recompute these stages even when cached",
+    )
+    parser.add_argument("--trace", type=Path, help="Write a JSON timing/memory trace of the run")
+    parser.add_argument(
+        "--profile",
+        choices=instrumentation.PROFILERS,
+        help="Profile each pipeline stage (requires --trace; files go to <trace dir>/profiles)",
+    )
     args = parser.parse_args()
+    if args.profile and not args.trace:
+        parser.error("--profile requires --trace")
+    config = pipeline.load_config(args.config)
     if args.action == "status":
-        print("Pipeline scaffold is ready. Use --action run when pipeline components are implemented.")
+        for name, state in pipeline.pipeline_status(config).items():
+            print(f"{name:<11} {state}")
     else:
-        print("Running pipeline (not yet implemented).")
+        traced = (
+            instrumentation.tracing(args.trace, profile=args.profile)
+            if args.trace
+            else nullcontext()
+        )
+        with traced:
+            result = pipeline.run_pipeline(config, targets=args.stages, force=args.force)
+        ran = [name for name, state in result["status"].items() if state != "cached"]
+        print(f"Pipeline finished: {len(ran)} stage(s) ran, {len(result['status']) - len(ran)} cached.")
+        if args.trace:
+            print(f"Trace written to {args.trace}; slowest spans:")
+            for agg in instrumentation.summarize(args.trace)[:5]:
+                print(f"  {agg['name']:<40} {agg['wall_s']:8.2f}s wall {agg['cpu_s']:8.2f}s cpu ({agg['calls']} calls)")
 
 
 if __name__ == "__main__":
@@ -7,13 +7,17 @@ Outputs:
 - docs/reports/figures/ilin_structural_diagram.(pdf|png)
 - docs/reports/figures/task3_*.png
 
+Figures whose inputs are unchanged since the last export are skipped (see
+src/figure_export.py); pass --force to re-render everything.
+
 Run:
   conda activate tsi
-  python scripts/export_ilin_report_figures.py
+  python scripts/export_ilin_report_figures.py [--force]
 """
 
 from __future__ import annotations
 
+from contextlib import contextmanager
 from pathlib import Path
 import sys
 
@@ -24,113 +28,79 @@ if str(ROOT) not in sys.path:
 
 import pandas as pd
 
-from src import chaos_metrics, preprocessing, visualization
+from src import figure_export, metrics_bundle, visualization
 
 FIG_DIR = ROOT / "docs" / "reports" / "figures"
 TMP_DIR = ROOT / "docs" / "reports" / "tmp"
 DATA_PATH = ROOT / "data" / "golden_sample.parquet"
 
 
-def export_structural_diagram() -> None:
+@contextmanager
+def _session(exporter: figure_export.FigureExporter | None):
+    """Use the caller's exporter, or export immediately through a private one."""
+    if exporter is not None:
+        yield exporter
+        return
+    with figure_export.FigureExporter(FIG_DIR) as own:
+        yield own
+        own.export()
+
+
+def export_structural_diagram(exporter: figure_export.FigureExporter | None = None) -> None:
     """Convert the draw.io structural diagram SVG into PDF and PNG."""
     svg_path = TMP_DIR / "ilin_st_structural_diagram.drawio.svg"
     if not svg_path.exists():
         raise FileNotFoundError(f"Structural diagram SVG not found: {svg_path}")
+    with _session(exporter) as exp:
+        exp.add_svg("ilin_structural_diagram", svg_path, formats=("pdf", "png"), dpi=300)
 
-    FIG_DIR.mkdir(parents=True, exist_ok=True)
-    out_pdf = FIG_DIR / "ilin_structural_diagram.pdf"
-    out_png = FIG_DIR / "ilin_structural_diagram.png"
 
-    # Prefer librsvg CLI conversion for draw.io SVGs (more robust than cairosvg).
-    try:
-        import subprocess
-
-        subprocess.run(
-            ["rsvg-convert", "-f", "pdf", "-o", str(out_pdf), str(svg_path)],
-            check=True,
-        )
-        subprocess.run(
-            [
-                "rsvg-convert",
-                "-f",
-                "png",
-                "--dpi-x",
-                "300",
-                "--dpi-y",
-                "300",
-                "-o",
-                str(out_png),
-                str(svg_path),
-            ],
-            check=True,
-        )
-        return
-    except Exception:
-        # Fallback to cairosvg if rsvg-convert is unavailable.
-        pass
-
-    try:
-        import cairosvg  # type: ignore
-    except Exception as exc:  # pragma: no cover
-        raise RuntimeError(
-            "Failed to convert structural diagram via rsvg-convert, and cairosvg is unavailable. "
-            "Install librsvg (brew install librsvg) or install cairosvg + cairo."
-        ) from exc
-
-    cairosvg.svg2pdf(url=str(svg_path), write_to=str(out_pdf))
-    cairosvg.svg2png(url=str(svg_path), write_to=str(out_png), dpi=300)
-
-
-def export_task3_figures(start_hour: int = 8, end_hour: int = 22) -> None:
-    """Export Task 3 plots as static PNGs using Plotly+kaleido."""
+def load_task3_inputs(start_hour: int = 8, end_hour: int = 22) -> tuple[pd.DataFrame, dict]:
+    """Daytime golden sample and its shared metrics bundle (computed at most once)."""
     if not DATA_PATH.exists():
         raise FileNotFoundError(
             f"Golden sample parquet not found: {DATA_PATH}. "
-            "Run: python src/data_loader.py"
+            "Run: python -m src.data_loader"
         )
+    return metrics_bundle.daytime_bundle(pd.read_parquet(DATA_PATH), start_hour, end_hour)
 
-    FIG_DIR.mkdir(parents=True, exist_ok=True)
 
-    df = pd.read_parquet(DATA_PATH)
-    if "dt" not in df.columns:
-        raise KeyError("dt column is required in golden sample")
-    df = df.copy()
-    df["dt"] = pd.to_datetime(df["dt"])
-    if "hour_index" not in df.columns:
-        df["hour_index"] = df["dt"].dt.hour
-
-    df_day = preprocessing.filter_daytime_hours(df, "hour_index", start=start_hour, end=end_hour)
+def export_task3_figures(
+    start_hour: int = 8,
+    end_hour: int = 22,
+    inputs: tuple[pd.DataFrame, dict] | None = None,
+    exporter: figure_export.FigureExporter | None = None,
+) -> None:
+    """Export Task 3 plots as static PNGs using Plotly+kaleido."""
+    df_day, bundle = inputs if inputs is not None else load_task3_inputs(start_hour, end_hour)
     hourly_series = df_day["sales"].to_numpy()
 
-    hurst_res = chaos_metrics.hurst_rs_details(hourly_series)
-    d2_res = chaos_metrics.correlation_dimension_details(hourly_series)
-
-    fig_ts = visualization.plot_time_series_with_stockouts(
-        df_day, time_col="dt", sales_col="sales", stockout_col="is_stockout"
-    )
-    fig_phase = visualization.plot_phase_portrait(hourly_series, delay=1)
-    fig_hurst = visualization.plot_hurst_fit(hurst_res) if hurst_res.get("valid") else None
-    fig_d2 = visualization.plot_correlation_dim(d2_res) if d2_res.get("valid") else None
+    hurst_res = bundle["hurst"]
+    d2_res = bundle["d2"]
+    spectral_res = bundle["spectral"]
 
-    # Plotly static export uses kaleido.
-    fig_ts.write_image(FIG_DIR / "task3_time_series.png", scale=2)
-    fig_phase.write_image(FIG_DIR / "task3_phase_portrait.png", scale=2)
-
-    if fig_hurst is not None:
-        fig_hurst.write_image(FIG_DIR / "task3_hurst_rs.png", scale=2)
-
-    if fig_d2 is not None:
-        fig_d2.write_image(FIG_DIR / "task3_correlation_dimension.png", scale=2)
+    with _session(exporter) as exp:
+        exp.add(
+            "task3_time_series",
+            visualization.plot_time_series_with_stockouts(
+                df_day, time_col="dt", sales_col="sales", stockout_col="is_stockout"
+            ),
+        )
+        exp.add("task3_phase_portrait", visualization.plot_phase_portrait(hourly_series, delay=1))
+        if hurst_res.get("valid"):
+            exp.add("task3_hurst_rs", visualization.plot_hurst_fit(hurst_res))
+        if spectral_res.get("valid"):
+            exp.add("task3_power_spectrum", visualization.plot_power_spectrum(spectral_res))
+        if d2_res.get("valid"):
+            exp.add("task3_correlation_dimension", visualization.plot_correlation_dim(d2_res))
 
 
-def export_task2_phase_portrait() -> None:
+def export_task2_phase_portrait(exporter: figure_export.FigureExporter | None = None) -> None:
     """Export Task 2 nonlinear model phase portrait with nullclines."""
     import yaml
 
     from src import nonlinear_model, visualization
 
-    FIG_DIR.mkdir(parents=True, exist_ok=True)
-
     config_path = ROOT / "config" / "params.yaml"
     with open(config_path, "r", encoding="utf-8") as f:
         config = yaml.safe_load(f) or {}
@@ -146,37 +116,36 @@ def export_task2_phase_portrait() -> None:
         r_range=(eq[1] - r_span, eq[1] + r_span),
         grid_size=15,
     )
-    fig.write_image(FIG_DIR / "task2_phase_portrait_nullclines.png", scale=2)
+    with _session(exporter) as exp:
+        exp.add("task2_phase_portrait_nullclines", fig)
 
 
-def export_task3_saturation() -> None:
+def export_task3_saturation(
+    inputs: tuple[pd.DataFrame, dict] | None = None,
+    exporter: figure_export.FigureExporter | None = None,
+) -> None:
     """Export Task 3 correlation dimension saturation plot."""
-    if not DATA_PATH.exists():
-        raise FileNotFoundError(f"Golden sample parquet not found: {DATA_PATH}")
-
-    FIG_DIR.mkdir(parents=True, exist_ok=True)
-
-    df = pd.read_parquet(DATA_PATH)
-    df = df.copy()
-    df["dt"] = pd.to_datetime(df["dt"])
-    if "hour_index" not in df.columns:
-        df["hour_index"] = df["dt"].dt.hour
-
-    df_day = preprocessing.filter_daytime_hours(df, "hour_index", start=8, end=22)
-    hourly_series = df_day["sales"].to_numpy()
+    _, bundle = inputs if inputs is not None else load_task3_inputs()
 
-    d2_scan = chaos_metrics.correlation_dimension_scan(hourly_series)
+    d2_scan = bundle["d2_scan"]
     fig = visualization.plot_dimension_saturation(d2_scan["m"], d2_scan["d2"])
-    fig.write_image(FIG_DIR / "task3_dimension_saturation.png", scale=2)
+    with _session(exporter) as exp:
+        exp.add("task3_dimension_saturation", fig)
 
 
-def main() -> None:
-    export_structural_diagram()
-    export_task3_figures()
-    export_task2_phase_portrait()
-    export_task3_saturation()
-    print(f"Saved figures under: {FIG_DIR}")
+def main(force: bool = False) -> None:
+    task3_inputs = load_task3_inputs()
+    # One exporter session: all figures are queued, then the stale ones are
+    # rendered in a single kaleido batch while the SVG conversions run alongside.
+    with figure_export.FigureExporter(FIG_DIR) as exporter:
+        export_structural_diagram(exporter)
+        export_task3_figures(inputs=task3_inputs, exporter=exporter)
+        export_task2_phase_portrait(exporter)
+        export_task3_saturation(inputs=task3_inputs, exporter=exporter)
+        status = exporter.export(force=force)
+    exported = sum(state == "exported" for state in status.values())
+    print(f"Saved figures under: {FIG_DIR} ({exported} exported, {len(status) - exported} unchanged)")
 
 
 if __name__ == "__main__":
-    main()
+    main(force="--force" in sys.argv[1:])
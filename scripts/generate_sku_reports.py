@@ -0,0 +1,73 @@
+"""Generate per-SKU Task 3 chaos reports plus an index page.
+
+Input is a long hourly panel (store_id, product_id, dt, hour_index, sales,
+is_stockout) stored as a parquet file or a partitioned parquet directory.
+
+Outputs:
+- <out>/index.html
+- <out>/sku_<store>_<product>.html
+- <out>/assets/ (shared plotly.js and layout templates)
+- with --store DIR: per-SKU metric rows in a Parquet metric store (src/metric_store.py)
+
+Run:
+  conda activate tsi
+  python scripts/generate_sku_reports.py data/hourly_panel.parquet --out docs/reports/sku --n-jobs 8
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src import batch_reports, metric_store
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Batch per-SKU chaos reports")
+    parser.add_argument("data", type=Path, help="Hourly panel parquet file or partitioned directory")
+    parser.add_argument("--out", type=Path, default=ROOT / "docs" / "reports" / "sku")
+    parser.add_argument(
+        "--sku",
+        nargs=2,
+        action="append",
+        metavar=("STORE", "PRODUCT"),
+        help="Report only these SKUs (repeatable); default: all",
+    )
+    parser.add_argument("--n-jobs", type=int, default=None, help="Worker processes (default: all CPUs)")
+    parser.add_argument("--start-hour", type=int, default=8)
+    parser.add_argument("--end-hour", type=int, default=22)
+    parser.add_argument("--max-points", type=int, default=2000)
+    parser.add_argument(
+        "--store",
+        type=Path,
+        nargs="?",
+        const=metric_store.DEFAULT_STORE_DIR,
+        default=None,
+        help="Record metrics in a metric store (default dir: docs/reports/artifacts/metrics)",
+    )
+    args = parser.parse_args()
+
+    skus = [(int(s), int(p)) for s, p in args.sku] if args.sku else None
+    summary = batch_reports.generate_batch_reports(
+        args.data,
+        args.out,
+        skus=skus,
+        start_hour=args.start_hour,
+        end_hour=args.end_hour,
+        n_jobs=args.n_jobs,
+        max_points=args.max_points,
+        store_dir=args.store,
+    )
+    failed = summary["error"].notna().sum()
+    if failed:
+        print(f"{failed} SKU report(s) failed; see {args.out / 'index.html'}")
+
+
+if __name__ == "__main__":
+    main()
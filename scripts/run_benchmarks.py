@@ -0,0 +1,79 @@
+"""Run the performance benchmarks and compare them with a stored baseline.
+
+Results are appended to docs/reports/artifacts/benchmarks/history.jsonl;
+the baseline lives next to it in baseline.json.
+
+Run:
+  conda activate tsi
+  python scripts/run_benchmarks.py run --scale sku small            # record timings
+  python scripts/run_benchmarks.py run --scale sku --save-baseline  # accept as baseline
+  python scripts/run_benchmarks.py compare --threshold 1.25         # latest vs baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pandas as pd
+
+from src import benchmarks
+
+
+def _print_records(records: list[dict]) -> None:
+    table = pd.DataFrame(records)[["benchmark", "scale", "min_s", "median_s", "peak_mb"]]
+    print(table.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+
+
+def _report(result: pd.DataFrame) -> int:
+    if result.empty:
+        print("Nothing to compare: no results match the baseline.")
+        return 0
+    print(result.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    slow = result[result["regression"]]
+    for rec in slow.to_dict("records"):
+        print(
+            f"REGRESSION {rec['benchmark']}@{rec['scale']}: "
+            f"time x{rec['time_ratio']:.2f}, memory x{rec['memory_ratio']:.2f}"
+        )
+    return 1 if len(slow) else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks for the chaos, ODE and loader hot paths")
+    parser.add_argument("--history", type=Path, default=benchmarks.DEFAULT_HISTORY)
+    parser.add_argument("--baseline", type=Path, default=benchmarks.DEFAULT_BASELINE)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run benchmarks and append them to the history")
+    run.add_argument("--scale", nargs="+", default=["sku"], choices=list(benchmarks.SCALES))
+    run.add_argument("--only", nargs="+", choices=list(benchmarks.BENCHMARKS))
+    run.add_argument("--repeat", type=int, default=5)
+    run.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    run.add_argument("--compare", action="store_true", help="Compare these results with the baseline")
+    run.add_argument("--threshold", type=float, default=1.25)
+
+    cmp_ = sub.add_parser("compare", help="Compare the latest recorded results with the baseline")
+    cmp_.add_argument("--threshold", type=float, default=1.25)
+
+    args = parser.parse_args()
+    if args.command == "run":
+        records = benchmarks.run_benchmarks(args.scale, args.only, args.repeat, args.history)
+        _print_records(records)
+        if args.save_baseline:
+            print(f"Baseline saved to {benchmarks.save_baseline(records, args.baseline)}")
+        if args.compare:
+            return _report(benchmarks.compare(records, args.baseline, args.threshold))
+        return 0
+    records = benchmarks.latest_records(benchmarks.load_history(args.history))
+    return _report(benchmarks.compare(records, args.baseline, args.threshold))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,9 +6,33 @@ Minimal package metadata and exported names.
 __all__ = [
     "data_loader",
     "preprocessing",
+    "pipeline",
+    "pipeline_stages",
+    "stage_cache",
     "linear_model",
+    "state_space",
+    "frequency_analysis",
+    "control_analysis",
+    "acs_simulation",
+    "controller_tuning",
     "nonlinear_model",
+    "forcing",
+    "spoilage_model",
+    "calibration",
+    "stability_map",
     "chaos_metrics",
+    "metrics_bundle",
+    "result_cache",
+    "metric_store",
+    "downsampling",
+    "figure_export",
+    "html_report",
+    "batch_reports",
+    "benchmarks",
+    "benchmark_cases",
+    "instrumentation",
+    "entropy_metrics",
+    "spectral_analysis",
     "visualization",
 ]
 
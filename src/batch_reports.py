@@ -0,0 +1,202 @@
+"""Per-SKU batch mode of the Task 3 HTML report.
+
+`generate_batch_reports` renders one lightweight report per SKU of a long
+hourly panel plus an index page, sharing the plotly.js asset, the layout
+templates and the nonlinear phase portrait across the batch.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+import html
+import os
+from pathlib import Path
+import time
+from typing import Iterable, Sequence
+
+import pandas as pd
+
+from src import metric_store, metrics_bundle, report_generator
+from src.html_report import LightFigureRenderer, page_head, write_plotly_asset
+from src.instrumentation import instrument
+
+
+def _render_sku_report(job: tuple) -> dict:
+    """Worker: metrics bundle and compact figure markup for one SKU."""
+    key, frame, start_hour, end_hour, max_points, cache_dir = job
+    try:
+        df_day, metrics = metrics_bundle.daytime_bundle(frame, start_hour, end_hour, cache_dir=cache_dir)
+        renderer = LightFigureRenderer(max_points)
+        plots = {name: renderer(fig) for name, fig in report_generator.series_figures(df_day, metrics).items()}
+    except Exception as exc:  # keep the batch running; report the failure
+        return {"key": key, "error": str(exc)}
+    return {
+        "key": key,
+        "plots": plots,
+        "templates": renderer.templates,
+        "metrics": {name: metrics[name] for name in metrics_bundle.METRICS},
+        "n_hours": len(df_day),
+        "stockout_share": float(df_day["is_stockout"].mean()) if "is_stockout" in df_day else float("nan"),
+    }
+
+
+def _sku_label(group_cols: Sequence[str], key: tuple) -> str:
+    return ", ".join(f"{col}={value}" for col, value in zip(group_cols, key))
+
+
+def _index_page(head: str, group_cols: Sequence[str], summary: pd.DataFrame) -> str:
+    header = "".join(
+        f"<th>{html.escape(str(c))}</th>"
+        for c in [*group_cols, "hours", "H", "H_spec", "D2", "stockout share", "report"]
+    )
+    rows = []
+    for rec in summary.to_dict("records"):
+        if rec.get("error"):
+            link = f"<i>failed: {html.escape(str(rec['error']))}</i>"
+        else:
+            link = f'<a href="{html.escape(rec["report"])}">open</a>'
+        cells = [html.escape(str(rec[c])) for c in group_cols] + [
+            f"{rec['n_hours']:.0f}",
+            f"{rec['H']:.3f}",
+            f"{rec['H_spectral']:.3f}",
+            f"{rec['D2']:.3f}",
+            f"{rec['stockout_share']:.1%}",
+            link,
+        ]
+        rows.append("<tr>" + "".join(f"<td>{c}</td>" for c in cells) + "</tr>")
+    return head + f"""
+    <body>
+        <h1>Task 3: Chaos Analysis by SKU</h1>
+        <p>{len(summary)} SKU reports.</p>
+        <table><tr>{header}</tr>{"".join(rows)}</table>
+    </body>
+    </html>
+    """
+
+
+@instrument()
+def generate_batch_reports(
+    data: pd.DataFrame | Path,
+    output_dir: Path,
+    group_cols: Sequence[str] = ("store_id", "product_id"),
+    skus: Iterable[tuple] | None = None,
+    start_hour: int = 8,
+    end_hour: int = 22,
+    n_jobs: int | None = 1,
+    max_points: int = 2000,
+    cache_dir: Path | None = None,
+    store_dir: Path | None = None,
+    run_date: str | None = None,
+) -> pd.DataFrame:
+    """Generate one lightweight report per SKU plus an index page.
+
+    Metric bundles and figure serialization run per SKU (optionally in a
+    process pool). Everything shared is rendered once in the parent: the page
+    head, the plotly.js asset, the layout templates (written to one JS file)
+    and the model-only nonlinear phase portrait.
+
+    Args:
+        data: Long hourly panel (dt, hour_index, sales, is_stockout plus
+            group_cols) or a parquet file / partitioned parquet directory.
+        output_dir: Destination for index.html, the per-SKU pages and assets/.
+        group_cols: Columns identifying a SKU.
+        skus: Optional subset of group keys to report on.
+        start_hour: Daytime window start (inclusive).
+        end_hour: Daytime window end (inclusive).
+        n_jobs: Worker processes (1 = serial, None = all CPUs).
+        max_points: Point budget per trace.
+        cache_dir: Metrics bundle cache (default metrics_bundle.DEFAULT_CACHE_DIR).
+        store_dir: Also record every SKU's hurst, d2 and spectral results
+            (with diagnostic arrays) in a `metric_store.MetricStore` here.
+        run_date: Date the store rows are indexed by (default today).
+
+    Returns:
+        DataFrame with one row per SKU: keys, headline metrics and report file.
+    """
+    group_cols = list(group_cols)
+    wanted = None if skus is None else {k if isinstance(k, tuple) else (k,) for k in skus}
+    if not isinstance(data, pd.DataFrame):
+        filters = None
+        if wanted is not None:
+            # One "in" filter per key column: a superset of the wanted keys
+            # that the reader can push down; the groupby below keeps exact keys.
+            filters = [
+                (col, "in", sorted({k[i] for k in wanted}, key=str)) for i, col in enumerate(group_cols)
+            ]
+        data = pd.read_parquet(data, filters=filters)
+    missing = [c for c in [*group_cols, "dt", "sales"] if c not in data.columns]
+    if missing:
+        raise KeyError(f"Columns {missing} not found in DataFrame")
+
+    jobs = []
+    for key, g in data.groupby(group_cols, sort=True, observed=True):
+        key = key if isinstance(key, tuple) else (key,)
+        if wanted is None or key in wanted:
+            jobs.append((key, g.drop(columns=group_cols), start_hour, end_hour, max_points, cache_dir))
+    if n_jobs == 1:
+        results = [_render_sku_report(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            results = list(pool.map(_render_sku_report, jobs, chunksize=max(1, len(jobs) // 64)))
+
+    # Shared parts: rendered once for the whole batch.
+    output_dir = Path(output_dir)
+    asset_dir = output_dir / "assets"
+    shared = LightFigureRenderer(max_points)
+    phase_nl = shared(report_generator.phase_nl_figure())
+    for res in results:
+        shared.templates.update(res.get("templates", {}))
+    plotly_asset = write_plotly_asset(asset_dir)
+    templates_asset = shared.write_templates(asset_dir)
+    head = page_head(
+        "Systems Theory: Chaos Analysis Report",
+        shared.head(
+            os.path.relpath(plotly_asset, output_dir), os.path.relpath(templates_asset, output_dir)
+        ),
+    )
+
+    rows, records = [], []
+    run_date = run_date or time.strftime("%Y-%m-%d")
+    for res in results:
+        key = res["key"]
+        row = dict(zip(group_cols, key))
+        if "error" in res:
+            rows.append({**row, "error": res["error"]})
+            continue
+        metrics = res["metrics"]
+        name = "sku_" + "_".join(str(k) for k in key).replace(os.sep, "-") + ".html"
+        body = report_generator.report_body(
+            f"FreshRetailNet-50K ({_sku_label(group_cols, key)})",
+            start_hour,
+            end_hour,
+            metrics,
+            {**res["plots"], "phase_nl": phase_nl},
+        )
+        (output_dir / name).write_text(head + body, encoding="utf-8")
+        records += metric_store.bundle_records(
+            metrics,
+            metric_store.sku_label(key),
+            run_date,
+            params={"start_hour": start_hour, "end_hour": end_hour},
+            n_samples=res["n_hours"],
+        )
+        rows.append(
+            {
+                **row,
+                "n_hours": res["n_hours"],
+                "H": metrics["hurst"].get("H", float("nan")),
+                "H_spectral": metrics["spectral"].get("H", float("nan")),
+                "D2": metrics["d2"].get("D2", float("nan")),
+                "stockout_share": res["stockout_share"],
+                "report": name,
+                "error": None,
+            }
+        )
+    summary = pd.DataFrame(
+        rows,
+        columns=[*group_cols, "n_hours", "H", "H_spectral", "D2", "stockout_share", "report", "error"],
+    )
+    (output_dir / "index.html").write_text(_index_page(head, group_cols, summary), encoding="utf-8")
+    if store_dir is not None:
+        metric_store.MetricStore(store_dir).append(records)
+    print(f"Saved {summary['report'].notna().sum()} SKU reports under: {output_dir.resolve()}")
+    return summary
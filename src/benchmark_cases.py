@@ -0,0 +1,109 @@
+"""Synthetic inputs and the benchmark cases measured by `benchmarks`.
+
+`synthetic_daily_panel` builds daily rows in the FreshRetailNet-50K layout
+and `synthetic_hourly_series` an hourly sales series; both are seeded, so
+every run of a case sees the same data. Each case pairs an untimed setup
+(inputs sized by a named scale) with the call being measured.
+
+Scales run from one SKU ("sku") to the size of FreshRetailNet-50K ("full",
+50,000 SKUs x 90 days).
+"""
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+from src import chaos_metrics, data_loader, nonlinear_model
+
+# Number of SKUs per scale; every SKU has N_DAYS days (24 hourly values each).
+SCALES = {"sku": 1, "small": 100, "medium": 5_000, "full": 50_000}
+N_DAYS = 90
+ODE_PARAMS = {
+    "inventory_decay_rate": 0.01,
+    "temperature_sensitivity": 0.001,
+    "temperature": 20.0,
+    "demand": 10.0,
+    "replenishment_gain": 1.0,
+    "replenishment_decay": 0.5,
+    "i_target": 100.0,
+}
+
+
+def synthetic_daily_panel(n_skus: int, n_days: int = N_DAYS, seed: int = 0) -> pd.DataFrame:
+    """Daily rows in the FreshRetailNet-50K layout (24-hour list columns).
+
+    Sales are Poisson with a daytime peak and a per-SKU level.
+    hours_stock_status is 0 for a random ~8% of hours (the hours that
+    find_golden_sample_vectorized counts as stockouts), so every SKU passes
+    its candidate filter.
+    """
+    rng = np.random.default_rng(seed)
+    n_rows = n_skus * n_days
+    profile = 1.0 + np.sin(np.linspace(-np.pi / 2, 3 * np.pi / 2, 24)) * 0.8
+    level = np.repeat(rng.gamma(2.0, 1.5, n_skus), n_days)
+    sales = rng.poisson(level[:, None] * profile[None, :]).astype(float)
+    stock = (rng.random((n_rows, 24)) >= 0.08).astype(np.int64)
+    sku = np.repeat(np.arange(n_skus), n_days)
+    days = pd.date_range("2024-03-01", periods=n_days, freq="D").strftime("%Y-%m-%d").to_numpy()
+    return pd.DataFrame(
+        {
+            "store_id": sku // 100,
+            "product_id": sku % 100,
+            "dt": np.tile(days, n_skus),
+            "hours_sale": list(sales),
+            "hours_stock_status": list(stock),
+            "discount": rng.uniform(0.0, 0.3, n_rows),
+            "avg_temperature": rng.normal(20.0, 5.0, n_rows),
+        }
+    )
+
+
+def synthetic_hourly_series(n_hours: int, seed: int = 0) -> np.ndarray:
+    """Hourly sales with a daily cycle, AR(1) level drift and Poisson noise."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_hours)
+    drift = lfilter([1.0], [1.0, -0.98], rng.normal(0.0, 0.05, n_hours))
+    rate = np.exp(1.5 + 0.6 * np.sin(2 * np.pi * t / 24) + drift)
+    return rng.poisson(rate).astype(float)
+
+
+def _hours(scale: str) -> int:
+    return SCALES[scale] * N_DAYS * 24
+
+
+def _setup_series(scale: str) -> Tuple[Any, ...]:
+    return (synthetic_hourly_series(_hours(scale)),)
+
+
+def _setup_ode(scale: str) -> Tuple[Any, ...]:
+    t = np.linspace(0.0, float(_hours(scale)), _hours(scale))
+    return (np.array([100.0, 10.0]), t, ODE_PARAMS)
+
+
+def _setup_panel(scale: str) -> Tuple[Any, ...]:
+    return (synthetic_daily_panel(SCALES[scale]),)
+
+
+def _run_corr_dim(series: np.ndarray) -> Any:
+    return chaos_metrics._corr_dim_gp_details(series, emb_dim=5, delay=1, num_radii=20, use_sklearn=False)
+
+
+def _run_explode(df: pd.DataFrame) -> Any:
+    # Times the explode and the parquet write together, as in the select stage.
+    with tempfile.TemporaryDirectory() as tmp:
+        data_loader.explode_and_save(df, 0, 0, Path(tmp) / "sample.parquet")
+
+
+# name -> (setup(scale) -> args, function(*args)); setup is not timed.
+BENCHMARKS: Dict[str, Tuple[Callable[[str], Tuple[Any, ...]], Callable[..., Any]]] = {
+    "hurst_rs_details": (_setup_series, chaos_metrics.hurst_rs_details),
+    "corr_dim_gp_details": (_setup_series, _run_corr_dim),
+    "integrate_inventory_system": (_setup_ode, nonlinear_model.integrate_inventory_system),
+    "explode_and_save": (_setup_panel, _run_explode),
+    "find_golden_sample_vectorized": (_setup_panel, data_loader.find_golden_sample_vectorized),
+}
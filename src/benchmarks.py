@@ -0,0 +1,216 @@
+"""Performance benchmarks for the chaos, ODE and loader hot paths.
+
+The cases and their synthetic inputs are defined in `benchmark_cases`.
+`run_benchmarks` times every case `repeat` times, then runs it once more
+under tracemalloc for the peak memory of Python and NumPy allocations. Each
+result is appended as one JSON line to a history file. `compare` checks
+results against a stored baseline and flags any case whose median time or
+peak memory grew by more than a threshold.
+"""
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.benchmark_cases import BENCHMARKS, SCALES
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_HISTORY = ROOT / "docs" / "reports" / "artifacts" / "benchmarks" / "history.jsonl"
+DEFAULT_BASELINE = ROOT / "docs" / "reports" / "artifacts" / "benchmarks" / "baseline.json"
+
+def _quiet(func: Callable[..., Any], args: Tuple[Any, ...]) -> None:
+    """Call func with stdout/stderr (prints, tqdm bars) discarded."""
+    sink = io.StringIO()
+    with contextlib.redirect_stdout(sink), contextlib.redirect_stderr(sink):
+        func(*args)
+
+
+def _environment() -> Dict[str, str]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except Exception:
+        commit = "unknown"
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": f"{platform.system()}-{platform.machine()}-{os.cpu_count()}cpu",
+    }
+
+
+def measure(
+    setup: Callable[[str], Tuple[Any, ...]],
+    func: Callable[..., Any],
+    scale: str,
+    repeat: int = 5,
+) -> Dict[str, float]:
+    """Time `func(*setup(scale))` and record its peak traced memory.
+
+    Every timed run gets fresh arguments, because some hot paths add columns
+    to their input frame. peak_mb is the traced peak above what setup left
+    allocated (the peak is reset after setup), so it covers the call's
+    working memory and its output, e.g. the exploded frame, but not the
+    inputs.
+
+    Returns:
+        Dict with min_s, median_s and peak_mb.
+    """
+    times = []
+    for _ in range(repeat):
+        args = setup(scale)
+        start = time.perf_counter()
+        _quiet(func, args)
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        args = setup(scale)
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        _quiet(func, args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"min_s": min(times), "median_s": statistics.median(times), "peak_mb": (peak - base) / 2**20}
+
+
+def run_benchmarks(
+    scales: Sequence[str] = ("sku",),
+    names: Iterable[str] | None = None,
+    repeat: int = 5,
+    history_path: Path | None = DEFAULT_HISTORY,
+) -> List[Dict[str, Any]]:
+    """Run the selected benchmarks at each scale and append them to the history.
+
+    Args:
+        scales: Keys of SCALES.
+        names: Keys of BENCHMARKS (default: all).
+        repeat: Timed runs per case.
+        history_path: JSON-lines history file (None = do not record).
+
+    Returns:
+        One record per (benchmark, scale).
+    """
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        raise KeyError(f"Unknown scales {unknown}; choose from {list(SCALES)}")
+    names = list(names or BENCHMARKS)
+    env = _environment()
+    stamp = time.strftime("%Y-%m-%dT%H:%M:%S")
+    records = []
+    for scale in scales:
+        for name in names:
+            setup, func = BENCHMARKS[name]
+            records.append(
+                {
+                    "timestamp": stamp,
+                    "benchmark": name,
+                    "scale": scale,
+                    "n_skus": SCALES[scale],
+                    "repeat": repeat,
+                    **measure(setup, func, scale, repeat),
+                    **env,
+                }
+            )
+    if history_path is not None:
+        history_path = Path(history_path)
+        history_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(history_path, "a", encoding="utf-8") as f:
+            for rec in records:
+                f.write(json.dumps(rec) + "\n")
+    return records
+
+
+def load_history(history_path: Path = DEFAULT_HISTORY) -> pd.DataFrame:
+    """All recorded runs as a DataFrame (empty if no history exists)."""
+    path = Path(history_path)
+    if not path.exists():
+        return pd.DataFrame()
+    return pd.read_json(path, lines=True)
+
+
+def latest_records(history: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Most recent record per (benchmark, scale) from a history frame."""
+    if history.empty:
+        return []
+    last = history.groupby(["benchmark", "scale"], sort=True).tail(1)
+    return last.to_dict("records")
+
+
+def save_baseline(records: Sequence[Dict[str, Any]], baseline_path: Path = DEFAULT_BASELINE) -> Path:
+    """Store records as the baseline, keyed by "benchmark@scale"."""
+    path = Path(baseline_path)
+    baseline = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+    for rec in records:
+        baseline[f"{rec['benchmark']}@{rec['scale']}"] = rec
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(baseline, indent=2, sort_keys=True, default=str), encoding="utf-8")
+    return path
+
+
+def compare(
+    records: Sequence[Dict[str, Any]],
+    baseline_path: Path = DEFAULT_BASELINE,
+    threshold: float = 1.25,
+    min_delta_s: float = 0.005,
+) -> pd.DataFrame:
+    """Compare records with the baseline.
+
+    Args:
+        records: Current results (e.g. from run_benchmarks or latest_records).
+        baseline_path: Baseline written by save_baseline.
+        threshold: Ratio of current to baseline median time (or peak memory)
+            above which a case is flagged.
+        min_delta_s: Absolute slowdown below which timing noise on very fast
+            cases is not flagged.
+
+    Returns:
+        DataFrame with benchmark, scale, baseline and current medians, time and
+        memory ratios, and a boolean `regression` column.
+    """
+    path = Path(baseline_path)
+    if not path.exists():
+        raise FileNotFoundError(f"No benchmark baseline at {path}; run with --save-baseline first")
+    baseline = json.loads(path.read_text(encoding="utf-8"))
+    rows = []
+    for rec in records:
+        base = baseline.get(f"{rec['benchmark']}@{rec['scale']}")
+        if base is None:
+            continue
+        time_ratio = rec["median_s"] / max(base["median_s"], 1e-12)
+        mem_ratio = rec["peak_mb"] / max(base["peak_mb"], 1e-6)
+        rows.append(
+            {
+                "benchmark": rec["benchmark"],
+                "scale": rec["scale"],
+                "baseline_s": base["median_s"],
+                "current_s": rec["median_s"],
+                "time_ratio": time_ratio,
+                "baseline_mb": base["peak_mb"],
+                "current_mb": rec["peak_mb"],
+                "memory_ratio": mem_ratio,
+                "regression": bool(
+                    (time_ratio > threshold and rec["median_s"] - base["median_s"] > min_delta_s)
+                    or mem_ratio > threshold
+                ),
+            }
+        )
+    return pd.DataFrame(rows)
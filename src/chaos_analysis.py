@@ -11,13 +11,17 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from src import chaos_metrics, preprocessing
+from src import chaos_metrics, metric_store, preprocessing, result_cache
+
+SOURCE = "baseline"
+PARAMS = {"estimator": "compute_chaos_metrics", "k": 10}
 
 
 def analyze_golden_sample(
     data_path: Path,
     start_hour: int = 8,
     end_hour: int = 22,
+    use_cache: bool = True,
 ) -> dict[str, Any]:
     """Compute chaos metrics for daytime and daily aggregated series.
 
@@ -25,6 +29,7 @@ def analyze_golden_sample(
         data_path: Path to data/golden_sample.parquet.
         start_hour: Daytime window start (inclusive).
         end_hour: Daytime window end (inclusive).
+        use_cache: Reuse results from the shared `result_cache`.
 
     Returns:
         Dictionary with metrics and series lengths.
@@ -45,9 +50,11 @@ def analyze_golden_sample(
     daily = preprocessing.aggregate_daily(df_day, dt_col="dt", value_col="sales", agg="sum")
     daily_series = daily["sales"].to_numpy()
 
+    compute = result_cache.call if use_cache else (lambda func, *args, **kwargs: func(*args, **kwargs))
     return {
-        "daytime_hourly": chaos_metrics.compute_chaos_metrics(hourly_series),
-        "daytime_daily": chaos_metrics.compute_chaos_metrics(daily_series),
+        "daytime_hourly": compute(chaos_metrics.compute_chaos_metrics, hourly_series),
+        "daytime_daily": compute(chaos_metrics.compute_chaos_metrics, daily_series),
+        "sku": metric_store.frame_sku(df),
         "n_hourly": int(len(hourly_series)),
         "n_daily": int(len(daily_series)),
         "start_hour": int(start_hour),
@@ -75,12 +82,23 @@ def save_analysis(analysis: dict[str, Any], output_path: Path) -> None:
     output_path.write_text("\n".join(lines))
 
 
+def record_analysis(
+    analysis: dict[str, Any],
+    date: str,
+    store: metric_store.MetricStore | None = None,
+) -> Path | None:
+    """Append the analysis to the structured metric store (one row per metric)."""
+    store = store or metric_store.MetricStore()
+    return store.append(metric_store.analysis_records(analysis, SOURCE, date, PARAMS))
+
+
 def main() -> None:
     data_path = Path("data/golden_sample.parquet")
     artifact_path = Path("docs/reports/artifacts/2026-02-01/chaos_metrics_analysis.txt")
     analysis = analyze_golden_sample(data_path)
     save_analysis(analysis, artifact_path)
-    print(f"Saved analysis to {artifact_path}")
+    record_analysis(analysis, date=artifact_path.parent.name)
+    print(f"Saved analysis to {artifact_path} and {metric_store.DEFAULT_STORE_DIR}")
 
 
 if __name__ == "__main__":
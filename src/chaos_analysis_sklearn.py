@@ -11,13 +11,17 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
 	sys.path.insert(0, str(ROOT))
 
-from src import chaos_metrics, preprocessing
+from src import chaos_analysis, chaos_metrics, metric_store, preprocessing, result_cache
+
+SOURCE = "sklearn"
+PARAMS = {"use_sklearn": True}
 
 
 def analyze_golden_sample(
 	data_path: Path,
 	start_hour: int = 8,
 	end_hour: int = 22,
+	use_cache: bool = True,
 ) -> dict[str, Any]:
 	df = pd.read_parquet(data_path)
 	if "sales" not in df.columns:
@@ -33,16 +37,20 @@ def analyze_golden_sample(
 	hourly_series = df_day["sales"].to_numpy()
 	daily = preprocessing.aggregate_daily(df_day, dt_col="dt", value_col="sales", agg="sum")
 	daily_series = daily["sales"].to_numpy()
+	compute = result_cache.call if use_cache else (lambda func, *args, **kwargs: func(*args, **kwargs))
+	hurst = chaos_metrics.hurst_rs_details
+	d2 = chaos_metrics.correlation_dimension_details
 
 	return {
 		"daytime_hourly": {
-			"hurst": chaos_metrics.hurst_rs_details(hourly_series, use_sklearn=True),
-			"d2": chaos_metrics.correlation_dimension_details(hourly_series, use_sklearn=True),
+			"hurst": compute(hurst, hourly_series, use_sklearn=True),
+			"d2": compute(d2, hourly_series, use_sklearn=True),
 		},
 		"daytime_daily": {
-			"hurst": chaos_metrics.hurst_rs_details(daily_series, use_sklearn=True),
-			"d2": chaos_metrics.correlation_dimension_details(daily_series, use_sklearn=True),
+			"hurst": compute(hurst, daily_series, use_sklearn=True),
+			"d2": compute(d2, daily_series, use_sklearn=True),
 		},
+		"sku": metric_store.frame_sku(df),
 		"n_hourly": int(len(hourly_series)),
 		"n_daily": int(len(daily_series)),
 		"start_hour": int(start_hour),
@@ -73,60 +81,75 @@ def save_analysis(analysis: dict[str, Any], output_path: Path) -> None:
 	output_path.write_text("\n".join(lines))
 
 
-def _parse_metrics(text: str) -> dict[str, float]:
-	out = {}
-	for line in text.splitlines():
-		if "Hurst (R/S)" in line:
-			out.setdefault("hurst", []).append(float(line.split(":")[-1]))
-		if "Correlation dimension D2" in line:
-			out.setdefault("d2", []).append(float(line.split(":")[-1]))
-	return {
-		"hurst_hourly": out.get("hurst", [0.0, 0.0])[0],
-		"hurst_daily": out.get("hurst", [0.0, 0.0, 0.0])[1],
-		"d2_hourly": out.get("d2", [0.0, 0.0])[0],
-		"d2_daily": out.get("d2", [0.0, 0.0, 0.0])[1],
-	}
+def record_analysis(
+	analysis: dict[str, Any],
+	date: str,
+	store: metric_store.MetricStore | None = None,
+) -> Path | None:
+	store = store or metric_store.MetricStore()
+	return store.append(metric_store.analysis_records(analysis, SOURCE, date, PARAMS))
 
 
 def save_comparison(
-	baseline_path: Path,
-	sklearn_path: Path,
 	output_path: Path,
-) -> None:
-	base_text = baseline_path.read_text()
-	skl_text = sklearn_path.read_text()
-	base = _parse_metrics(base_text)
-	skl = _parse_metrics(skl_text)
-
-	def _delta(key: str) -> float:
-		return skl[key] - base[key]
-
+	store: metric_store.MetricStore | None = None,
+	sku: str = "golden_sample",
+	date: str | None = None,
+) -> pd.DataFrame:
+	"""Write the baseline vs scikit-learn summary from the metric store.
+
+	Returns:
+		The compared rows (series, metric, baseline, sklearn, delta).
+	"""
+	store = store or metric_store.MetricStore()
+	table = store.compare(
+		chaos_analysis.SOURCE,
+		SOURCE,
+		skus=[sku],
+		dates=None if date is None else [date],
+	).set_index(["series", "metric"])
+	if table.empty:
+		raise LookupError(f"No {chaos_analysis.SOURCE}/{SOURCE} metrics for {sku} in {store.root}")
+
+	labels = [
+		("Hourly Hurst", "daytime_hourly", "hurst"),
+		("Daily Hurst", "daytime_daily", "hurst"),
+		("Hourly D2", "daytime_hourly", "d2"),
+		("Daily D2", "daytime_daily", "d2"),
+	]
 	lines = [
 		"Chaos Metrics Comparison (Baseline vs scikit-learn)",
-		f"Baseline: {baseline_path}",
-		f"Sklearn: {sklearn_path}",
+		f"Store: {store.root}",
+		f"SKU: {sku}" + (f", date: {date}" if date else ""),
 		"",
-		f"Hourly Hurst: {base['hurst_hourly']:.4f} -> {skl['hurst_hourly']:.4f} (Δ={_delta('hurst_hourly'):.4f})",
-		f"Daily Hurst: {base['hurst_daily']:.4f} -> {skl['hurst_daily']:.4f} (Δ={_delta('hurst_daily'):.4f})",
-		f"Hourly D2: {base['d2_hourly']:.4f} -> {skl['d2_hourly']:.4f} (Δ={_delta('d2_hourly'):.4f})",
-		f"Daily D2: {base['d2_daily']:.4f} -> {skl['d2_daily']:.4f} (Δ={_delta('d2_daily'):.4f})",
 	]
+	for label, series, metric in labels:
+		if (series, metric) not in table.index:
+			continue
+		row = table.loc[(series, metric)]
+		lines.append(
+			f"{label}: {row[chaos_analysis.SOURCE]:.4f} -> {row[SOURCE]:.4f} (Δ={row['delta']:.4f})"
+		)
 	output_path.parent.mkdir(parents=True, exist_ok=True)
 	output_path.write_text("\n".join(lines))
+	return table.reset_index()
 
 
 def main() -> None:
 	data_path = Path("data/golden_sample.parquet")
 	sklearn_path = Path("docs/reports/artifacts/2026-02-01/chaos_metrics_analysis_sklearn.txt")
-	baseline_path = Path("docs/reports/artifacts/2026-02-01/chaos_metrics_analysis.txt")
 	comparison_path = Path("docs/reports/artifacts/2026-02-01/chaos_metrics_comparison.txt")
+	date = sklearn_path.parent.name
 
 	analysis = analyze_golden_sample(data_path)
 	save_analysis(analysis, sklearn_path)
-	if baseline_path.exists():
-		save_comparison(baseline_path, sklearn_path, comparison_path)
-	print(f"Saved analysis to {sklearn_path}")
-	if comparison_path.exists():
+	record_analysis(analysis, date)
+	print(f"Saved analysis to {sklearn_path} and {metric_store.DEFAULT_STORE_DIR}")
+	try:
+		save_comparison(comparison_path, sku=analysis["sku"], date=date)
+	except LookupError as exc:
+		print(f"Skipped comparison: {exc} (run python src/chaos_analysis.py first)")
+	else:
 		print(f"Saved comparison to {comparison_path}")
 
 
@@ -5,6 +5,8 @@ from typing import Iterable, Sequence
 
 import numpy as np
 
+from src.instrumentation import instrument
+
 try:  # Optional dependency
     import nolds  # type: ignore
 except Exception:  # pragma: no cover - optional dependency
@@ -29,6 +31,7 @@ def hurst_rs(ts: Sequence[float]) -> float:
     return float(details["H"])
 
 
+@instrument()
 def hurst_rs_details(
     ts: Sequence[float],
     min_window: int = 8,
@@ -104,6 +107,7 @@ def correlation_dimension(ts: Sequence[float], k: int = 10) -> float:
     return float(details["D2"])
 
 
+@instrument()
 def correlation_dimension_scan(
     ts: Sequence[float],
     emb_dims: Sequence[int] | None = None,
@@ -129,6 +133,7 @@ def correlation_dimension_scan(
     return {"m": dims, "d2": d2_values}
 
 
+@instrument()
 def correlation_dimension_details(
     ts: Sequence[float],
     emb_dim: int = 2,
@@ -167,6 +172,7 @@ def correlation_dimension_details(
     )
 
 
+@instrument()
 def compute_chaos_metrics(ts: Sequence[float], k: int = 10) -> dict[str, float]:
     """Compute Hurst exponent and correlation dimension for a series.
 
@@ -0,0 +1,146 @@
+"""Batched stability, root-locus and margin analysis for the P-controlled ACS loop.
+
+Open loop: L(s) = Kp * e^{-Ls} / s. Closed-loop poles use the Padé model of
+the delay and are computed for many (Kp, delay) pairs at once as eigenvalues of
+stacked companion matrices. Gain/phase margins use the exact delay and have
+closed forms: w_gc = Kp, PM = 90° - Kp*L (deg), w_pc = pi / (2L), GM = w_pc / Kp.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+from src.state_space import pade_polynomials
+
+
+def characteristic_polynomials(
+    kp: np.ndarray,
+    delay: np.ndarray,
+    pade_order: int = 1,
+) -> np.ndarray:
+    """Closed-loop characteristic polynomials s*D(s) + Kp*N(s) for each pair.
+
+    Args:
+        kp: Proportional gains (1D).
+        delay: Delays, same length as kp; zero delay yields s + Kp.
+        pade_order: Order of the Padé delay approximation.
+
+    Returns:
+        Array of shape (M, pade_order + 2), highest power first (zero-padded on
+        the left for rows without delay).
+    """
+    kp = np.asarray(kp, dtype=float)
+    delay = np.asarray(delay, dtype=float)
+    num_unit, den_unit = pade_polynomials(1.0, pade_order)
+    n = len(den_unit) - 1
+    # Coefficient of s^k scales with L^k; arrays are highest power first.
+    powers = delay[:, None] ** np.arange(n, -1, -1)[None, :]
+    den = den_unit[None, :] * powers
+    num = num_unit[None, :] * powers
+    if n > 0:
+        no_delay = delay <= 0.0
+        den[no_delay] = np.eye(1, n + 1, n)[0]
+        num[no_delay] = np.eye(1, n + 1, n)[0]
+    char = np.zeros((len(kp), n + 2))
+    char[:, :-1] += den
+    char[:, 1:] += kp[:, None] * num
+    return char
+
+
+def batched_roots(coeffs: np.ndarray) -> np.ndarray:
+    """Roots of many polynomials via batched companion-matrix eigenvalues.
+
+    Leading zero coefficients are allowed; missing roots are returned as NaN.
+
+    Args:
+        coeffs: Array (M, d + 1), highest power first.
+
+    Returns:
+        Complex array (M, d).
+    """
+    coeffs = np.asarray(coeffs, dtype=float)
+    m, d1 = coeffs.shape
+    d = d1 - 1
+    roots = np.full((m, d), np.nan + 0j)
+    lead = np.argmax(~np.isclose(coeffs, 0.0), axis=1)
+    for start in np.unique(lead):
+        rows = np.flatnonzero(lead == start)
+        deg = d - start
+        if deg == 0:
+            continue
+        monic = coeffs[rows, start + 1 :] / coeffs[rows, start][:, None]
+        comp = np.zeros((len(rows), deg, deg))
+        comp[:, 0, :] = -monic
+        comp[:, np.arange(1, deg), np.arange(deg - 1)] = 1.0
+        roots[rows, :deg] = np.linalg.eigvals(comp)
+    return roots
+
+
+def stability_margins(kp: np.ndarray, delay: np.ndarray) -> Dict[str, np.ndarray]:
+    """Exact-delay gain/phase margins and crossover frequencies.
+
+    Returns:
+        Dict with gain_crossover, phase_margin_deg, phase_crossover (inf for
+        zero delay), gain_margin (inf for zero delay) and kp_max = pi / (2L).
+    """
+    kp, delay = np.broadcast_arrays(np.asarray(kp, dtype=float), np.asarray(delay, dtype=float))
+    with np.errstate(divide="ignore"):
+        phase_crossover = np.where(delay > 0, np.pi / (2.0 * delay), np.inf)
+    return {
+        "gain_crossover": kp.copy(),
+        "phase_margin_deg": np.degrees(np.pi / 2.0 - kp * delay),
+        "phase_crossover": phase_crossover,
+        "gain_margin": phase_crossover / kp,
+        "kp_max": phase_crossover,
+    }
+
+
+def stability_sweep(
+    kp: Sequence[float],
+    delay: Sequence[float],
+    grid: bool = True,
+    pade_order: int = 1,
+) -> Dict[str, Any]:
+    """Closed-loop poles, margins and stable region for many (Kp, delay) values.
+
+    Args:
+        kp: Proportional gains.
+        delay: Lead times.
+        grid: If True evaluate the full len(kp) x len(delay) grid, otherwise
+            pair kp[i] with delay[i] (e.g. one row per SKU).
+        pade_order: Order of the Padé delay approximation for the poles.
+
+    Returns:
+        Dict with kp, delay, poles (..., pade_order + 1), is_stable (Padé
+        poles in the open left half-plane), is_stable_exact (PM > 0) and the
+        stability_margins fields, all shaped like the evaluated points.
+    """
+    kp_arr = np.asarray(kp, dtype=float)
+    delay_arr = np.asarray(delay, dtype=float)
+    if grid:
+        kp_arr, delay_arr = np.meshgrid(kp_arr, delay_arr, indexing="ij")
+    elif kp_arr.shape != delay_arr.shape:
+        raise ValueError("kp and delay must have the same shape when grid=False")
+    shape = kp_arr.shape
+
+    poles = batched_roots(characteristic_polynomials(kp_arr.ravel(), delay_arr.ravel(), pade_order))
+    real = np.where(np.isnan(poles.real), -np.inf, poles.real)
+    margins = stability_margins(kp_arr, delay_arr)
+    return {
+        "kp": kp_arr,
+        "delay": delay_arr,
+        "poles": poles.reshape(*shape, -1),
+        "is_stable": np.all(real < 0, axis=1).reshape(shape),
+        "is_stable_exact": (kp_arr > 0) & (margins["phase_margin_deg"] > 0),
+        **margins,
+    }
+
+
+def root_locus(kp: Sequence[float], delay: float, pade_order: int = 1) -> Dict[str, np.ndarray]:
+    """Closed-loop pole trajectories as Kp varies for a fixed delay."""
+    kp_arr = np.asarray(kp, dtype=float)
+    poles = batched_roots(
+        characteristic_polynomials(kp_arr, np.full(kp_arr.shape, float(delay)), pade_order)
+    )
+    return {"kp": kp_arr, "poles": poles}
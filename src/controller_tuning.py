@@ -0,0 +1,221 @@
+"""PI/PID autotuning for the ACS loop by batched candidate evaluation.
+
+Every candidate (Kp, Ki, Kd) is one column of `acs_simulation.simulate_batch`,
+so a full grid is simulated in a single time loop. The cost combines
+
+    ITAE      = sum_k t_k * |e_k| / (I_target * sum_k t_k)    (e = I_target - I)
+    overshoot = max(0, max_k I_k - I_target) / I_target
+    stockout  = unmet demand / total demand          (demand-driven mode)
+
+(ITAE is thus a time-weighted mean relative error, comparable across
+horizons and SKUs) and the best grid point is refined on successively narrower grids.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src import acs_simulation
+from src.instrumentation import instrument
+
+DEFAULT_WEIGHTS = {"itae": 10.0, "overshoot": 1.0, "stockout": 10.0}
+MODES = ("p", "pi", "pid")
+
+
+def evaluate_candidates(
+    kp: np.ndarray,
+    ki: np.ndarray,
+    kd: np.ndarray,
+    delay: float,
+    i_target: float = 1.0,
+    demand: Sequence[float] | None = None,
+    horizon: int | None = None,
+    dt: float = 1.0,
+    weights: Dict[str, float] | None = None,
+) -> Dict[str, np.ndarray]:
+    """Simulate and score many PID gain triples at once.
+
+    Args:
+        kp: Proportional gains (1D, one per candidate).
+        ki: Integral gains, same length.
+        kd: Derivative gains, same length.
+        delay: Lead time in model time units.
+        i_target: Target inventory level.
+        demand: Demand series for the demand-driven response (inventory
+            starts at i_target); None scores the reference step from zero.
+        horizon: Number of steps for the step response (default 20 lead times).
+        dt: Step length.
+        weights: Cost weights for itae, overshoot and stockout.
+
+    Returns:
+        Dict with itae, overshoot, stockout and cost arrays (non-finite
+        trajectories get cost inf).
+    """
+    w = {**DEFAULT_WEIGHTS, **(weights or {})}
+    kp, ki, kd = (np.asarray(v, dtype=float) for v in (kp, ki, kd))
+    if demand is None:
+        n_steps = int(horizon or max(50, 20 * np.rint(max(delay, dt) / dt)))
+        dem = np.zeros((n_steps, 1))
+        start = 0.0
+    else:
+        dem = np.asarray(demand, dtype=float).reshape(-1, 1)
+        n_steps = len(dem)
+        start = i_target
+
+    with np.errstate(over="ignore", invalid="ignore"):
+        sim = acs_simulation.simulate_batch(
+            dem, kp, i_target, delay, dt=dt, policy="pid", initial_inventory=start, ki=ki, kd=kd
+        )
+        inventory = sim["inventory"]
+        t = sim["t"][:, None]
+        scale = abs(i_target) if i_target else 1.0
+        itae = np.sum(t * np.abs(i_target - inventory), axis=0) / (scale * t.sum())
+        overshoot = np.maximum(inventory.max(axis=0) - i_target, 0.0) / scale
+        if demand is None:
+            stockout = np.zeros(len(kp))
+        else:
+            available = inventory[:-1] + sim["arrivals"]
+            served = np.clip(np.minimum(available, dem), 0.0, None)
+            total = dem.sum()
+            stockout = (dem - served).sum(axis=0) / total if total > 0 else np.zeros(len(kp))
+        cost = w["itae"] * itae + w["overshoot"] * overshoot + w["stockout"] * stockout
+    cost = np.where(np.isfinite(cost) & np.all(np.isfinite(inventory), axis=0), cost, np.inf)
+    return {"itae": itae, "overshoot": overshoot, "stockout": stockout, "cost": cost}
+
+
+def _gain_limit(delay: float, dt: float) -> float:
+    """Largest useful Kp: exact-delay stability bound pi / (2L), capped at 1 / dt."""
+    return min(np.pi / (2.0 * delay), 1.0 / dt) if delay > 0 else 1.0 / dt
+
+
+def _candidate_grid(
+    centre: Tuple[float, float, float],
+    span: Tuple[float, float, float],
+    mode: str,
+    points: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    axes = []
+    for i, (c, s) in enumerate(zip(centre, span)):
+        if i >= len(mode):
+            axes.append(np.zeros(1))
+        else:
+            axes.append(np.unique(np.clip(np.linspace(c - s, c + s, points), 0.0, None)))
+    grid = np.meshgrid(*axes, indexing="ij")
+    return tuple(g.ravel() for g in grid)
+
+
+def autotune(
+    delay: float,
+    i_target: float = 1.0,
+    demand: Sequence[float] | None = None,
+    mode: str = "pi",
+    dt: float = 1.0,
+    horizon: int | None = None,
+    points: int = 15,
+    refine: int = 3,
+    weights: Dict[str, float] | None = None,
+) -> Dict[str, Any]:
+    """Coarse-to-fine grid search for P, PI or PID gains.
+
+    The first grid spans Kp in [0, g], Ki in [0, g^2 / 2] and Kd in [0, 1)
+    with g = `_gain_limit(delay, dt)`; each refinement halves the span around
+    the current best candidate.
+
+    Args:
+        delay: Lead time.
+        i_target: Target inventory level.
+        demand: Optional demand series (demand-driven tuning).
+        mode: "p", "pi" or "pid".
+        dt: Step length.
+        horizon: Step-response length (see `evaluate_candidates`).
+        points: Grid points per tuned gain.
+        refine: Number of refinement rounds.
+        weights: Cost weights.
+
+    Returns:
+        Dict with kp, ki, kd, cost, itae, overshoot, stockout and evaluations.
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}")
+    g = _gain_limit(delay, dt)
+    span = (g / 2.0, g * g / 4.0, 0.45)
+    centre = span
+    best: Dict[str, Any] = {}
+    evaluations = 0
+    for _ in range(refine + 1):
+        kp, ki, kd = _candidate_grid(centre, span, mode, points)
+        scores = evaluate_candidates(kp, ki, kd, delay, i_target, demand, horizon, dt, weights)
+        evaluations += len(kp)
+        i = int(np.argmin(scores["cost"]))
+        if not best or scores["cost"][i] < best["cost"]:
+            best = {
+                "kp": float(kp[i]),
+                "ki": float(ki[i]),
+                "kd": float(kd[i]),
+                **{k: float(v[i]) for k, v in scores.items()},
+            }
+        centre = (best["kp"], best["ki"], best["kd"])
+        span = tuple(s / 2.0 for s in span)
+    return {**best, "evaluations": evaluations}
+
+
+def _tune_group(job: Tuple[Any, np.ndarray, Dict[str, Any]]) -> Dict[str, Any]:
+    key, series, options = job
+    options = dict(options)
+    target = options.pop("i_target", None)
+    if target is None:
+        target = acs_simulation.base_stock_level(series, options["delay"], options.get("dt", 1.0))
+    try:
+        res = autotune(demand=series, i_target=target, **options)
+    except Exception as exc:  # keep the batch running; report the failure
+        return {"key": key, "i_target": target, "success": False, "message": str(exc)}
+    return {"key": key, "i_target": target, **res, "success": bool(np.isfinite(res["cost"])), "message": ""}
+
+
+@instrument()
+def tune_panel(
+    df: pd.DataFrame,
+    delay: float,
+    group_cols: Sequence[str] = ("store_id", "product_id"),
+    value_col: str = "sales",
+    n_jobs: int | None = 1,
+    **options: Any,
+) -> pd.DataFrame:
+    """Autotune every SKU of a long hourly panel against its own sales.
+
+    Args:
+        df: Long-format panel ordered in time within each group.
+        delay: Lead time in hours.
+        group_cols: Columns identifying a series.
+        value_col: Demand column.
+        n_jobs: Worker processes (1 = serial, None = all CPUs).
+        **options: Passed to `autotune` (mode, points, refine, weights, dt,
+            i_target; the target defaults to each SKU's base-stock level).
+
+    Returns:
+        DataFrame with one row per group: gains, cost terms and status.
+    """
+    missing = [c for c in [*group_cols, value_col] if c not in df.columns]
+    if missing:
+        raise KeyError(f"Columns {missing} not found in DataFrame")
+
+    options = {**options, "delay": delay}
+    jobs = [
+        (key, np.nan_to_num(g[value_col].to_numpy(dtype=float)), options)
+        for key, g in df.groupby(list(group_cols), sort=False)
+    ]
+    if n_jobs == 1:
+        rows = [_tune_group(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            rows = list(pool.map(_tune_group, jobs, chunksize=max(1, len(jobs) // 64)))
+
+    out = pd.DataFrame(rows)
+    keys = pd.DataFrame(
+        [k if isinstance(k, tuple) else (k,) for k in out.pop("key")],
+        columns=list(group_cols),
+    )
+    return pd.concat([keys, out], axis=1)
@@ -2,6 +2,8 @@
 
 Loads the full dataset into memory, selects optimal time series with progress tracking,
 and saves the result to Parquet.
+
+Run from the repository root: python -m src.data_loader
 """
 import sys
 from pathlib import Path
@@ -15,9 +17,12 @@ try:
 except ImportError:
     datasets = None
 
+from src.instrumentation import instrument
+
 # Register tqdm for pandas (df.progress_apply)
 tqdm.pandas()
 
+@instrument()
 def load_full_dataset(
     repo: str = "Dingdong-Inc/FreshRetailNet-50K",
     split: str = "train"
@@ -48,6 +53,7 @@ def load_full_dataset(
     print(f"      Memory usage: {df.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
     return df
 
+@instrument()
 def find_golden_sample_vectorized(df: pd.DataFrame) -> Tuple[int | str, int | str]:
     """Find the best (Store, Product) pair using vectorized operations."""
     print(f"\n[3/4] Analyzing dataset to find 'Golden Sample' (Best SKU)...")
@@ -111,15 +117,13 @@ def find_golden_sample_vectorized(df: pd.DataFrame) -> Tuple[int | str, int | st
     
     return best_store, best_product
 
-def explode_and_save(
+@instrument()
+def explode_sku(
     df: pd.DataFrame,
     store_id: int | str,
     product_id: int | str,
-    output_path: Path
-):
-    """Filter for specific item, explode hourly data, and save."""
-    print(f"\n[4/4] Processing and Saving...")
-    
+) -> pd.DataFrame:
+    """Filter for specific item and explode its daily rows into hourly records."""
     # Filter
     subset = df[(df['store_id'] == store_id) & (df['product_id'] == product_id)].copy()
     subset = subset.sort_values('dt')
@@ -155,7 +159,18 @@ def explode_and_save(
     
     # Create sequential integer index for simplified ODE modeling later
     flat_df['time_step'] = range(len(flat_df))
-    
+    return flat_df
+
+def explode_and_save(
+    df: pd.DataFrame,
+    store_id: int | str,
+    product_id: int | str,
+    output_path: Path
+):
+    """Filter for specific item, explode hourly data, and save."""
+    print(f"\n[4/4] Processing and Saving...")
+    flat_df = explode_sku(df, store_id, product_id)
+
     # Create output directory
     output_path = Path(output_path)
     if not output_path.parent.exists():
@@ -0,0 +1,221 @@
+"""Shape-preserving downsampling for dense plot traces.
+
+Largest-Triangle-Three-Buckets (LTTB) keeps, per bucket, the point forming
+the largest triangle with the previously kept point and the next bucket's
+mean, so peaks and stockout dips survive decimation far better than strided
+sampling. Bucket means are computed with one `np.add.reduceat`; only the
+per-bucket argmax is sequential.
+
+For pixel-exact line rendering `minmax_indices` (M4) keeps each pixel
+column's first, last, min and max sample; `density_raster` bins point clouds
+into an image, and `true_runs` / `merge_runs` compress boolean flags
+(stockouts) into [start, end] episodes. `compact_figure` applies LTTB to
+every dense trace of a plotly figure for the lightweight HTML reports.
+"""
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def lttb_indices(x: Sequence[float], y: Sequence[float], n_out: int) -> np.ndarray:
+    """Indices of the LTTB subsample of a series with increasing x.
+
+    Args:
+        x: Monotonic x values (numeric; convert datetimes to numbers first).
+        y: Values, same length as x.
+        n_out: Number of points to keep (first and last are always kept).
+
+    Returns:
+        Sorted integer indices into x / y of length min(n_out, len(x)).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    n_buckets = n_out - 2
+    edges = (np.arange(n_buckets + 1) * (n - 2) / n_buckets).astype(int) + 1
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[1 : n - 1], edges[:-1] - 1) / counts
+    mean_y = np.add.reduceat(y[1 : n - 1], edges[:-1] - 1) / counts
+    # Target for bucket i is the mean of bucket i + 1 (the last point for the last bucket).
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    out = np.empty(n_out, dtype=int)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_buckets):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs(
+            (x[a] - next_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y[i] - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def lttb_curve_indices(x: Sequence[float], y: Sequence[float], n_out: int) -> np.ndarray:
+    """LTTB for parametric curves (e.g. phase portraits) with non-monotonic x.
+
+    Each coordinate is decimated against the sample index and the kept
+    indices are merged, so turning points in either coordinate survive.
+
+    Returns:
+        Sorted unique indices (at most 2 * n_out).
+    """
+    t = np.arange(len(x), dtype=float)
+    keep = np.union1d(lttb_indices(t, x, n_out), lttb_indices(t, y, n_out))
+    return keep
+
+
+def minmax_indices(x: Sequence[float], y: Sequence[float], n_bins: int) -> np.ndarray:
+    """M4 decimation: first, last, min and max sample of each x pixel column.
+
+    Drawing the kept points as a line gives the same pixels as drawing every
+    point at a width of n_bins pixels, and every spike is preserved exactly.
+
+    Args:
+        x: Non-decreasing x values (numeric).
+        y: Values, same length as x.
+        n_bins: Number of equal-width x bins (horizontal pixels).
+
+    Returns:
+        Sorted unique indices (at most 4 * n_bins).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    n = len(x)
+    if n <= 4 * n_bins:
+        return np.arange(n)
+    span = x[-1] - x[0]
+    if span > 0:
+        bins = np.minimum(((x - x[0]) / span * n_bins).astype(int), n_bins - 1)
+    else:
+        bins = np.arange(n) * n_bins // n
+    starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+    # Bins are contiguous, so sorting by (bin, y) keeps every bin's block in
+    # place and puts its min first and its max last.
+    order = np.lexsort((y, bins))
+    return np.unique(np.concatenate([starts, ends, order[starts], order[ends]]))
+
+
+def true_runs(mask: Sequence[bool]) -> np.ndarray:
+    """Start and end (inclusive) positions of consecutive True runs.
+
+    Returns:
+        Integer array of shape (n_runs, 2).
+    """
+    m = np.asarray(mask, dtype=bool).astype(np.int8)
+    edges = np.diff(np.r_[0, m, 0])
+    return np.column_stack([np.flatnonzero(edges == 1), np.flatnonzero(edges == -1) - 1])
+
+
+def merge_runs(runs: np.ndarray, x: Sequence[float], min_gap: float) -> np.ndarray:
+    """Join consecutive runs whose gap in x is at most min_gap (e.g. one pixel).
+
+    Args:
+        runs: (n_runs, 2) positions from `true_runs`.
+        x: Numeric x values the positions index into.
+        min_gap: Largest gap that is closed.
+
+    Returns:
+        Merged (n_merged, 2) positions covering every input run.
+    """
+    if len(runs) < 2:
+        return runs
+    x = np.asarray(x, dtype=float)
+    split = x[runs[1:, 0]] - x[runs[:-1, 1]] > min_gap
+    return np.column_stack([runs[np.r_[True, split], 0], runs[np.r_[split, True], 1]])
+
+
+def density_raster(
+    x: Sequence[float],
+    y: Sequence[float],
+    bins: int = 300,
+    log: bool = True,
+) -> dict:
+    """2D point-density image for scatter/phase plots too dense to draw as points.
+
+    Args:
+        x: Point x coordinates.
+        y: Point y coordinates.
+        bins: Pixels per axis.
+        log: Return log1p counts (long-tailed densities stay readable).
+
+    Returns:
+        Dict with z (bins x bins, rows along y, NaN where empty), x and y
+        pixel centres and the total point count n.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    ok = np.isfinite(x) & np.isfinite(y)
+    counts, x_edges, y_edges = np.histogram2d(x[ok], y[ok], bins=bins)
+    z = np.log1p(counts) if log else counts
+    z = np.where(counts > 0, z, np.nan).T.astype(np.float32)
+    return {
+        "z": z,
+        "x": 0.5 * (x_edges[1:] + x_edges[:-1]),
+        "y": 0.5 * (y_edges[1:] + y_edges[:-1]),
+        "n": int(ok.sum()),
+    }
+
+
+def compact_figure(fig, max_points: int = 2000):
+    """Shrink a figure for lightweight HTML: LTTB-decimate dense traces and store arrays as numpy.
+
+    Numeric arrays become float32/float64 numpy arrays, which Plotly serializes
+    as base64 typed arrays; datetime x values become epoch milliseconds on a
+    date axis, with None/NaT gaps kept as NaN. Traces with non-monotonic x
+    (phase portraits) are decimated as curves. Marker traces and stockout
+    traces are never decimated: every marked event stays. The figure is
+    modified in place and returned.
+    """
+    for trace in fig.data:
+        x = getattr(trace, "x", None)
+        y = getattr(trace, "y", None)
+        if x is None or y is None or getattr(trace, "type", "") not in ("scatter", "scattergl"):
+            continue
+        try:
+            x_num, is_date = x_values(np.asarray(x), unit="ms")
+        except (TypeError, ValueError):
+            continue
+        if is_date:
+            axis = "xaxis" + (trace.xaxis or "x")[1:]
+            fig.layout[axis].type = "date"
+        y_arr = np.asarray(y, dtype=float)
+        exact = "markers" in (trace.mode or "") or str(trace.name or "").startswith("Stockout")
+        if len(x_num) > max_points and not exact:
+            steps = np.diff(x_num)
+            if np.all(steps >= 0):
+                keep = lttb_indices(x_num, y_arr, max_points)
+            else:
+                keep = lttb_curve_indices(x_num, y_arr, max_points)
+            x_num, y_arr = x_num[keep], y_arr[keep]
+        trace.x = x_num
+        trace.y = y_arr.astype(np.float32) if np.allclose(y_arr, y_arr.astype(np.float32), equal_nan=True) else y_arr
+    return fig
+
+
+def x_values(x: np.ndarray, unit: str = "ns") -> tuple[np.ndarray, bool]:
+    """Float x values and whether they are datetimes (epoch `unit`s; None/NaT -> NaN)."""
+    if x.dtype == object:
+        present = [v for v in x if v is not None and not (isinstance(v, float) and np.isnan(v))]
+        if all(isinstance(v, (int, float, np.number)) and not isinstance(v, bool) for v in present):
+            return np.array([np.nan if v is None else v for v in x], dtype=float), False
+    elif not np.issubdtype(x.dtype, np.datetime64):
+        return x.astype(float), False
+    stamps = pd.to_datetime(x)
+    out = stamps.to_numpy(f"datetime64[{unit}]").astype(np.int64).astype(float)
+    out[np.asarray(pd.isna(stamps))] = np.nan
+    return out, True
+
+
+def numeric_x(x) -> np.ndarray:
+    """Float view of an x column; datetimes become nanoseconds since the epoch."""
+    return x_values(np.asarray(x))[0]
@@ -0,0 +1,217 @@
+"""Batched, incremental static figure export.
+
+`FigureExporter` collects every figure of a report before rendering anything:
+
+- Plotly figures go to kaleido in one `plotly.io.write_images` call, i.e. one
+  browser session that renders the figures concurrently. The session is
+  kept warm across calls with kaleido's sync server when that is available.
+- SVG sources (draw.io diagrams) are converted with `rsvg-convert`, falling
+  back to cairosvg, in a thread pool that overlaps with the kaleido batch.
+- Every output is keyed by a SHA-256 over its inputs (figure JSON or SVG
+  bytes plus format, scale and size). The keys are stored in a JSON manifest
+  next to the figures, so an output whose key is unchanged and whose file
+  still exists is skipped.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+from pathlib import Path
+import subprocess
+from typing import Any, Dict, List, Sequence
+
+import plotly
+import plotly.io as pio
+
+try:  # Optional dependency
+    import kaleido  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    kaleido = None
+
+MANIFEST_NAME = ".figure-manifest.json"
+
+
+def figure_digest(
+    fig: Any,
+    fmt: str,
+    scale: float = 1.0,
+    width: int | None = None,
+    height: int | None = None,
+) -> str:
+    """SHA-256 over the figure JSON, the output options and the plotly version."""
+    h = hashlib.sha256(fig.to_json().encode("utf-8"))
+    h.update(json.dumps([fmt, scale, width, height, plotly.__version__]).encode("utf-8"))
+    return h.hexdigest()
+
+
+def svg_digest(svg_path: Path, fmt: str, dpi: int) -> str:
+    """SHA-256 over the SVG bytes and the output options."""
+    h = hashlib.sha256(Path(svg_path).read_bytes())
+    h.update(json.dumps([fmt, dpi]).encode("utf-8"))
+    return h.hexdigest()
+
+
+def convert_svg(svg_path: Path, out_path: Path, fmt: str, dpi: int = 300) -> None:
+    """Convert one SVG with rsvg-convert (preferred for draw.io SVGs) or cairosvg.
+
+    cairosvg is used when rsvg-convert is missing or fails on the file.
+    """
+    cmd = ["rsvg-convert", "-f", fmt, "-o", str(out_path), str(svg_path)]
+    if fmt == "png":
+        cmd[3:3] = ["--dpi-x", str(dpi), "--dpi-y", str(dpi)]
+    try:
+        subprocess.run(cmd, check=True, capture_output=True)
+        return
+    except Exception as exc:
+        # Fallback to cairosvg if rsvg-convert is unavailable or fails.
+        rsvg_error = exc
+    try:
+        import cairosvg  # type: ignore
+    except Exception as exc:  # pragma: no cover
+        raise RuntimeError(
+            f"Failed to convert SVG via rsvg-convert ({rsvg_error}), and cairosvg is unavailable. "
+            "Install librsvg (brew install librsvg) or install cairosvg + cairo."
+        ) from exc
+    if fmt == "pdf":
+        cairosvg.svg2pdf(url=str(svg_path), write_to=str(out_path))
+    else:
+        cairosvg.svg2png(url=str(svg_path), write_to=str(out_path), dpi=dpi)
+
+
+def _write_plotly_batch(figs: List[Any], paths: List[Path], scales: List[float]) -> None:
+    """Render figures in one kaleido session (per-figure calls on older plotly)."""
+    if hasattr(pio, "write_images"):
+        pio.write_images(figs, paths, scale=scales)
+    else:  # pragma: no cover - plotly < 6.1 keeps one kaleido subprocess itself
+        for fig, path, scale in zip(figs, paths, scales):
+            fig.write_image(path, scale=scale)
+
+
+class FigureExporter:
+    """Collect figures, then export only the stale ones in one batch.
+
+    Use as a context manager to keep the kaleido renderer warm for the whole
+    session:
+
+        with FigureExporter(FIG_DIR) as exporter:
+            exporter.add("task3_time_series", fig_ts)
+            exporter.add_svg("diagram", svg_path, formats=("pdf", "png"))
+            exporter.export()
+    """
+
+    def __init__(self, out_dir: Path, workers: int = 4) -> None:
+        self.out_dir = Path(out_dir)
+        self.workers = workers
+        self.manifest_path = self.out_dir / MANIFEST_NAME
+        self._plotly: List[Dict[str, Any]] = []
+        self._svg: List[Dict[str, Any]] = []
+        self._server = False
+
+    def __enter__(self) -> "FigureExporter":
+        start = getattr(kaleido, "start_sync_server", None)
+        if start is not None:
+            try:
+                start(silence_warnings=True)
+                self._server = True
+            except Exception:  # an already running server is fine
+                pass
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self._server:
+            kaleido.stop_sync_server(silence_warnings=True)
+            self._server = False
+
+    def add(
+        self,
+        name: str,
+        fig: Any,
+        formats: Sequence[str] = ("png",),
+        scale: float = 2,
+    ) -> None:
+        """Queue a plotly figure as <name>.<fmt> for each format."""
+        for fmt in formats:
+            self._plotly.append(
+                {
+                    "fig": fig,
+                    "path": self.out_dir / f"{name}.{fmt}",
+                    "scale": scale,
+                    "digest": figure_digest(fig, fmt, scale),
+                }
+            )
+
+    def add_svg(
+        self,
+        name: str,
+        svg_path: Path,
+        formats: Sequence[str] = ("pdf", "png"),
+        dpi: int = 300,
+    ) -> None:
+        """Queue an SVG conversion to <name>.<fmt> for each format."""
+        if not Path(svg_path).exists():
+            raise FileNotFoundError(f"SVG not found: {svg_path}")
+        for fmt in formats:
+            self._svg.append(
+                {
+                    "svg": Path(svg_path),
+                    "path": self.out_dir / f"{name}.{fmt}",
+                    "fmt": fmt,
+                    "dpi": dpi,
+                    "digest": svg_digest(svg_path, fmt, dpi),
+                }
+            )
+
+    def _load_manifest(self) -> Dict[str, str]:
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            return json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except ValueError:
+            return {}
+
+    def _save_manifest(self, manifest: Dict[str, str]) -> None:
+        tmp = self.manifest_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+        tmp.replace(self.manifest_path)
+
+    def export(self, force: bool = False) -> Dict[str, str]:
+        """Render every queued output whose input digest changed.
+
+        Args:
+            force: Re-export everything regardless of the manifest.
+
+        Returns:
+            Mapping of output file name to "exported" or "skipped".
+        """
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        manifest = self._load_manifest()
+
+        def stale(job: Dict[str, Any]) -> bool:
+            return force or not job["path"].exists() or manifest.get(job["path"].name) != job["digest"]
+
+        plotly_jobs = [job for job in self._plotly if stale(job)]
+        svg_jobs = [job for job in self._svg if stale(job)]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            svg_futures = [
+                pool.submit(convert_svg, job["svg"], job["path"], job["fmt"], job["dpi"]) for job in svg_jobs
+            ]
+            if plotly_jobs:
+                _write_plotly_batch(
+                    [job["fig"] for job in plotly_jobs],
+                    [job["path"] for job in plotly_jobs],
+                    [job["scale"] for job in plotly_jobs],
+                )
+            for future in svg_futures:
+                future.result()
+
+        exported = {job["path"].name for job in plotly_jobs + svg_jobs}
+        for job in self._plotly + self._svg:
+            manifest[job["path"].name] = job["digest"]
+        self._save_manifest(manifest)
+        status = {
+            job["path"].name: "exported" if job["path"].name in exported else "skipped"
+            for job in self._plotly + self._svg
+        }
+        self._plotly, self._svg = [], []
+        return status
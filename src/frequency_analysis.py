@@ -0,0 +1,89 @@
+"""Frequency responses and stability margins of the inventory control loop.
+
+Transfer functions are evaluated on a cached log-spaced grid with a batched
+Horner scheme; margins are read off the open-loop response by interpolating
+crossings in log frequency.
+"""
+from functools import lru_cache
+from typing import Dict
+
+import numpy as np
+
+
+@lru_cache(maxsize=32)
+def frequency_grid(w_min: float = 1e-3, w_max: float = 1e2, num: int = 2000) -> np.ndarray:
+    """Cached, read-only log-spaced frequency grid in rad per time unit."""
+    grid = np.logspace(np.log10(w_min), np.log10(w_max), int(num))
+    grid.setflags(write=False)
+    return grid
+
+
+def polyval_horner(coeffs: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """Evaluate polynomials at all points at once with Horner's scheme.
+
+    Args:
+        coeffs: Coefficients, highest power first; shape (n + 1,) or (M, n + 1)
+            for M polynomials.
+        x: Evaluation points (any shape, real or complex).
+
+    Returns:
+        Array of shape coeffs.shape[:-1] + x.shape.
+    """
+    coeffs = np.asarray(coeffs)
+    x = np.asarray(x)
+    lead = coeffs.shape[:-1]
+    coeffs = coeffs.reshape(lead + (1,) * x.ndim + coeffs.shape[-1:])
+    result = np.zeros(lead + x.shape, dtype=np.result_type(coeffs, x))
+    for k in range(coeffs.shape[-1]):
+        result = result * x + coeffs[..., k]
+    return result
+
+
+def frequency_response(num: np.ndarray, den: np.ndarray, w: np.ndarray) -> np.ndarray:
+    """H(jw) = num(jw) / den(jw) on a frequency grid (Horner evaluation)."""
+    s = 1j * np.asarray(w, dtype=float)
+    return polyval_horner(num, s) / polyval_horner(den, s)
+
+
+def _first_crossing(w: np.ndarray, values: np.ndarray, level: float) -> float:
+    """First frequency where values crosses level, interpolated in log w (NaN if none)."""
+    diff = values - level
+    idx = np.flatnonzero(np.signbit(diff[:-1]) != np.signbit(diff[1:]))
+    if len(idx) == 0:
+        return float("nan")
+    i = idx[0]
+    frac = diff[i] / (diff[i] - diff[i + 1])
+    log_w = np.log10(w[i]) + frac * (np.log10(w[i + 1]) - np.log10(w[i]))
+    return float(10.0**log_w)
+
+
+def loop_margins(w: np.ndarray, open_loop: np.ndarray) -> Dict[str, float]:
+    """Gain/phase margins and crossover frequencies of an open-loop response.
+
+    Args:
+        w: Increasing frequency grid.
+        open_loop: L(jw) on that grid.
+
+    Returns:
+        Dict with gain_crossover, phase_margin_deg, phase_crossover,
+        gain_margin and gain_margin_db (NaN / inf when a crossover lies
+        outside the grid).
+    """
+    w = np.asarray(w, dtype=float)
+    mag_db = 20.0 * np.log10(np.abs(open_loop))
+    phase_deg = np.degrees(np.unwrap(np.angle(open_loop)))
+    w_gc = _first_crossing(w, mag_db, 0.0)
+    w_pc = _first_crossing(w, phase_deg, -180.0)
+    phase_margin = 180.0 + float(np.interp(np.log10(w_gc), np.log10(w), phase_deg)) if np.isfinite(w_gc) else np.nan
+    if np.isfinite(w_pc):
+        gain_db = float(np.interp(np.log10(w_pc), np.log10(w), mag_db))
+        gain_margin = 10.0 ** (-gain_db / 20.0)
+    else:
+        gain_margin = np.inf
+    return {
+        "gain_crossover": w_gc,
+        "phase_margin_deg": phase_margin,
+        "phase_crossover": w_pc,
+        "gain_margin": gain_margin,
+        "gain_margin_db": 20.0 * np.log10(gain_margin),
+    }
@@ -0,0 +1,124 @@
+"""HTML building blocks shared by the Task 3 reports.
+
+Self-contained reports inline plotly.js and each figure's full JSON
+(`fig_to_html`). Lightweight reports reference one plotly.js asset written
+per plotly version (`write_plotly_asset`) and render figures through
+`LightFigureRenderer`, which decimates dense traces with
+`downsampling.compact_figure` and keeps one copy of each layout template.
+"""
+from __future__ import annotations
+
+import hashlib
+import html
+import json
+from pathlib import Path
+
+from plotly.offline import get_plotlyjs
+
+from src import downsampling
+
+
+def page_head(title: str, plotly_head: str) -> str:
+    """Document head shared by the single-series, per-SKU and index pages."""
+    return f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="utf-8">
+        <title>{html.escape(title)}</title>
+        <style>
+            body {{ font-family: sans-serif; max-width: 1200px; margin: 0 auto; padding: 20px; }}
+            h1, h2 {{ color: #2c3e50; }}
+            .metric-card {{ background: #f8f9fa; padding: 15px; border-radius: 5px; margin-bottom: 20px; }}
+            .plot-container {{ margin-bottom: 40px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); }}
+            table {{ border-collapse: collapse; }}
+            th, td {{ padding: 4px 10px; border-bottom: 1px solid #ddd; text-align: right; }}
+        </style>
+        {plotly_head}
+    </head>
+    """
+
+
+def fig_to_html(fig):
+    """Inline figure markup (plotly.js loaded separately); a note when fig is None."""
+    if fig is None:
+        return "<p><i>Plot not available (insufficient data)</i></p>"
+    return fig.to_html(full_html=False, include_plotlyjs=False)
+
+
+def write_plotly_asset(asset_dir: Path) -> Path:
+    """Write plotly.min.js once per plotly version and return its path."""
+    import plotly
+
+    asset = Path(asset_dir) / f"plotly-{plotly.__version__}.min.js"
+    if not asset.exists():
+        asset.parent.mkdir(parents=True, exist_ok=True)
+        asset.write_text(get_plotlyjs(), encoding="utf-8")
+    return asset
+
+
+class LightFigureRenderer:
+    """Render figures as compact JSON divs sharing one copy of each layout template.
+
+    Templates are keyed by a content hash, so renderers from different worker
+    processes can be merged by updating one `templates` dict.
+    """
+
+    def __init__(self, max_points: int = 2000) -> None:
+        self.max_points = max_points
+        self.templates: dict[str, dict] = {}
+        self._count = 0
+
+    def __call__(self, fig) -> str:
+        if fig is None:
+            return fig_to_html(None)
+        spec = json.loads(downsampling.compact_figure(fig, self.max_points).to_json())
+        template = spec["layout"].pop("template", None)
+        key = "null"
+        if template is not None:
+            text = json.dumps(template, sort_keys=True)
+            digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+            self.templates.setdefault(digest, template)
+            key = f'"{digest}"'
+        div_id = f"figure-{self._count}"
+        self._count += 1
+        return (
+            f'<div id="{div_id}"></div>'
+            f'<script>renderFigure("{div_id}", {_script_json(spec)}, {key});</script>'
+        )
+
+    def templates_script(self) -> str:
+        """JS defining TEMPLATES and renderFigure."""
+        return (
+            f"const TEMPLATES = {_script_json(self.templates)};\n"
+            "function renderFigure(id, spec, t) {\n"
+            "  if (t !== null) spec.layout.template = TEMPLATES[t];\n"
+            "  Plotly.newPlot(id, spec.data, spec.layout, {responsive: true});\n"
+            "}"
+        )
+
+    def write_templates(self, asset_dir: Path) -> Path:
+        """Write templates_script() to a content-addressed asset file."""
+        script = self.templates_script()
+        digest = hashlib.sha256(script.encode("utf-8")).hexdigest()[:12]
+        asset = Path(asset_dir) / f"report-templates-{digest}.js"
+        if not asset.exists():
+            asset.parent.mkdir(parents=True, exist_ok=True)
+            asset.write_text(script, encoding="utf-8")
+        return asset
+
+    def head(self, plotly_src: str, templates_src: str | None = None) -> str:
+        """Script tags for the shared plotly.js asset and the template table.
+
+        The table is inlined unless templates_src points at `write_templates` output.
+        """
+        if templates_src is None:
+            templates = f"<script>{self.templates_script()}</script>"
+        else:
+            templates = f'<script src="{Path(templates_src).as_posix()}"></script>'
+        return f'<script src="{Path(plotly_src).as_posix()}"></script>\n{templates}'
+
+
+def _script_json(obj) -> str:
+    """Compact JSON that is safe inside a <script> element."""
+    return json.dumps(obj, separators=(",", ":")).replace("</", "<\\/")
@@ -0,0 +1,287 @@
+"""Stage-level timing, memory and profiling instrumentation.
+
+Functions decorated with `@instrument()` and blocks wrapped in
+`with stage("name"):` record a span only while a trace is active:
+
+    with tracing(Path("trace.json"), profile="cprofile"):
+        run_pipeline(config)
+
+Each span stores wall time, CPU time, the process peak RSS at exit, how much
+the stage raised that peak, and input/output row counts. Spans nest, so a
+pipeline stage contains the loader or metric calls it made. When no trace is
+active a decorated function costs one global lookup, so hot functions can
+stay decorated. With `profile` set, each profiled stage also writes a
+cProfile `.prof` file or a pyinstrument HTML page next to the trace.
+
+The trace lives in the process that called `tracing()`. Work sent to a
+ProcessPoolExecutor (the calibration, controller-tuning and batch-report
+panels with n_jobs != 1) records no spans of its own: it shows up only as the
+parent span that submitted it, and the RSS fields cover the parent process
+only. Run with n_jobs=1 for a per-call breakdown.
+"""
+from __future__ import annotations
+
+import functools
+import json
+import os
+import platform
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Sequence
+
+try:  # Optional dependency (Unix only)
+    import resource
+except Exception:  # pragma: no cover - optional dependency
+    resource = None
+
+try:  # Optional dependency
+    import pyinstrument  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    pyinstrument = None
+
+PROFILERS = ("cprofile", "pyinstrument")
+
+_ACTIVE: "Trace | None" = None
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MiB (NaN if unknown)."""
+    if resource is None:
+        return float("nan")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / 2**20 if platform.system() == "Darwin" else peak / 2**10
+
+
+def _rows(obj: Any) -> int | None:
+    shape = getattr(obj, "shape", None)
+    if shape:
+        return int(shape[0])
+    if isinstance(obj, (list, tuple)) and not isinstance(obj, str):
+        return len(obj)
+    return None
+
+
+class Span:
+    """One timed stage; `rows` and `meta` may be filled in by the caller."""
+
+    def __init__(self, name: str, index: int, parent: int | None, depth: int, offset: float) -> None:
+        self.name = name
+        self.index = index
+        self.parent = parent
+        self.depth = depth
+        self.offset_s = offset
+        self.rows_in: int | None = None
+        self.rows: int | None = None
+        self.meta: Dict[str, Any] = {}
+
+
+class Trace:
+    """Collects spans for one run and writes them as a JSON trace."""
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        profile: str | None = None,
+        profile_stages: Sequence[str] | None = None,
+    ) -> None:
+        if profile is not None and profile not in PROFILERS:
+            raise ValueError(f"profile must be one of {PROFILERS}")
+        if profile == "pyinstrument" and pyinstrument is None:
+            raise RuntimeError("pyinstrument is not installed (pip install pyinstrument)")
+        self.path = Path(path) if path is not None else None
+        self.profile = profile
+        self.profile_stages = None if profile_stages is None else set(profile_stages)
+        self.spans: List[Dict[str, Any]] = []
+        self.started = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self._t0 = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._profiling = False
+
+    def _stack(self) -> List[Span]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name: str, rows_in: int | None = None) -> Iterator[Span]:
+        stack = self._stack()
+        with self._lock:
+            index = len(self.spans)
+            self.spans.append({})  # reserve the slot so parents precede children
+        parent = stack[-1].index if stack else None
+        span = Span(name, index, parent, len(stack), time.perf_counter() - self._t0)
+        span.rows_in = rows_in
+        stack.append(span)
+        profiler = self._start_profiler(name)
+        rss_before = peak_rss_mb()
+        cpu0, wall0 = time.process_time(), time.perf_counter()
+        error = None
+        try:
+            yield span
+        except BaseException as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            wall, cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+            rss = peak_rss_mb()
+            profile_path = self._stop_profiler(profiler, name, index)
+            stack.pop()
+            self.spans[index] = {
+                "index": index,
+                "name": name,
+                "parent": span.parent,
+                "depth": span.depth,
+                "start_s": round(span.offset_s, 6),
+                "wall_s": round(wall, 6),
+                "cpu_s": round(cpu, 6),
+                "peak_rss_mb": round(rss, 2),
+                "peak_rss_increase_mb": round(rss - rss_before, 2),
+                "rows_in": span.rows_in,
+                "rows_out": span.rows,
+                "meta": span.meta,
+                "profile": profile_path,
+                "error": error,
+            }
+
+    def _start_profiler(self, name: str) -> Any:
+        # Profilers cannot nest: only the outermost selected stage is profiled.
+        if self.profile is None or self._profiling:
+            return None
+        if self.profile_stages is not None and name not in self.profile_stages:
+            return None
+        if threading.current_thread() is not threading.main_thread():
+            return None
+        if self.profile == "cprofile":
+            import cProfile
+
+            profiler = cProfile.Profile()
+            profiler.enable()
+        else:
+            profiler = pyinstrument.Profiler()
+            profiler.start()
+        self._profiling = True
+        return profiler
+
+    def _stop_profiler(self, profiler: Any, name: str, index: int) -> str | None:
+        if profiler is None:
+            return None
+        self._profiling = False
+        out_dir = (self.path.parent if self.path is not None else Path(".")) / "profiles"
+        out_dir.mkdir(parents=True, exist_ok=True)
+        stem = out_dir / f"{index:03d}-{name.replace('/', '_')}"
+        if self.profile == "cprofile":
+            profiler.disable()
+            path = stem.with_suffix(".prof")
+            profiler.dump_stats(path)
+        else:
+            profiler.stop()
+            path = stem.with_suffix(".html")
+            path.write_text(profiler.output_html(), encoding="utf-8")
+        return str(path)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "run": {
+                "started": self.started,
+                "wall_s": round(time.perf_counter() - self._t0, 6),
+                "pid": os.getpid(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "profile": self.profile,
+            },
+            "spans": [s for s in self.spans if s],
+        }
+
+    def write(self) -> Path | None:
+        if self.path is None:
+            return None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.to_dict(), indent=2, default=str), encoding="utf-8")
+        tmp.replace(self.path)
+        return self.path
+
+
+@contextmanager
+def tracing(
+    path: Path | None = None,
+    profile: str | None = None,
+    profile_stages: Sequence[str] | None = None,
+) -> Iterator[Trace]:
+    """Activate a trace for the enclosed block and write it to path on exit.
+
+    Args:
+        path: JSON trace destination (None = keep in memory only).
+        profile: "cprofile" or "pyinstrument" to profile stages (optional).
+        profile_stages: Stage names to profile (default: the outermost ones).
+    """
+    global _ACTIVE
+    previous = _ACTIVE
+    trace = Trace(path, profile, profile_stages)
+    _ACTIVE = trace
+    try:
+        yield trace
+    finally:
+        _ACTIVE = previous
+        trace.write()
+
+
+@contextmanager
+def stage(name: str, rows_in: int | None = None) -> Iterator[Span | None]:
+    """Record the enclosed block as a span of the active trace (no-op otherwise).
+
+    The yielded span (None when no trace is active) accepts `rows` and `meta`.
+    """
+    trace = _ACTIVE
+    if trace is None:
+        yield None
+        return
+    with trace.span(name, rows_in) as span:
+        yield span
+
+
+def instrument(name: str | None = None) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator recording each call as a span while a trace is active.
+
+    Row counts come from the first positional argument and from the result
+    (DataFrames, arrays and lists); the span name defaults to the function's
+    module-qualified name.
+    """
+
+    def decorate(func: Callable[..., Any]) -> Callable[..., Any]:
+        label = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            trace = _ACTIVE
+            if trace is None:
+                return func(*args, **kwargs)
+            with trace.span(label, _rows(args[0]) if args else None) as span:
+                result = func(*args, **kwargs)
+                span.rows = _rows(result)
+                return result
+
+        return wrapper
+
+    return decorate
+
+
+def summarize(trace: Dict[str, Any] | Path) -> List[Dict[str, Any]]:
+    """Aggregate a trace (dict or JSON file) by span name, slowest first."""
+    if not isinstance(trace, dict):
+        trace = json.loads(Path(trace).read_text(encoding="utf-8"))
+    totals: Dict[str, Dict[str, Any]] = {}
+    for span in trace["spans"]:
+        agg = totals.setdefault(
+            span["name"],
+            {"name": span["name"], "calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "peak_rss_increase_mb": 0.0},
+        )
+        agg["calls"] += 1
+        agg["wall_s"] += span["wall_s"]
+        agg["cpu_s"] += span["cpu_s"]
+        agg["peak_rss_increase_mb"] = max(agg["peak_rss_increase_mb"], span["peak_rss_increase_mb"])
+    return sorted(totals.values(), key=lambda a: a["wall_s"], reverse=True)
@@ -2,15 +2,22 @@
 
 Uses scipy.signal.TransferFunction when available.
 """
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Optional
 import numpy as np
 
+from src.frequency_analysis import frequency_grid, frequency_response, loop_margins, polyval_horner
+from src.state_space import (
+    closed_loop_state_space,
+    discretize_closed_loop,
+    pade_polynomials,
+    simulate_state_space,
+)
+
 
 try:
-    from scipy.signal import TransferFunction, pade
+    from scipy.signal import TransferFunction
 except Exception:  # pragma: no cover - absent scipy
     TransferFunction = object
-    pade = None
 
 
 class _MinimalTransferFunction:
@@ -21,35 +28,28 @@ class _MinimalTransferFunction:
         self.den = np.asarray(den, dtype=float)
 
 
-def _pade_first_order(delay: float) -> Tuple[np.ndarray, np.ndarray]:
-    """First-order Padé approximation for e^{-Ls}."""
-    if delay <= 0.0:
-        return np.array([1.0]), np.array([1.0])
-    return np.array([1.0, -0.5 * delay]), np.array([1.0, 0.5 * delay])
-
-
-def build_acs_transfer_function(integrator_gain: float = 1.0, delay: float = 0.0):
+def build_acs_transfer_function(
+    integrator_gain: float = 1.0,
+    delay: float = 0.0,
+    pade_order: int = 1,
+):
     """Construct a simple ACS transfer function representing inventory as integrator.
 
     Args:
         integrator_gain: Integrator gain.
         delay: Transport delay (seconds/hours depending on units).
+        pade_order: Order of the Padé approximation of the delay.
 
     Returns:
         TransferFunction-like object (scipy TransferFunction or a minimal fallback).
     """
     # Continuous-time integrator G(s) = K / s
+    num_d, den_d = pade_polynomials(delay, pade_order)
+    num = np.polymul([integrator_gain], num_d)
+    den = np.polymul([1.0, 0.0], den_d)
     if TransferFunction is object:
-        num_d, den_d = _pade_first_order(delay)
-        num = np.polymul([integrator_gain], num_d)
-        den = np.polymul([1.0, 0.0], den_d)
         return _MinimalTransferFunction(num, den)
-    if delay > 0.0:
-        num_d, den_d = pade(delay, 1) if pade is not None else _pade_first_order(delay)
-        num = np.polymul([integrator_gain], np.asarray(num_d, dtype=float))
-        den = np.polymul([1.0, 0.0], np.asarray(den_d, dtype=float))
-        return TransferFunction(num, den)
-    return TransferFunction([integrator_gain], [1.0, 0.0])
+    return TransferFunction(num, den)
 
 
 def _tf_multiply(num_a: np.ndarray, den_a: np.ndarray, num_b: np.ndarray, den_b: np.ndarray):
@@ -80,38 +80,47 @@ def _cancel_common_trailing_zeros(num: np.ndarray, den: np.ndarray) -> Tuple[np.
 
 
 class InventoryControlSystem:
-    """Feedback inventory control system with proportional controller.
+    """Feedback inventory control system with a proportional (or PI) controller.
 
-    Models: I(s) = (1/s) * (U(s) - D(s)), U(t) = Kp * (I_target - I(t)).
+    Models: I(s) = (1/s) * (U(s) - D(s)), U(t) = Kp * e(t) + Ki * int e dt with
+    e = I_target - I(t).
     """
 
-    def __init__(self, kp: float, i_target: float = 1.0, delay: float = 0.0) -> None:
+    def __init__(
+        self,
+        kp: float,
+        i_target: float = 1.0,
+        delay: float = 0.0,
+        pade_order: int = 1,
+        ki: float = 0.0,
+    ) -> None:
         """Initialize controller gains and target.
 
         Args:
             kp: Proportional gain Kp.
             i_target: Target inventory level for step response.
             delay: Transport delay (lead time) in model time units.
+            pade_order: Order of the Padé delay approximation (continuous path).
+            ki: Integral gain (0 gives the pure P controller).
         """
         self.kp = float(kp)
         self.i_target = float(i_target)
         self.delay = float(delay)
+        self.pade_order = int(pade_order)
+        self.ki = float(ki)
 
     def _delay_polynomials(self) -> Tuple[np.ndarray, np.ndarray]:
-        if self.delay > 0.0:
-            if pade is None:
-                return _pade_first_order(self.delay)
-            num_d, den_d = pade(self.delay, 1)
-            return np.asarray(num_d, dtype=float), np.asarray(den_d, dtype=float)
-        return np.array([1.0]), np.array([1.0])
+        return pade_polynomials(self.delay, self.pade_order)
 
     def _open_loop_polynomials(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
         """Return (num_L, den_L, num_p, den_p) for open-loop and plant."""
         num_p = np.array([1.0])
         den_p = np.array([1.0, 0.0])
         num_d, den_d = self._delay_polynomials()
-        num_c = np.array([self.kp])
-        den_c = np.array([1.0])
+        if self.ki != 0.0:
+            num_c, den_c = np.array([self.kp, self.ki]), np.array([1.0, 0.0])
+        else:
+            num_c, den_c = np.array([self.kp]), np.array([1.0])
 
         num_cd, den_cd = _tf_multiply(num_c, den_c, num_d, den_d)
         num_L, den_L = _tf_multiply(num_cd, den_cd, num_p, den_p)
@@ -140,6 +149,41 @@ class InventoryControlSystem:
             return _MinimalTransferFunction(num_dist, den_dist)
         return TransferFunction(num_dist, den_dist)
 
+    def state_space(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Cached closed-loop (A, B, C, D); inputs are [I_target, D]."""
+        return closed_loop_state_space(self.kp, self.delay, self.pade_order, self.ki)
+
+    def discretize(self, dt: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Cached zero-order-hold discretization (Phi, Gamma, C, D) for step dt."""
+        return discretize_closed_loop(self.kp, self.delay, float(dt), self.pade_order, self.ki)
+
+    def simulate_state_space(
+        self,
+        dt: float,
+        reference: Any = None,
+        demand: Any = None,
+        n_steps: Optional[int] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Simulate the continuous (Padé) loop with piecewise-constant inputs.
+
+        Args:
+            dt: Sample spacing.
+            reference: Target per step (default the constant i_target).
+            demand: Demand per step (default zero).
+            n_steps: Number of steps when neither input is an array.
+
+        Returns:
+            (t, y) with len(t) = n_steps + 1.
+        """
+        phi, gamma, c, _ = self.discretize(dt)
+        lengths = [len(np.atleast_1d(v)) for v in (reference, demand) if v is not None and np.ndim(v) > 0]
+        n = int(n_steps if n_steps is not None else max(lengths, default=0))
+        u = np.zeros((n, 2))
+        u[:, 0] = self.i_target if reference is None else reference
+        if demand is not None:
+            u[:, 1] = demand
+        return dt * np.arange(n + 1), simulate_state_space(phi, gamma, c, u)
+
     def simulate_step_response(
         self,
         duration: float = 10.0,
@@ -156,23 +200,110 @@ class InventoryControlSystem:
         """
         t = np.linspace(0.0, duration, num_points)
         try:
-            from scipy.signal import step
-
-            tf = self._closed_loop_tf()
-            t_out, y = step(tf, T=t)
-            return t_out, y * self.i_target
+            _, y = self.simulate_state_space(t[1] - t[0], n_steps=num_points - 1)
+            return t, y
         except Exception:  # pragma: no cover - fallback without scipy
             y = self.i_target * (1.0 - np.exp(-self.kp * t))
             return t, y
 
+    def simulate_discrete_step_response(
+        self,
+        duration: float = 10.0,
+        dt: float = 0.01,
+        policy: str = "pid",
+        reorder_point: Optional[float] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Step response with the exact lead time (no Padé approximation).
+
+        Args:
+            duration: Simulation horizon.
+            dt: Step length; the delay is rounded to a whole number of steps.
+            policy: "pid" (the P/PI controller of this system), "order_up_to" or
+                "s_S" (see acs_simulation).
+            reorder_point: Reorder point s for the (s, S) policy.
+
+        Returns:
+            (t, y) arrays for time and inventory response.
+        """
+        from src.acs_simulation import simulate_discrete
+
+        result = simulate_discrete(
+            self.kp,
+            self.i_target,
+            self.delay,
+            int(round(duration / dt)),
+            dt=dt,
+            policy=policy,
+            reorder_point=reorder_point,
+            ki=self.ki,
+        )
+        return result["t"], result["inventory"]
+
+    def simulate_demand_response(
+        self,
+        demand: np.ndarray,
+        dt: float = 1.0,
+        policy: str = "pid",
+    ) -> Dict[str, Any]:
+        """Drive the disturbance channel with a demand series D(t).
+
+        Args:
+            demand: Demand per step, shape (T,) or (T, N) for N SKUs.
+            dt: Step length; the delay is rounded to a whole number of steps.
+            policy: Replenishment policy (see acs_simulation.POLICIES); the
+                default "pid" applies this system's Kp and Ki.
+
+        Returns:
+            `acs_simulation.simulate_batch` result extended with the
+            `simulation_metrics` fields (stockout_hours, fill_rate, bullwhip, ...).
+        """
+        from src.acs_simulation import simulate_batch, simulation_metrics
+
+        result = simulate_batch(demand, self.kp, self.i_target, self.delay, dt=dt, policy=policy, ki=self.ki)
+        return {**result, **simulation_metrics(result, demand, dt=dt)}
+
+    def frequency_response(
+        self,
+        w: Optional[np.ndarray] = None,
+        exact_delay: bool = True,
+    ) -> Dict[str, Any]:
+        """Open- and closed-loop frequency responses with margins.
+
+        Args:
+            w: Frequency grid; defaults to the cached `frequency_grid()`.
+            exact_delay: Use e^{-jwL} instead of the Padé polynomials.
+
+        Returns:
+            Dict with w, open_loop L(jw), closed_loop (I_target -> I),
+            disturbance (D -> I), magnitude_db and phase_deg of L, and the
+            `loop_margins` fields.
+        """
+        w = frequency_grid() if w is None else np.asarray(w, dtype=float)
+        s = 1j * w
+        if exact_delay:
+            num_c = [self.kp, self.ki] if self.ki != 0.0 else [self.kp]
+            den_c = [1.0, 0.0] if self.ki != 0.0 else [1.0]
+            open_loop = frequency_response(np.asarray(num_c), np.asarray(den_c), w) * np.exp(-s * self.delay) / s
+        else:
+            num_l, den_l, _, _ = self._open_loop_polynomials()
+            open_loop = frequency_response(num_l, den_l, w)
+        sensitivity = 1.0 / (1.0 + open_loop)
+        return {
+            "w": w,
+            "open_loop": open_loop,
+            "closed_loop": open_loop * sensitivity,
+            "disturbance": -sensitivity / s,
+            "magnitude_db": 20.0 * np.log10(np.abs(open_loop)),
+            "phase_deg": np.degrees(np.unwrap(np.angle(open_loop))),
+            **loop_margins(w, open_loop),
+        }
+
     def analyze_stability(self) -> Dict[str, Any]:
         """Check closed-loop stability via pole locations.
 
         Returns:
             Dict with poles and stability flag.
         """
-        tf = self._closed_loop_tf()
-        den = np.asarray(tf.den, dtype=float).ravel()
-        poles = np.roots(den)
+        poles = np.linalg.eigvals(self.state_space()[0])
         is_stable = np.all(np.real(poles) < 0)
         return {"poles": poles, "is_stable": bool(is_stable)}
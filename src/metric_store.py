@@ -0,0 +1,273 @@
+"""Structured store for chaos-metric results.
+
+Every metric result is one row in a fixed schema (SCHEMA), indexed by SKU,
+run date, source (e.g. "baseline", "sklearn", "bundle"), series, metric and
+a hash of the parameters. The row keeps the headline value together with its
+fit quality and the diagnostic arrays the value was fitted on:
+
+    metric    value  x            y
+    hurst     H      scales_log   rs_log
+    d2        D2     radii_log    cr_log
+    spectral  H      freqs_log    psd_log
+
+Rows are appended as Parquet part files under one directory, with the schema
+also written to `_schema.json` for non-Arrow readers. Each part is named by a
+digest of its key rows, so recording the same analysis again replaces its
+file. `MetricStore.query` reads only the requested columns and filters the
+key columns inside the Parquet scan, so comparisons and summaries over
+thousands of SKUs never parse text.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+import hashlib
+import json
+import math
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+SCHEMA_VERSION = 1
+DEFAULT_STORE_DIR = Path(__file__).resolve().parents[1] / "docs" / "reports" / "artifacts" / "metrics"
+SCHEMA = pa.schema(
+    [
+        ("sku", pa.string()),
+        ("date", pa.string()),
+        ("source", pa.string()),
+        ("series", pa.string()),
+        ("metric", pa.string()),
+        ("params", pa.string()),
+        ("params_hash", pa.string()),
+        ("value", pa.float64()),
+        ("r2", pa.float64()),
+        ("valid", pa.bool_()),
+        ("n_samples", pa.int64()),
+        ("x", pa.list_(pa.float64())),
+        ("y", pa.list_(pa.float64())),
+        ("recorded_at", pa.string()),
+    ]
+)
+KEY_COLUMNS = ("sku", "date", "source", "series", "metric", "params_hash")
+# metric -> (value key, diagnostic x key, diagnostic y key) in the details dicts.
+DIAGNOSTICS = {
+    "hurst": ("H", "scales_log", "rs_log"),
+    "d2": ("D2", "radii_log", "cr_log"),
+    "spectral": ("H", "freqs_log", "psd_log"),
+}
+
+
+def params_hash(params: Dict[str, Any] | None) -> str:
+    """Short SHA-256 of the canonical JSON of params."""
+    text = json.dumps(params or {}, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+
+
+def sku_label(key: Any) -> str:
+    """Store key for a SKU: group values joined by "/" (e.g. "12/345")."""
+    return "/".join(str(v) for v in key) if isinstance(key, (tuple, list)) else str(key)
+
+
+def frame_sku(df: pd.DataFrame, group_cols: Sequence[str] = ("store_id", "product_id")) -> str:
+    """SKU label of a single-SKU frame ("golden_sample" if it has no key columns)."""
+    if len(df) == 0 or any(col not in df.columns for col in group_cols):
+        return "golden_sample"
+    return sku_label([df[col].iloc[0] for col in group_cols])
+
+
+def _floats(values: Any) -> List[float]:
+    return [] if values is None else np.asarray(values, dtype=float).ravel().tolist()
+
+
+def metric_record(
+    metric: str,
+    result: float | Dict[str, Any],
+    sku: str,
+    date: str,
+    source: str,
+    series: str,
+    params: Dict[str, Any] | None = None,
+    n_samples: int | None = None,
+) -> Dict[str, Any]:
+    """One schema row from a scalar metric or a *_details result dict."""
+    if isinstance(result, dict):
+        value_key, x_key, y_key = DIAGNOSTICS.get(metric, (metric, None, None))
+        value = result.get(value_key, math.nan)
+        r2 = result.get("r2", math.nan)
+        valid = bool(result.get("valid", np.isfinite(value)))
+        x, y = _floats(result.get(x_key)), _floats(result.get(y_key))
+    else:
+        value, r2, valid, x, y = result, math.nan, bool(np.isfinite(result)), [], []
+    return {
+        "sku": str(sku),
+        "date": str(date),
+        "source": source,
+        "series": series,
+        "metric": metric,
+        "params": json.dumps(params or {}, sort_keys=True, default=str),
+        "params_hash": params_hash(params),
+        "value": float(value),
+        "r2": float(r2),
+        "valid": valid,
+        "n_samples": None if n_samples is None else int(n_samples),
+        "x": x,
+        "y": y,
+    }
+
+
+def analysis_records(
+    analysis: Dict[str, Any],
+    source: str,
+    date: str,
+    params: Dict[str, Any] | None = None,
+) -> List[Dict[str, Any]]:
+    """Rows for an `analyze_golden_sample` result (baseline or scikit-learn).
+
+    Both layouts are accepted: scalar {"hurst", "d2"} values per series, or
+    details dicts from hurst_rs_details / correlation_dimension_details.
+    """
+    records = []
+    for series, n_key in (("daytime_hourly", "n_hourly"), ("daytime_daily", "n_daily")):
+        for metric, result in analysis[series].items():
+            records.append(
+                metric_record(
+                    metric,
+                    result,
+                    sku=analysis.get("sku", "golden_sample"),
+                    date=date,
+                    source=source,
+                    series=series,
+                    params={**(params or {}), "start_hour": analysis["start_hour"], "end_hour": analysis["end_hour"]},
+                    n_samples=analysis[n_key],
+                )
+            )
+    return records
+
+
+def bundle_records(
+    bundle: Dict[str, Any],
+    sku: str,
+    date: str,
+    series: str = "daytime_hourly",
+    params: Dict[str, Any] | None = None,
+    n_samples: int | None = None,
+) -> List[Dict[str, Any]]:
+    """Rows for the hurst, d2 and spectral entries of a metrics bundle."""
+    return [
+        metric_record(metric, bundle[metric], sku, date, "bundle", series, params, n_samples)
+        for metric in DIAGNOSTICS
+    ]
+
+
+class MetricStore:
+    """Append-only Parquet store of metric rows under one directory."""
+
+    def __init__(self, root: Path = DEFAULT_STORE_DIR) -> None:
+        self.root = Path(root)
+
+    def append(self, records: Sequence[Dict[str, Any]]) -> Path | None:
+        """Write records as one part file (replacing an earlier write of the same keys)."""
+        if not records:
+            return None
+        stamp = datetime.now().isoformat(timespec="microseconds")
+        rows = [{**rec, "recorded_at": stamp} for rec in records]
+        keys = sorted(json.dumps([rec[k] for k in KEY_COLUMNS]) for rec in rows)
+        digest = hashlib.sha256("\n".join(keys).encode("utf-8")).hexdigest()[:16]
+        self.root.mkdir(parents=True, exist_ok=True)
+        schema_path = self.root / "_schema.json"
+        if not schema_path.exists():
+            schema_path.write_text(
+                json.dumps(
+                    {
+                        "version": SCHEMA_VERSION,
+                        "key": list(KEY_COLUMNS),
+                        "columns": {f.name: str(f.type) for f in SCHEMA},
+                        "diagnostics": DIAGNOSTICS,
+                    },
+                    indent=2,
+                ),
+                encoding="utf-8",
+            )
+        path = self.root / f"part-{digest}.parquet"
+        tmp = self.root / f".part-{digest}.tmp"  # dot-prefixed files are ignored by readers
+        pq.write_table(pa.Table.from_pylist(rows, schema=SCHEMA), tmp)
+        tmp.replace(path)
+        return path
+
+    def query(
+        self,
+        skus: Iterable[str] | None = None,
+        dates: Iterable[str] | None = None,
+        sources: Iterable[str] | None = None,
+        metrics: Iterable[str] | None = None,
+        series: Iterable[str] | None = None,
+        columns: Sequence[str] | None = None,
+        latest: bool = True,
+    ) -> pd.DataFrame:
+        """Rows matching every given filter.
+
+        Args:
+            skus, dates, sources, metrics, series: Allowed values per key
+                column (None = any).
+            columns: Columns to read (default: all). Key columns needed for
+                `latest` are read as well and dropped afterwards.
+            latest: Keep only the most recently recorded row per key.
+
+        Returns:
+            DataFrame with the requested columns (x and y as float arrays).
+        """
+        wanted = list(columns) if columns is not None else SCHEMA.names
+        read = list(dict.fromkeys([*wanted, *KEY_COLUMNS, "recorded_at"])) if latest else wanted
+        if not any(self.root.glob("part-*.parquet")):
+            return pd.DataFrame(columns=wanted)
+        expr = None
+        for col, values in (
+            ("sku", skus),
+            ("date", dates),
+            ("source", sources),
+            ("metric", metrics),
+            ("series", series),
+        ):
+            if values is not None:
+                cond = ds.field(col).isin([str(v) for v in values])
+                expr = cond if expr is None else expr & cond
+        dataset = ds.dataset(self.root, format="parquet", schema=SCHEMA)
+        frame = dataset.to_table(columns=read, filter=expr).to_pandas()
+        if latest and not frame.empty:
+            frame = frame.sort_values("recorded_at", kind="stable")
+            frame = frame.drop_duplicates(list(KEY_COLUMNS), keep="last")
+        return frame[wanted].reset_index(drop=True)
+
+    def compare(
+        self,
+        base: str,
+        other: str,
+        skus: Iterable[str] | None = None,
+        dates: Iterable[str] | None = None,
+        metrics: Iterable[str] | None = None,
+    ) -> pd.DataFrame:
+        """Latest value per (sku, series, metric) for two sources, side by side.
+
+        Returns:
+            DataFrame with sku, series, metric, <base>, <other> and delta
+            (other - base); rows present in only one source keep NaN.
+        """
+        frame = self.query(
+            skus=skus,
+            dates=dates,
+            sources=[base, other],
+            metrics=metrics,
+            columns=["sku", "source", "series", "metric", "value", "recorded_at"],
+        )
+        index = ["sku", "series", "metric"]
+        if frame.empty:
+            return pd.DataFrame(columns=[*index, base, other, "delta"])
+        frame = frame.sort_values("recorded_at", kind="stable").drop_duplicates([*index, "source"], keep="last")
+        wide = frame.pivot(index=index, columns="source", values="value").reindex(columns=[base, other])
+        wide["delta"] = wide[other] - wide[base]
+        wide.columns.name = None
+        return wide.reset_index()
@@ -0,0 +1,164 @@
+"""Shared chaos-metrics artifact for the HTML report and the static figures.
+
+`get_metrics_bundle` computes hurst_rs_details, correlation_dimension_details
+and correlation_dimension_scan on the daytime series, and spectral_details on
+the full, evenly spaced hourly series (the daytime filter joins days end to
+end, which would alias the 24 h cycle). Each bundle is computed once per
+(series, parameters) and stored in the shared `result_cache` (memory LRU plus pickles
+under data/cache/results/). The key hashes the series bytes, the per-metric
+keyword arguments, BUNDLE_VERSION and the source of chaos_metrics and
+spectral_analysis, so a changed sample, parameter or metric implementation
+invalidates the bundle and an unchanged one is reused by `report_generator`
+and `scripts/export_ilin_report_figures.py` alike.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src import chaos_metrics, preprocessing, result_cache, spectral_analysis
+from src.instrumentation import instrument
+
+BUNDLE_VERSION = 2
+DEFAULT_CACHE_DIR = result_cache.DEFAULT_CACHE_DIR
+METRICS = ("hurst", "d2", "d2_scan", "spectral")
+
+
+def load_daytime_sample(
+    data_path: Path | None = None,
+    start_hour: int = 8,
+    end_hour: int = 22,
+    df: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    """Read the golden sample (unless df is given) and keep daytime hours.
+
+    Returns:
+        Filtered frame with datetime `dt` and `hour_index` columns.
+    """
+    if df is None:
+        df = pd.read_parquet(data_path)
+    if "dt" not in df.columns:
+        raise KeyError("dt column is required")
+    df = df.copy()
+    df["dt"] = pd.to_datetime(df["dt"])
+    if "hour_index" not in df.columns:
+        df["hour_index"] = df["dt"].dt.hour
+    return preprocessing.filter_daytime_hours(df, "hour_index", start=start_hour, end=end_hour)
+
+
+def regular_hourly_series(df: pd.DataFrame, value_col: str = "sales") -> np.ndarray:
+    """Unfiltered values on an evenly spaced hourly grid, for spectral analysis.
+
+    Timestamps are `dt` plus `hour_index` hours when the frame has one row per
+    (day, hour), else `dt` itself. Missing hours are linearly interpolated.
+    """
+    ts = pd.to_datetime(df["dt"])
+    if "hour_index" in df.columns:
+        ts = ts.dt.normalize() + pd.to_timedelta(df["hour_index"].to_numpy(), unit="h")
+    values = pd.Series(df[value_col].to_numpy(dtype=float), index=pd.DatetimeIndex(ts)).sort_index()
+    values = values[~values.index.duplicated(keep="first")]
+    return values.asfreq("h").interpolate(limit_direction="both").to_numpy()
+
+
+def compute_metrics_bundle(
+    series: Sequence[float],
+    params: Dict[str, Dict[str, Any]] | None = None,
+    spectral_series: Sequence[float] | None = None,
+) -> Dict[str, Any]:
+    """Compute every diagnostic used by the reports for one series.
+
+    Args:
+        series: Daytime hourly series.
+        params: Optional keyword arguments per metric (keys from METRICS).
+        spectral_series: Evenly spaced hourly series for spectral_details
+            (see regular_hourly_series); defaults to series, which is only
+            correct when series itself is evenly spaced.
+
+    Returns:
+        Dict with hurst, d2, d2_scan and spectral result dicts.
+    """
+    params = params or {}
+    x = np.asarray(series, dtype=float)
+    full = x if spectral_series is None else np.asarray(spectral_series, dtype=float)
+    return {
+        "hurst": chaos_metrics.hurst_rs_details(x, **params.get("hurst", {})),
+        "d2": chaos_metrics.correlation_dimension_details(x, **params.get("d2", {})),
+        "d2_scan": chaos_metrics.correlation_dimension_scan(x, **params.get("d2_scan", {})),
+        "spectral": spectral_analysis.spectral_details(full, **params.get("spectral", {})),
+    }
+
+
+def bundle_key(
+    series: Sequence[float],
+    params: Dict[str, Dict[str, Any]] | None = None,
+    spectral_series: Sequence[float] | None = None,
+) -> str:
+    """SHA-256 over the series bytes, the metric parameters and BUNDLE_VERSION.
+
+    The source digests of chaos_metrics and spectral_analysis are hashed too,
+    so editing a metric implementation invalidates its bundles.
+    """
+    h = hashlib.sha256(np.ascontiguousarray(series, dtype=float).tobytes())
+    if spectral_series is not None:
+        h.update(b"spectral:" + np.ascontiguousarray(spectral_series, dtype=float).tobytes())
+    sources = [result_cache.module_digest(m.__name__) for m in (chaos_metrics, spectral_analysis)]
+    h.update(json.dumps([BUNDLE_VERSION, params or {}, sources], sort_keys=True, default=str).encode("utf-8"))
+    return h.hexdigest()
+
+
+@instrument()
+def get_metrics_bundle(
+    series: Sequence[float],
+    params: Dict[str, Dict[str, Any]] | None = None,
+    cache_dir: Path | None = None,
+    use_cache: bool = True,
+    spectral_series: Sequence[float] | None = None,
+) -> Dict[str, Any]:
+    """Return the metrics bundle for a series, computing it only on a cache miss.
+
+    Args:
+        series: Daytime hourly series.
+        params: Optional keyword arguments per metric.
+        cache_dir: Result cache directory (default DEFAULT_CACHE_DIR).
+        use_cache: Read and write the result cache.
+        spectral_series: Evenly spaced hourly series for the spectrum.
+
+    Returns:
+        Bundle from `compute_metrics_bundle` plus its key.
+    """
+    key = bundle_key(series, params, spectral_series)
+    cache = result_cache.get_cache(cache_dir or DEFAULT_CACHE_DIR) if use_cache else None
+    bundle = cache.get(key) if cache is not None else None
+    if bundle is not None and bundle.get("key") == key:
+        return bundle
+    bundle = {**compute_metrics_bundle(series, params, spectral_series), "key": key}
+    if cache is not None:
+        cache.put(key, bundle)
+    return bundle
+
+
+def daytime_bundle(
+    df: pd.DataFrame,
+    start_hour: int = 8,
+    end_hour: int = 22,
+    params: Dict[str, Dict[str, Any]] | None = None,
+    cache_dir: Path | None = None,
+) -> tuple[pd.DataFrame, Dict[str, Any]]:
+    """Daytime frame and metrics bundle for one unfiltered hourly sample.
+
+    The spectrum is computed on the full hourly series of df, every other
+    metric on its start_hour..end_hour window.
+    """
+    df_day = load_daytime_sample(start_hour=start_hour, end_hour=end_hour, df=df)
+    bundle = get_metrics_bundle(
+        df_day["sales"].to_numpy(),
+        params,
+        cache_dir=cache_dir,
+        spectral_series=regular_hourly_series(df),
+    )
+    return df_day, bundle
@@ -2,14 +2,36 @@
 
 Implements a simple ODE integrator wrapper using scipy.integrate.odeint.
 """
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 import numpy as np
 
+from src.instrumentation import instrument
 
-def _decay_rate(params: Dict[str, Any]) -> float:
+
+def _param(params: Dict[str, Any], key: str, default: float, t: Optional[float] = None):
+    """Read a parameter, evaluating time-varying forcing (callables) at `t`."""
+    value = params.get(key, default)
+    if callable(value):
+        return value(0.0 if t is None else t)
+    return value
+
+
+def _constant(params: Dict[str, Any], key: str, default: float):
+    """Read a parameter the closed-form and ensemble solvers hold constant."""
+    value = params.get(key, default)
+    if callable(value):
+        raise TypeError(
+            f"'{key}' is a callable forcing, but this solver needs scalars or arrays; "
+            "use forcing.integrate_forced_system with an HourlyForcing, or "
+            "integrate_inventory_system, which evaluates callables at each t"
+        )
+    return value
+
+
+def _decay_rate(params: Dict[str, Any], t: Optional[float] = None) -> float:
     decay = params.get("inventory_decay_rate", 0.01)
     temp_sens = params.get("temperature_sensitivity", 0.0)
-    temperature = params.get("temperature", 20.0)
+    temperature = _param(params, "temperature", 20.0, t)
     return decay * (1 + temp_sens * (temperature - 20.0))
 
 
@@ -22,9 +44,10 @@ def inventory_ode(y, t, params: Dict[str, Any]):
         y: Inventory scalar.
         t: Time scalar.
         params: Parameters including 'decay_rate' and 'temperature_sensitivity'.
+            'temperature' and 'inflow' may be callables of t (see src.forcing).
     """
-    decay_term = _decay_rate(params)
-    inflow = params.get("inflow", 0.0)
+    decay_term = _decay_rate(params, t)
+    inflow = _param(params, "inflow", 0.0, t)
     dydt = -decay_term * y + inflow
     return dydt
 
@@ -38,14 +61,15 @@ def inventory_replenishment_ode(state, t, params: Dict[str, Any]):
     Args:
         state: [I, R]
         t: time
-        params: ODE parameters
+        params: ODE parameters; 'demand' and 'temperature' may be callables
+            of t (see src.forcing).
 
     Returns:
         Array [dI/dt, dR/dt]
     """
     inventory, repl = state
-    decay = _decay_rate(params)
-    demand = params.get("demand", 0.0)
+    decay = _decay_rate(params, t)
+    demand = _param(params, "demand", 0.0, t)
     alpha = params.get("replenishment_gain", 1.0)
     beta = params.get("replenishment_decay", 1.0)
     i_target = params.get("i_target", 1.0)
@@ -79,6 +103,7 @@ def integrate_inventory(y0: float, t: np.ndarray, params: Dict[str, Any]) -> np.
     return odeint(lambda y, tt: inventory_ode(y, tt, params), y0, t).ravel()
 
 
+@instrument()
 def integrate_inventory_system(y0: np.ndarray, t: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
     """Integrate 2D inventory-replenishment system.
 
@@ -102,6 +127,135 @@ def integrate_inventory_system(y0: np.ndarray, t: np.ndarray, params: Dict[str,
     return odeint(lambda y, tt: inventory_replenishment_ode(y, tt, params), y0, t)
 
 
+def ensemble_parameters(params: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """Broadcast (possibly array-valued) ODE parameters to 1D arrays of length N.
+
+    Any of the parameter values may be scalars or arrays; temperature effects
+    are folded into the returned "decay" array. Callable (time-varying)
+    demand or temperature raises TypeError.
+
+    Returns:
+        Dict with decay, demand, alpha, beta, i_target arrays of equal length.
+    """
+    _constant(params, "temperature", 20.0)
+    decay, demand, alpha, beta, i_target = np.broadcast_arrays(
+        np.asarray(_decay_rate(params), dtype=float),
+        np.asarray(_constant(params, "demand", 0.0), dtype=float),
+        np.asarray(params.get("replenishment_gain", 1.0), dtype=float),
+        np.asarray(params.get("replenishment_decay", 1.0), dtype=float),
+        np.asarray(params.get("i_target", 1.0), dtype=float),
+    )
+    return {
+        "decay": decay.ravel(),
+        "demand": demand.ravel(),
+        "alpha": alpha.ravel(),
+        "beta": beta.ravel(),
+        "i_target": i_target.ravel(),
+    }
+
+
+def replenishment_field(inventory, repl, decay, demand, alpha, beta, i_target):
+    """Vectorized right-hand side of the 2D system for broadcastable arrays.
+
+    Returns:
+        Tuple (dI/dt, dR/dt) with the broadcast shape of the inputs.
+    """
+    d_inventory = repl - demand - decay * inventory
+    d_repl = alpha * (i_target - inventory) - beta * repl
+    return d_inventory, d_repl
+
+
+def vector_field(params: Dict[str, Any], inventory, repl):
+    """(dI/dt, dR/dt) of the 2D system on arrays of states (e.g. a meshgrid).
+
+    Uses the same `replenishment_field` kernel as the ensemble integrator, so
+    phase-portrait arrows and trajectories cannot drift apart.
+    """
+    return replenishment_field(
+        np.asarray(inventory, dtype=float),
+        np.asarray(repl, dtype=float),
+        _decay_rate(params),
+        params.get("demand", 0.0),
+        params.get("replenishment_gain", 1.0),
+        params.get("replenishment_decay", 1.0),
+        params.get("i_target", 1.0),
+    )
+
+
+def phase_trajectories(y0: np.ndarray, t: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    """Trajectories of one parameter set from many initial conditions at once.
+
+    Constant parameters use the closed-form `solve_inventory_system` for all
+    starts together; time-varying (callable) parameters fall back to one
+    numerical integration per start.
+
+    Args:
+        y0: Initial states, shape (N, 2) (or (2,) for a single start).
+        t: Times at which to evaluate the solution.
+        params: Scalar ODE parameters.
+
+    Returns:
+        Array of shape (len(t), N, 2).
+    """
+    starts = np.atleast_2d(np.asarray(y0, dtype=float))
+    if any(callable(v) for v in params.values()):
+        return np.stack([integrate_inventory_system(y, t, params) for y in starts], axis=1)
+    # An array-valued parameter turns the closed form into an N-system ensemble.
+    tiled = {**params, "demand": np.full(len(starts), float(params.get("demand", 0.0)))}
+    return solve_inventory_system(starts, t, tiled)
+
+
+@instrument()
+def integrate_inventory_ensemble(y0: np.ndarray, t: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    """Integrate N independent inventory-replenishment systems in one solve.
+
+    The N systems are stacked into an interleaved state [I_0, R_0, I_1, R_1, ...]
+    so the Jacobian is tridiagonal; it is passed to odeint in banded form and
+    built once instead of on every call.
+
+    Args:
+        y0: Initial state, shape (2,) shared by all systems or (N, 2).
+        t: Times at which to evaluate the solution.
+        params: ODE parameters; values may be arrays of length N.
+
+    Returns:
+        Array of shape (len(t), N, 2).
+    """
+    coeffs = ensemble_parameters(params)
+    n_sys = len(coeffs["decay"])
+    state0 = np.broadcast_to(np.asarray(y0, dtype=float), (n_sys, 2)).ravel()
+    decay, demand = coeffs["decay"], coeffs["demand"]
+    alpha, beta, i_target = coeffs["alpha"], coeffs["beta"], coeffs["i_target"]
+
+    out = np.empty_like(state0)
+
+    def rhs(y, _t):
+        out[0::2], out[1::2] = replenishment_field(
+            y[0::2], y[1::2], decay, demand, alpha, beta, i_target
+        )
+        return out
+
+    try:
+        from scipy.integrate import odeint
+    except Exception:  # pragma: no cover - graceful fallback
+        ys = np.empty((len(t), 2 * n_sys), dtype=float)
+        ys[0] = state0
+        dt = t[1] - t[0] if len(t) > 1 else 1.0
+        for i in range(1, len(t)):
+            ys[i] = ys[i - 1] + dt * rhs(ys[i - 1], t[i - 1])
+        return ys.reshape(len(t), n_sys, 2)
+
+    # Banded storage: jac[i - j + mu, j] = d f_i / d y_j with mu = ml = 1.
+    banded = np.zeros((3, 2 * n_sys), dtype=float)
+    banded[0, 1::2] = 1.0
+    banded[1, 0::2] = -decay
+    banded[1, 1::2] = -beta
+    banded[2, 0::2] = -alpha
+
+    sol = odeint(rhs, state0, t, Dfun=lambda _y, _t: banded, ml=1, mu=1)
+    return sol.reshape(len(t), n_sys, 2)
+
+
 def compute_equilibrium(params: Dict[str, Any]) -> np.ndarray:
     """Compute fixed point (I*, R*) for the 2D system."""
     decay = _decay_rate(params)
@@ -111,13 +265,88 @@ def compute_equilibrium(params: Dict[str, Any]) -> np.ndarray:
     i_target = params.get("i_target", 1.0)
 
     denom = alpha / beta + decay
-    if np.isclose(denom, 0.0):
+    if np.any(np.isclose(denom, 0.0)):
         raise ValueError("Equilibrium undefined due to zero denominator.")
     inventory_star = (alpha / beta * i_target - demand) / denom
     repl_star = demand + decay * inventory_star
     return np.array([inventory_star, repl_star], dtype=float)
 
 
+@instrument()
+def solve_inventory_system(y0: np.ndarray, t: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    """Exact solution of the linear 2D system for constant parameters.
+
+    The state is split into the equilibrium from `compute_equilibrium` plus a
+    deviation propagated by exp(J * (t - t0)). For a 2x2 matrix the exponential
+    has a closed form in trace and determinant, so all time points (and all
+    systems when parameters are arrays) are evaluated at once without a time
+    loop. Parameters that vary with time (callable values) fall back to
+    `integrate_inventory_system`.
+
+    Args:
+        y0: Initial state [I0, R0] (or shape (N, 2) for array parameters).
+        t: Times at which to evaluate the solution; t[0] is the initial time.
+        params: ODE parameters; values may be scalars or arrays of length N.
+
+    Returns:
+        Array of shape (len(t), 2) for scalar parameters, else (len(t), N, 2).
+    """
+    if any(callable(v) for v in params.values()):
+        return integrate_inventory_system(y0, t, params)
+
+    coeffs = ensemble_parameters(params)
+    n_sys = len(coeffs["decay"])
+    eq = compute_equilibrium(
+        {**params, "inventory_decay_rate": coeffs["decay"], "temperature_sensitivity": 0.0}
+    )
+    eq = np.broadcast_to(eq.reshape(2, -1), (2, n_sys))
+    dev0 = np.broadcast_to(np.asarray(y0, dtype=float), (n_sys, 2)).T - eq
+
+    tau = (np.asarray(t, dtype=float) - t[0])[:, np.newaxis]
+    a, b = -coeffs["decay"], 1.0
+    c, d = -coeffs["alpha"], -coeffs["beta"]
+    c_t, s_t, half_tr = _expm_2x2_terms(a, b, c, d, tau)
+
+    # exp(J tau) = C(tau) * I + S(tau) * (J - s I), with s = trace / 2.
+    dev_i = c_t * dev0[0] + s_t * ((a - half_tr) * dev0[0] + b * dev0[1])
+    dev_r = c_t * dev0[1] + s_t * (c * dev0[0] + (d - half_tr) * dev0[1])
+    out = np.stack([eq[0] + dev_i, eq[1] + dev_r], axis=-1)
+    if all(np.ndim(v) == 0 for v in params.values()) and np.ndim(y0) == 1:
+        return out[:, 0, :]
+    return out
+
+
+def transition_matrices(params: Dict[str, Any], dt: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Equilibria and exact one-step transition matrices exp(J * dt).
+
+    Over a step of length dt with constant parameters,
+    x(t + dt) = eq + Phi @ (x(t) - eq).
+
+    Args:
+        params: ODE parameters; values may be arrays of length N.
+        dt: Step length.
+
+    Returns:
+        Tuple (eq, phi) with shapes (N, 2) and (N, 2, 2).
+    """
+    coeffs = ensemble_parameters(params)
+    n_sys = len(coeffs["decay"])
+    eq = compute_equilibrium(
+        {**params, "inventory_decay_rate": coeffs["decay"], "temperature_sensitivity": 0.0}
+    )
+    eq = np.broadcast_to(eq.reshape(2, -1), (2, n_sys)).T
+    a, b = -coeffs["decay"], 1.0
+    c, d = -coeffs["alpha"], -coeffs["beta"]
+    c_t, s_t, half_tr = _expm_2x2_terms(a, b, c, d, np.array([[float(dt)]]))
+    c_t, s_t = c_t[0], s_t[0]
+    phi = np.empty((n_sys, 2, 2), dtype=float)
+    phi[:, 0, 0] = c_t + s_t * (a - half_tr)
+    phi[:, 0, 1] = s_t * b
+    phi[:, 1, 0] = s_t * c
+    phi[:, 1, 1] = c_t + s_t * (d - half_tr)
+    return eq, phi
+
+
 def compute_nullclines(params: Dict[str, Any]):
     """Return nullcline functions for dI/dt=0 and dR/dt=0.
 
@@ -167,3 +396,38 @@ def classify_equilibrium(params: Dict[str, Any]) -> Dict[str, Any]:
 
     is_stable = bool(np.all(real < 0)) if eq_type != "center" else True
     return {"type": eq_type, "eigenvalues": eigvals, "is_stable": is_stable}
+
+
+def _expm_2x2_terms(a, b, c, d, tau):
+    """Return (C, S, s) with exp(A tau) = C * I + S * (A - s I) for A=[[a, b], [c, d]].
+
+    `tau` has shape (T, 1) and the coefficients shape (N,). Real, complex and
+    repeated eigenvalue cases are evaluated only on their own columns, using
+    overflow-safe exponential forms.
+    """
+    half_tr = 0.5 * (a + d)
+    q2 = (0.5 * (a - d)) ** 2 + b * c
+    q = np.sqrt(np.abs(q2))
+    shape = (tau.shape[0], q.shape[0])
+    c_t = np.empty(shape)
+    s_t = np.empty(shape)
+
+    with np.errstate(over="ignore", invalid="ignore"):
+        real = (q2 > 0) & (q > 0)
+        if real.any():
+            s_r, q_r = half_tr[real], q[real]
+            lam_lo = np.exp((s_r - q_r) * tau)
+            growth = np.expm1(2.0 * q_r * tau)
+            c_t[:, real] = lam_lo * (1.0 + 0.5 * growth)
+            s_t[:, real] = lam_lo * growth / (2.0 * q_r)
+        osc = (q2 < 0) & (q > 0)
+        if osc.any():
+            decay = np.exp(half_tr[osc] * tau)
+            c_t[:, osc] = decay * np.cos(q[osc] * tau)
+            s_t[:, osc] = decay * np.sin(q[osc] * tau) / q[osc]
+        repeated = ~(real | osc)
+        if repeated.any():
+            decay = np.exp(half_tr[repeated] * tau)
+            c_t[:, repeated] = decay
+            s_t[:, repeated] = tau * decay
+    return c_t, s_t, half_tr
@@ -0,0 +1,220 @@
+"""Stage DAG behind `main.py --action run` with content-hash caching.
+
+Stages: load -> select -> explode -> preprocess -> metrics -> models -> report.
+
+Stage functions live in `pipeline_stages`; each output is stored with its
+content digest in a `stage_cache.StageCache`. A stage's cache key hashes its
+name, its parameters and the digests of its inputs, so a rerun skips every
+stage whose inputs and parameters are unchanged, and a recomputed stage that
+yields identical content does not invalidate anything downstream.
+"""
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+import pandas as pd
+
+from src import instrumentation
+from src.pipeline_stages import (
+    export_golden_sample,
+    stage_explode,
+    stage_load,
+    stage_metrics,
+    stage_models,
+    stage_preprocess,
+    stage_report,
+    stage_select,
+)
+from src.stage_cache import StageCache, hash_params
+
+try:  # Optional dependency
+    import yaml  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    yaml = None
+
+DEFAULT_PIPELINE = {
+    "repo": "Dingdong-Inc/FreshRetailNet-50K",
+    "split": "train",
+    "start_hour": 8,
+    "end_hour": 22,
+    "cache_dir": "data/cache/pipeline",
+    "metrics_cache_dir": "data/cache/results",
+    "golden_sample_path": "data/golden_sample.parquet",
+    "report_path": "docs/reports/task3_chaos_report.html",
+    "summary_path": "docs/reports/pipeline_summary.json",
+}
+
+
+def load_config(config_path: Path = Path("config/params.yaml")) -> Dict[str, Any]:
+    """Read params.yaml and fill the pipeline section with defaults."""
+    data: Dict[str, Any] = {}
+    if yaml is not None and Path(config_path).exists():
+        with open(config_path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+    data["pipeline"] = {**DEFAULT_PIPELINE, **(data.get("pipeline") or {})}
+    return data
+
+
+# (name, dependencies, function, config keys hashed into the stage key)
+STAGES: List[Tuple[str, Tuple[str, ...], Callable[..., Any], Tuple[str, ...]]] = [
+    ("load", (), stage_load, ("pipeline.repo", "pipeline.split")),
+    ("select", ("load",), stage_select, ()),
+    ("explode", ("load", "select"), stage_explode, ()),
+    ("preprocess", ("explode",), stage_preprocess, ("pipeline.start_hour", "pipeline.end_hour")),
+    # Only the per-metric keyword sections of `chaos:` (e.g. chaos.hurst.min_window) reach the bundle.
+    (
+        "metrics",
+        ("explode", "preprocess"),
+        stage_metrics,
+        ("chaos.hurst", "chaos.d2", "chaos.d2_scan", "chaos.spectral"),
+    ),
+    ("models", ("preprocess",), stage_models, ("ode", "linear_model")),
+    (
+        "report",
+        ("select", "explode", "metrics", "models"),
+        stage_report,
+        ("ode", "pipeline.start_hour", "pipeline.end_hour", "pipeline.report_path", "pipeline.summary_path"),
+    ),
+]
+STAGE_NAMES = tuple(name for name, *_ in STAGES)
+_SPEC = {name: (deps, func, keys) for name, deps, func, keys in STAGES}
+
+
+def _with_defaults(config: Dict[str, Any] | None) -> Dict[str, Any]:
+    if config is None:
+        return load_config()
+    return {**config, "pipeline": {**DEFAULT_PIPELINE, **(config.get("pipeline") or {})}}
+
+
+def _stage_key(name: str, config: Dict[str, Any], digests: Dict[str, str]) -> Tuple[str, Dict[str, Any]]:
+    """Cache key from stage name, hashed parameters and input digests."""
+    deps, _, param_keys = _SPEC[name]
+    params = _stage_params(config, param_keys)
+    hashed = {k: params[k.split(".")[-1]] for k in param_keys}
+    return hash_params(name, hashed, [digests[d] for d in deps]), params
+
+
+def _lookup(config: Dict[str, Any], dotted: str) -> Any:
+    value: Any = config
+    for part in dotted.split("."):
+        value = (value or {}).get(part)
+    return value
+
+
+def _stage_params(config: Dict[str, Any], keys: Sequence[str]) -> Dict[str, Any]:
+    params = dict(config["pipeline"])
+    params.update({key.split(".")[-1]: _lookup(config, key) for key in keys})
+    return params
+
+
+def _required(targets: Iterable[str]) -> List[str]:
+    deps = {name: d for name, d, *_ in STAGES}
+    needed: set[str] = set()
+    stack = list(targets)
+    while stack:
+        name = stack.pop()
+        if name not in deps:
+            raise ValueError(f"Unknown stage '{name}'. Choose from {STAGE_NAMES}")
+        if name not in needed:
+            needed.add(name)
+            stack.extend(deps[name])
+    return [name for name in STAGE_NAMES if name in needed]
+
+
+def run_pipeline(
+    config: Dict[str, Any] | None = None,
+    targets: Sequence[str] | None = None,
+    force: Sequence[str] = (),
+    log: Callable[[str], None] = print,
+) -> Dict[str, Any]:
+    """Run the stages needed for targets, reusing cached outputs.
+
+    Cache hits are resolved from the recorded digests alone; a cached output
+    is only read when a stage that has to run depends on it, or when it is a
+    target. A fully cached run therefore never reads the "load" parquet.
+
+    Args:
+        config: Parsed params.yaml (see `load_config`); loaded when None.
+        targets: Stages to produce (default: the final "report" stage, which
+            requires every other stage).
+        force: Stage names to recompute even on a cache hit ("all" for every stage).
+        log: Progress callback.
+
+    Returns:
+        Dict with outputs (stage -> output, for the targets and every stage
+        that ran or was read), digests, keys and a status per stage
+        ("cached" or "ran" with seconds).
+    """
+    config = _with_defaults(config)
+    cache = StageCache(Path(config["pipeline"]["cache_dir"]))
+    targets = list(targets or _sinks())
+    plan = _required(targets)
+    forced = set(STAGE_NAMES) if "all" in force else set(force)
+    golden_path = Path(config["pipeline"]["golden_sample_path"])
+
+    outputs: Dict[str, Any] = {}
+    digests: Dict[str, str] = {}
+    keys: Dict[str, str] = {}
+    status: Dict[str, str] = {}
+
+    def output(name: str) -> Any:
+        # Cached outputs are read only when a stage that runs (or the caller) needs them.
+        if name not in outputs:
+            hit = cache.load(name, keys[name])
+            if hit is None:
+                raise RuntimeError(f"Cached output of stage '{name}' is unreadable; rerun with --force {name}")
+            outputs[name] = hit[0]
+        return outputs[name]
+
+    for name in plan:
+        deps, func, _ = _SPEC[name]
+        key, params = _stage_key(name, config, digests)
+        keys[name] = key
+        with instrumentation.stage(f"pipeline.{name}") as span:
+            digest = None if name in forced else cache.digest(name, key)
+            if digest is not None:
+                digests[name] = digest
+                status[name] = "cached"
+                log(f"[pipeline] {name}: cached ({key[:12]})")
+            else:
+                start = time.perf_counter()
+                outputs[name] = func({d: output(d) for d in deps}, params)
+                digests[name] = cache.save(name, key, outputs[name])
+                status[name] = f"ran in {time.perf_counter() - start:.2f}s"
+                log(f"[pipeline] {name}: {status[name]} ({key[:12]})")
+            if span is not None:
+                span.rows = len(outputs[name]) if isinstance(outputs.get(name), pd.DataFrame) else None
+                span.meta.update(cached=digest is not None, key=key[:12])
+        if name == "explode" and (status[name] != "cached" or not golden_path.exists()):
+            export_golden_sample(output(name), golden_path)
+    for name in targets:
+        output(name)
+    return {"outputs": outputs, "digests": digests, "keys": keys, "status": status}
+
+
+def _sinks() -> List[str]:
+    """Stages no other stage depends on (the default targets)."""
+    used = {d for _, deps, *_ in STAGES for d in deps}
+    return [name for name in STAGE_NAMES if name not in used]
+
+
+def pipeline_status(config: Dict[str, Any] | None = None) -> Dict[str, str]:
+    """Report which stages would be served from cache without running anything."""
+    config = _with_defaults(config)
+    cache = StageCache(Path(config["pipeline"]["cache_dir"]))
+    digests: Dict[str, str] = {}
+    status: Dict[str, str] = {}
+    for name, deps, *_ in STAGES:
+        if any(d not in digests for d in deps):
+            status[name] = "pending (upstream not cached)"
+            continue
+        key, _ = _stage_key(name, config, digests)
+        digest = cache.digest(name, key)
+        if digest is not None:
+            digests[name] = digest
+            status[name] = "cached"
+        else:
+            status[name] = "stale"
+    return status
@@ -0,0 +1,132 @@
+"""Stage functions of the `pipeline` DAG.
+
+Every stage takes the outputs of its dependencies (by stage name) and its
+parameters: the `pipeline:` section of params.yaml plus the config keys the
+stage hashes into its cache key (see `pipeline.STAGES`).
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+
+def stage_load(inputs: Dict[str, Any], params: Dict[str, Any]) -> pd.DataFrame:
+    """Full FreshRetailNet-50K split (daily rows with hourly lists)."""
+    from src import data_loader
+
+    return data_loader.load_full_dataset(params["repo"], split=params["split"])
+
+
+def stage_select(inputs: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+    """Golden-sample SKU chosen from the full dataset."""
+    from src import data_loader
+
+    store_id, product_id = data_loader.find_golden_sample_vectorized(inputs["load"].copy())
+    return {"store_id": store_id, "product_id": product_id}
+
+
+def stage_explode(inputs: Dict[str, Any], params: Dict[str, Any]) -> pd.DataFrame:
+    """Hourly series of the selected SKU."""
+    from src import data_loader
+
+    sku = inputs["select"]
+    return data_loader.explode_sku(inputs["load"], sku["store_id"], sku["product_id"])
+
+
+def stage_preprocess(inputs: Dict[str, Any], params: Dict[str, Any]) -> pd.DataFrame:
+    """Daytime hours of the exploded series."""
+    from src import preprocessing
+
+    df = inputs["explode"].copy()
+    df["dt"] = pd.to_datetime(df["dt"])
+    if "hour_index" not in df.columns:
+        df["hour_index"] = df["dt"].dt.hour
+    return preprocessing.filter_daytime_hours(
+        df, "hour_index", start=params["start_hour"], end=params["end_hour"]
+    ).reset_index(drop=True)
+
+
+def stage_metrics(inputs: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+    """Chaos metrics bundle of the daytime series (spectrum on the full day)."""
+    from src import metrics_bundle
+
+    series = inputs["preprocess"]["sales"].to_numpy(dtype=float)
+    bundle_params = {name: params[name] for name in metrics_bundle.METRICS if params.get(name)}
+    bundle = metrics_bundle.get_metrics_bundle(
+        series,
+        bundle_params or None,
+        cache_dir=params["metrics_cache_dir"],
+        spectral_series=metrics_bundle.regular_hourly_series(inputs["explode"]),
+    )
+    return {name: bundle[name] for name in metrics_bundle.METRICS}
+
+
+def stage_models(inputs: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+    """Equilibrium, stability, margins and demand simulation of the inventory models."""
+    from src import acs_simulation, linear_model, nonlinear_model
+
+    ode = params.get("ode") or {}
+    linear = params.get("linear_model") or {}
+    sales = inputs["preprocess"]["sales"].to_numpy(dtype=float)
+    system = linear_model.InventoryControlSystem(
+        kp=float(linear.get("integrator_gain", 1.0)), delay=float(linear.get("delay", 0.0))
+    )
+    freq = system.frequency_response()
+    target = acs_simulation.base_stock_level(sales, system.delay)
+    sim = acs_simulation.simulate_batch(sales, system.kp, target, system.delay, policy="pid")
+    service = acs_simulation.simulation_metrics(sim, sales)
+    return {
+        "equilibrium": nonlinear_model.compute_equilibrium(ode),
+        "classification": nonlinear_model.classify_equilibrium(ode),
+        "stability": system.analyze_stability(),
+        "margins": {k: freq[k] for k in ("gain_crossover", "phase_margin_deg", "phase_crossover", "gain_margin")},
+        "demand_simulation": {"i_target": target, **{k: float(v[0]) for k, v in service.items()}},
+    }
+
+
+def stage_report(inputs: Dict[str, Any], params: Dict[str, Any]) -> Path:
+    """Task 3 HTML report plus the JSON run summary; returns the report path."""
+    from src import report_generator
+
+    report_path = Path(params["report_path"])
+    report_generator.generate_task3_report(
+        Path(params["golden_sample_path"]),
+        report_path,
+        start_hour=params["start_hour"],
+        end_hour=params["end_hour"],
+        df=inputs["explode"],
+        metrics=inputs["metrics"],
+        ode_params=params.get("ode") or {},
+    )
+    summary = {
+        "sku": inputs["select"],
+        "metrics": {name: _scalars(res) for name, res in inputs["metrics"].items()},
+        "models": _scalars(inputs["models"]),
+    }
+    summary_path = Path(params["summary_path"])
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    summary_path.write_text(json.dumps(summary, indent=2, default=str))
+    return report_path
+
+
+def _scalars(obj: Any) -> Any:
+    """JSON-friendly view keeping scalars and short arrays."""
+    if isinstance(obj, dict):
+        return {k: _scalars(v) for k, v in obj.items()}
+    if isinstance(obj, np.ndarray):
+        if obj.size > 16:
+            return None
+        return [str(v) if np.iscomplexobj(obj) else float(v) for v in obj.ravel()]
+    if isinstance(obj, (np.floating, np.integer, np.bool_)):
+        return obj.item()
+    return obj
+
+
+def export_golden_sample(df: pd.DataFrame, path: Path) -> None:
+    """Keep data/golden_sample.parquet in sync for the standalone scripts."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(path)
@@ -6,7 +6,10 @@ from typing import List
 import pandas as pd
 import numpy as np
 
+from src.instrumentation import instrument
 
+
+@instrument()
 def explode_hours_sale(df: pd.DataFrame, hours_col: str = "hours_sale") -> pd.DataFrame:
     """Explode a column of lists (`hours_sale`) into hourly rows.
 
@@ -26,6 +29,7 @@ def explode_hours_sale(df: pd.DataFrame, hours_col: str = "hours_sale") -> pd.Da
     return exploded
 
 
+@instrument()
 def impute_stockouts(df: pd.DataFrame, value_col: str = "sales") -> pd.DataFrame:
     """Impute zeros or stockouts intelligently using forward-fill and linear interpolation.
 
@@ -44,6 +48,7 @@ def impute_stockouts(df: pd.DataFrame, value_col: str = "sales") -> pd.DataFrame
     return out
 
 
+@instrument()
 def filter_daytime_hours(
     df: pd.DataFrame,
     hour_col: str = "hour_index",
@@ -70,6 +75,7 @@ def filter_daytime_hours(
     return out.loc[mask].reset_index(drop=True)
 
 
+@instrument()
 def aggregate_daily(
     df: pd.DataFrame,
     dt_col: str = "dt",
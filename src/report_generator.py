@@ -1,4 +1,12 @@
-"""HTML report generation for Task 3 chaos analysis."""
+"""HTML report generation for Task 3 chaos analysis (single series).
+
+The per-SKU batch mode lives in `batch_reports`; page assembly and the
+lightweight figure renderer in `html_report`.
+"""
+from __future__ import annotations
+
+import html
+import os
 from pathlib import Path
 import sys
 
@@ -14,7 +22,9 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from src import chaos_metrics, nonlinear_model, preprocessing, visualization
+from src import metrics_bundle, nonlinear_model, visualization
+from src.html_report import LightFigureRenderer, fig_to_html, page_head, write_plotly_asset
+from src.instrumentation import instrument
 
 
 def _load_ode_params(config_path: Path) -> dict:
@@ -24,89 +34,61 @@ def _load_ode_params(config_path: Path) -> dict:
         data = yaml.safe_load(f) or {}
     return data.get("ode", {})
 
-def generate_task3_report(
-    data_path: Path,
-    output_path: Path,
-    start_hour: int = 8,
-    end_hour: int = 22,
-) -> None:
-    """Generate comprehensive HTML report."""
-    print(f"Generating HTML report from {data_path}...")
-    
-    # 1. Load Data
-    df = pd.read_parquet(data_path)
-    if "dt" not in df.columns:
-        raise KeyError("dt column is required")
-    df = df.copy()
-    df["dt"] = pd.to_datetime(df["dt"])
-    if "hour_index" not in df.columns:
-        df["hour_index"] = df["dt"].dt.hour
-
-    df_day = preprocessing.filter_daytime_hours(df, "hour_index", start=start_hour, end=end_hour)
-    hourly_series = df_day["sales"].to_numpy()
-    
-    # 2. Compute Metrics (Hourly only, as Daily is too short)
-    print("Computing Chaos Metrics (Hourly)...")
-    hurst_res = chaos_metrics.hurst_rs_details(hourly_series)
-    d2_res = chaos_metrics.correlation_dimension_details(hourly_series)
-    d2_scan = chaos_metrics.correlation_dimension_scan(hourly_series)
-    
-    # 3. Generate Figures
-    print("Generating Plots...")
-    # Time Series
-    fig_ts = visualization.plot_time_series_with_stockouts(
-        df_day, time_col="dt", sales_col="sales", stockout_col="is_stockout"
-    )
-    
-    # Phase Portrait (chaos embedding)
-    fig_phase = visualization.plot_phase_portrait(hourly_series, delay=1)
 
-    # Phase Portrait (nonlinear model)
-    ode_params = _load_ode_params(Path("config/params.yaml"))
+def phase_nl_figure(ode_params: dict | None = None):
+    """Nonlinear-model phase portrait; depends only on the ODE parameters.
+
+    ode_params defaults to the "ode" section of config/params.yaml.
+    """
+    if ode_params is None:
+        ode_params = _load_ode_params(Path("config/params.yaml"))
     eq = nonlinear_model.compute_equilibrium(ode_params)
     i_span = max(abs(eq[0]) * 0.5, 1.0)
     r_span = max(abs(eq[1]) * 0.5, 1.0)
-    fig_phase_nl = visualization.plot_phase_portrait_with_nullclines(
+    return visualization.plot_phase_portrait_with_nullclines(
         ode_params,
         i_range=(eq[0] - i_span, eq[0] + i_span),
         r_range=(eq[1] - r_span, eq[1] + r_span),
         grid_size=15,
     )
-    
-    # Hurst Plot
-    if hurst_res.get("valid"):
-        fig_hurst = visualization.plot_hurst_fit(hurst_res)
-    else:
-        fig_hurst = None
-        
-    # D2 Plot
-    if d2_res.get("valid"):
-        fig_d2 = visualization.plot_correlation_dim(d2_res)
-    else:
-        fig_d2 = None
 
-    fig_d2_sat = visualization.plot_dimension_saturation(d2_scan["m"], d2_scan["d2"])
 
-    # 4. Compile HTML
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <title>Systems Theory: Chaos Analysis Report</title>
-        <style>
-            body {{ font-family: sans-serif; max-width: 1200px; margin: 0 auto; padding: 20px; }}
-            h1, h2 {{ color: #2c3e50; }}
-            .metric-card {{ background: #f8f9fa; padding: 15px; border-radius: 5px; margin-bottom: 20px; }}
-            .plot-container {{ margin-bottom: 40px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); }}
-        </style>
-        <script type="text/javascript">
-            {get_plotlyjs()}
-        </script>
-    </head>
+def series_figures(df_day: pd.DataFrame, metrics: dict) -> dict:
+    """Per-series figures keyed by report section (None when a metric is invalid)."""
+    hurst_res = metrics["hurst"]
+    d2_res = metrics["d2"]
+    d2_scan = metrics["d2_scan"]
+    spectral_res = metrics["spectral"]
+    return {
+        # Time Series
+        "ts": visualization.plot_time_series_with_stockouts(
+            df_day, time_col="dt", sales_col="sales", stockout_col="is_stockout"
+        ),
+        # Phase Portrait (chaos embedding)
+        "phase": visualization.plot_phase_portrait(df_day["sales"].to_numpy(), delay=1),
+        "hurst": visualization.plot_hurst_fit(hurst_res) if hurst_res.get("valid") else None,
+        "psd": visualization.plot_power_spectrum(spectral_res) if spectral_res.get("valid") else None,
+        "d2": visualization.plot_correlation_dim(d2_res) if d2_res.get("valid") else None,
+        "d2_sat": visualization.plot_dimension_saturation(d2_scan["m"], d2_scan["d2"]),
+    }
+
+
+def report_body(
+    dataset: str,
+    start_hour: int,
+    end_hour: int,
+    metrics: dict,
+    plots: dict,
+) -> str:
+    """Report <body>: metric summary and one section per rendered plot."""
+    hurst_res = metrics["hurst"]
+    d2_res = metrics["d2"]
+    d2_scan = metrics["d2_scan"]
+    spectral_res = metrics["spectral"]
+    return f"""
     <body>
         <h1>Task 3: Chaos Theory Analysis</h1>
-        <p><b>Dataset:</b> FreshRetailNet-50K (Golden Sample)</p>
+        <p><b>Dataset:</b> {html.escape(dataset)}</p>
         <p><b>Analysis Window:</b> {start_hour}:00 - {end_hour}:00 (Daytime hours only)</p>
         
         <div class="metric-card">
@@ -116,6 +98,10 @@ def generate_task3_report(
                     (R² = {hurst_res.get('r2', 0.0):.4f})
                     <br><i>Interpretation:</i> {interpret_hurst(hurst_res.get('H', 0.5))}
                 </li>
+                <li><b>Spectral Hurst (H<sub>spec</sub>):</b> {spectral_res.get('H', 0.5):.4f}
+                    (R² = {spectral_res.get('r2', 0.0):.4f}, dominant period = {spectral_res.get('dominant_period', 0.0):.1f} h)
+                    <br><i>Interpretation:</i> {interpret_hurst(spectral_res.get('H', 0.5))}
+                </li>
                 <li><b>Correlation Dimension (D2):</b> {d2_res.get('D2', 0.0):.4f}
                     (R² = {d2_res.get('r2', 0.0):.4f})
                     <br><i>Interpretation:</i> Fractal dimension indicating {interpret_d2(d2_res.get('D2', 0.0))} degrees of freedom.
@@ -125,33 +111,103 @@ def generate_task3_report(
         </div>
 
         <h2>1. Time Series Dynamics</h2>
-        <div class="plot-container">{fig_to_html(fig_ts)}</div>
+        <div class="plot-container">{plots["ts"]}</div>
 
         <h2>2. Phase Space Reconstruction</h2>
         <p>Visualization of the attractor in 2D embedding (x(t) vs x(t+1)).</p>
-        <div class="plot-container">{fig_to_html(fig_phase)}</div>
+        <div class="plot-container">{plots["phase"]}</div>
 
         <h2>3. Nonlinear Model Phase Portrait</h2>
         <p>Phase portrait with nullclines and vector field for the nonlinear inventory model.</p>
-        <div class="plot-container">{fig_to_html(fig_phase_nl)}</div>
+        <div class="plot-container">{plots["phase_nl"]}</div>
 
         <h2>4. R/S Analysis (Hurst Estimation)</h2>
         <p>Log-Log plot of Rescaled Range vs Time Scale.</p>
-        <div class="plot-container">{fig_to_html(fig_hurst)}</div>
+        <div class="plot-container">{plots["hurst"]}</div>
+
+        <h2>5. Power Spectrum (Spectral Hurst)</h2>
+        <p>Welch PSD with the dominant cycle marked; the low-frequency slope gives H = (1 + beta) / 2 as a cross-check on R/S.</p>
+        <div class="plot-container">{plots["psd"]}</div>
 
-        <h2>5. Correlation Sum (D2 Estimation)</h2>
+        <h2>6. Correlation Sum (D2 Estimation)</h2>
         <p>Log-Log plot of Correlation Integral C(r) vs Radius r.</p>
-        <div class="plot-container">{fig_to_html(fig_d2)}</div>
+        <div class="plot-container">{plots["d2"]}</div>
 
-        <h2>6. Dimension Saturation Analysis</h2>
+        <h2>7. Dimension Saturation Analysis</h2>
         <p>D2 vs embedding dimension; saturation indicates low-dimensional dynamics.</p>
-        <div class="plot-container">{fig_to_html(fig_d2_sat)}</div>
+        <div class="plot-container">{plots["d2_sat"]}</div>
         
         <hr>
         <p><i>Generated by Systems Theory Pipeline</i></p>
     </body>
     </html>
     """
+
+
+@instrument()
+def generate_task3_report(
+    data_path: Path,
+    output_path: Path,
+    start_hour: int = 8,
+    end_hour: int = 22,
+    df: pd.DataFrame | None = None,
+    metrics: dict | None = None,
+    light: bool = False,
+    asset_dir: Path | None = None,
+    max_points: int = 2000,
+    ode_params: dict | None = None,
+) -> None:
+    """Generate comprehensive HTML report.
+
+    Args:
+        data_path: Golden sample parquet (read only when df is not given).
+        output_path: HTML destination.
+        start_hour: Daytime window start (inclusive).
+        end_hour: Daytime window end (inclusive).
+        df: Already loaded hourly golden sample (e.g. from the pipeline cache).
+        metrics: Precomputed `metrics_bundle` for the sample; by default it
+            is fetched from (or added to) the shared bundle cache.
+        light: Reference a shared plotly.js asset instead of inlining it,
+            serialize traces as base64 typed arrays and LTTB-decimate dense
+            traces to max_points (kilobyte-sized reports).
+        asset_dir: Where the shared plotly.js is written in light mode
+            (default: an "assets" folder next to the report).
+        max_points: Point budget per trace in light mode.
+        ode_params: Nonlinear-model parameters for the phase portrait
+            (default: the "ode" section of config/params.yaml).
+    """
+    print(f"Generating HTML report from {data_path if df is None else 'in-memory sample'}...")
+    
+    # 1. Load Data
+    if df is None:
+        df = pd.read_parquet(data_path)
+    
+    # 2. Compute Metrics (Hourly only, as Daily is too short; shared with the figure export)
+    print("Loading Chaos Metrics bundle (Hourly)...")
+    if metrics is None:
+        df_day, metrics = metrics_bundle.daytime_bundle(df, start_hour, end_hour)
+    else:
+        df_day = metrics_bundle.load_daytime_sample(start_hour=start_hour, end_hour=end_hour, df=df)
+    
+    # 3. Generate Figures
+    print("Generating Plots...")
+    figures = series_figures(df_day, metrics)
+    figures["phase_nl"] = phase_nl_figure(ode_params)
+
+    # 4. Compile HTML
+    if light:
+        asset = write_plotly_asset(asset_dir or output_path.parent / "assets")
+        renderer = LightFigureRenderer(max_points)
+    else:
+        renderer = fig_to_html
+    plots = {name: renderer(fig) for name, fig in figures.items()}
+    if light:
+        plotly_head = renderer.head(os.path.relpath(asset, output_path.parent))
+    else:
+        plotly_head = f'<script type="text/javascript">{get_plotlyjs()}</script>'
+    html_content = page_head("Systems Theory: Chaos Analysis Report", plotly_head) + report_body(
+        "FreshRetailNet-50K (Golden Sample)", start_hour, end_hour, metrics, plots
+    )
     
     output_path.parent.mkdir(parents=True, exist_ok=True)
     with open(output_path, "w", encoding="utf-8") as f:
@@ -159,21 +215,18 @@ def generate_task3_report(
     
     print(f"Report saved to: {output_path.resolve()}")
 
+
 def interpret_hurst(h):
     if h < 0.45: return "Anti-persistent (Mean reverting)"
     if 0.45 <= h <= 0.55: return "Random Walk (Stochastic)"
     return "Persistent (Trending/Memory)"
 
+
 def interpret_d2(d2):
     if d2 < 0.1: return "Fixed Point (Static)"
     if d2 < 1.1: return "Limit Cycle (Periodic)"
     return "Low-dimensional Chaos or Strange Attractor"
 
-def fig_to_html(fig):
-    if fig is None:
-        return "<p><i>Plot not available (insufficient data)</i></p>"
-    return fig.to_html(full_html=False, include_plotlyjs=False)
-
 if __name__ == "__main__":
     # Test run
     generate_task3_report(
@@ -0,0 +1,230 @@
+"""Content-addressed memoization for pure metric functions.
+
+Chaos diagnostics are pure functions of (series, parameters), so their
+results can be reused across scripts, reports and runs:
+
+    result_cache.call(chaos_metrics.hurst_rs_details, series, use_sklearn=True)
+
+The key is a SHA-256 over the function's qualified name, the source of its
+module, CACHE_VERSION and every bound argument (defaults applied). Arrays,
+pandas Series and nested lists/dicts are hashed by dtype, shape and raw bytes,
+so equal inputs hit whether they were passed positionally or by keyword, and
+editing the metric module invalidates its entries.
+
+Results live in two tiers:
+
+- memory: an LRU of pickled results bounded by max_memory_bytes. Hits are
+  unpickled, so callers can never mutate a cached value.
+- disk: one pickle per key under cache_dir, bounded by max_disk_bytes. Hits
+  refresh the file's mtime, and the oldest files are evicted first. Writes are
+  atomic, so worker processes can share a directory.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+import hashlib
+import inspect
+import json
+import os
+from pathlib import Path
+import pickle
+import sys
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[1] / "data" / "cache" / "results"
+DEFAULT_MAX_MEMORY_BYTES = 256 * 2**20
+DEFAULT_MAX_DISK_BYTES = 2 * 2**30
+
+_MISSING = object()
+_MODULE_DIGESTS: Dict[str, str] = {}
+_CACHES: Dict[Path | None, "ResultCache"] = {}
+
+
+def _update(h: Any, value: Any) -> None:
+    """Feed a canonical encoding of value into the hash h."""
+    if isinstance(value, (pd.Series, pd.Index)):
+        value = value.to_numpy()
+    if isinstance(value, np.ndarray):
+        h.update(f"ndarray:{value.dtype.str}:{value.shape}".encode("utf-8"))
+        if value.dtype == object:
+            h.update(json.dumps(value.tolist(), default=repr).encode("utf-8"))
+        else:
+            h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        h.update(f"dict:{len(value)}".encode("utf-8"))
+        for k in sorted(value, key=repr):
+            _update(h, k)
+            _update(h, value[k])
+    elif isinstance(value, (list, tuple)):
+        h.update(f"{type(value).__name__}:{len(value)}".encode("utf-8"))
+        for item in value:
+            _update(h, item)
+    elif isinstance(value, np.generic):
+        _update(h, value.item())
+    else:
+        h.update(f"{type(value).__name__}:{value!r}".encode("utf-8"))
+
+
+def module_digest(module: str) -> str:
+    """SHA-256 of an imported module's source file (empty if unknown)."""
+    if module not in _MODULE_DIGESTS:
+        path = getattr(sys.modules.get(module), "__file__", None)
+        _MODULE_DIGESTS[module] = hashlib.sha256(Path(path).read_bytes()).hexdigest() if path else ""
+    return _MODULE_DIGESTS[module]
+
+
+def result_key(func: Callable[..., Any], args: Tuple[Any, ...] = (), kwargs: Dict[str, Any] | None = None) -> str:
+    """Cache key for func(*args, **kwargs)."""
+    bound = inspect.signature(func).bind(*args, **(kwargs or {}))
+    bound.apply_defaults()
+    h = hashlib.sha256()
+    _update(h, [CACHE_VERSION, f"{func.__module__}.{func.__qualname__}", module_digest(getattr(func, "__module__", "") or "")])
+    _update(h, dict(bound.arguments))
+    return h.hexdigest()
+
+
+class ResultCache:
+    """Two-tier (memory LRU + disk) store of pickled results keyed by result_key.
+
+    Args:
+        cache_dir: Directory for the disk tier (None = memory only).
+        max_memory_bytes: Budget for pickled results held in memory.
+        max_disk_bytes: Budget for the pickle files in cache_dir.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path | None = DEFAULT_CACHE_DIR,
+        max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES,
+        max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES,
+    ) -> None:
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: int | None = None
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
+
+    def _remember(self, key: str, blob: bytes) -> None:
+        if len(blob) > self.max_memory_bytes:
+            return
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= len(old)
+            self._memory[key] = blob
+            self._memory_bytes += len(blob)
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Cached value for key, or default on a miss."""
+        with self._lock:
+            blob = self._memory.get(key)
+            if blob is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return pickle.loads(blob)
+        if self.cache_dir is not None:
+            path = self._path(key)
+            try:
+                blob = path.read_bytes()
+                value = pickle.loads(blob)
+            except FileNotFoundError:
+                pass
+            except Exception:  # truncated or stale pickle: drop it
+                path.unlink(missing_ok=True)
+            else:
+                os.utime(path)
+                self._remember(key, blob)
+                self.stats["disk_hits"] += 1
+                return value
+        self.stats["misses"] += 1
+        return default
+
+    def put(self, key: str, value: Any) -> None:
+        """Store value under key in both tiers, evicting old entries as needed."""
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._remember(key, blob)
+        if self.cache_dir is None or len(blob) > self.max_disk_bytes:
+            return
+        path = self._path(key)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(blob)
+        tmp.replace(path)
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self.disk_bytes()
+            else:
+                self._disk_bytes += len(blob)
+            over = self._disk_bytes > self.max_disk_bytes
+        if over:
+            self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        entries = []
+        for path in self.cache_dir.glob("*.pkl"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        with self._lock:
+            self._disk_bytes = total
+
+    def disk_bytes(self) -> int:
+        """Total size of the pickle files in cache_dir."""
+        if self.cache_dir is None or not self.cache_dir.exists():
+            return 0
+        return sum(p.stat().st_size for p in self.cache_dir.glob("*.pkl"))
+
+    def call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Return func(*args, **kwargs), computing it only on a cache miss."""
+        key = result_key(func, args, kwargs)
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = func(*args, **kwargs)
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._disk_bytes = 0
+        if self.cache_dir is not None and self.cache_dir.exists():
+            for path in self.cache_dir.glob("*.pkl"):
+                path.unlink(missing_ok=True)
+
+
+def get_cache(cache_dir: Path | None = DEFAULT_CACHE_DIR) -> ResultCache:
+    """Process-wide ResultCache for cache_dir (created with default limits)."""
+    resolved = Path(cache_dir).resolve() if cache_dir is not None else None
+    if resolved not in _CACHES:
+        _CACHES[resolved] = ResultCache(resolved)
+    return _CACHES[resolved]
+
+
+def call(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Memoized func(*args, **kwargs) through the default shared cache."""
+    return get_cache().call(func, *args, **kwargs)
@@ -0,0 +1,85 @@
+"""Vectorized equilibrium classification over (alpha, beta, decay) grids.
+
+For the 2x2 Jacobian J = [[-k, 1], [-alpha, -beta]] the eigenvalue structure
+follows from trace, determinant and the discriminant tr^2 - 4 det, so millions
+of parameter points are classified with a few array operations instead of one
+`np.linalg.eigvals` call per point.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+SADDLE, NODE, FOCUS, CENTER = 0, 1, 2, 3
+LABELS = {SADDLE: "saddle", NODE: "node", FOCUS: "focus", CENTER: "center"}
+
+
+def classify_trace_det(
+    trace: np.ndarray,
+    det: np.ndarray,
+    atol: float = 1e-8,
+) -> Dict[str, np.ndarray]:
+    """Classify 2D linear equilibria from trace and determinant arrays.
+
+    Uses the same rules as `nonlinear_model.classify_equilibrium`.
+
+    Args:
+        trace: Jacobian traces.
+        det: Jacobian determinants (broadcastable with trace).
+        atol: Tolerance for zero discriminant / zero trace.
+
+    Returns:
+        Dict with labels (int8 codes, see LABELS), is_stable (bool) and
+        discriminant arrays.
+    """
+    trace, det = np.broadcast_arrays(np.asarray(trace, dtype=float), np.asarray(det, dtype=float))
+    disc = trace**2 - 4.0 * det
+    labels = np.full(trace.shape, FOCUS, dtype=np.int8)
+    # Imaginary parts below atol count as real eigenvalues (node).
+    labels[disc >= -4.0 * atol**2] = NODE
+    labels[(disc < -4.0 * atol**2) & (np.abs(trace) <= 2.0 * atol)] = CENTER
+    labels[det < 0] = SADDLE
+    is_stable = np.where(labels == CENTER, True, (trace < 0) & (det > 0))
+    return {"labels": labels, "is_stable": is_stable, "discriminant": disc}
+
+
+def stability_map(
+    alpha: Sequence[float],
+    beta: Sequence[float],
+    decay: Sequence[float],
+) -> Dict[str, Any]:
+    """Equilibrium type and stability over a full (alpha, beta, decay) grid.
+
+    Args:
+        alpha: Replenishment gain values (grid axis 0).
+        beta: Replenishment decay values (grid axis 1).
+        decay: Effective inventory decay rates (grid axis 2).
+
+    Returns:
+        Dict with labels and is_stable arrays of shape
+        (len(alpha), len(beta), len(decay)), plus axes, dims and label names.
+    """
+    a = np.asarray(alpha, dtype=float)[:, None, None]
+    b = np.asarray(beta, dtype=float)[None, :, None]
+    k = np.asarray(decay, dtype=float)[None, None, :]
+    result = classify_trace_det(-(k + b), k * b + a)
+    return {
+        "labels": result["labels"],
+        "is_stable": result["is_stable"],
+        "dims": ("alpha", "beta", "decay"),
+        "axes": {
+            "alpha": np.asarray(alpha, dtype=float),
+            "beta": np.asarray(beta, dtype=float),
+            "decay": np.asarray(decay, dtype=float),
+        },
+        "label_names": dict(LABELS),
+    }
+
+
+def region_fractions(result: Dict[str, Any]) -> Dict[str, float]:
+    """Share of grid points per equilibrium type, plus the stable share."""
+    labels = result["labels"]
+    out = {name: float(np.mean(labels == code)) for code, name in LABELS.items()}
+    out["stable"] = float(np.mean(result["is_stable"]))
+    return out
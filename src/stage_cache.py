@@ -0,0 +1,132 @@
+"""Content-addressed on-disk cache for pipeline stage outputs.
+
+Each output is stored as parquet (DataFrames) or pickle (everything else),
+next to a JSON record holding its SHA-256 content digest: the parquet bytes,
+or a structural hash of dicts/arrays/scalars (`content_digest`). Digests are
+what downstream stage keys hash, so an output loaded from disk and the same
+output freshly computed are interchangeable.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import pickle
+import time
+from pathlib import Path
+from typing import Any, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def hash_params(*parts: Any) -> str:
+    """Stable SHA-256 of JSON-serializable parts (keys sorted)."""
+    payload = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's bytes."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def content_digest(obj: Any) -> str:
+    """SHA-256 of an in-memory result, independent of how it was serialized.
+
+    Dicts, lists, arrays and scalars are hashed structurally (dtype, shape
+    and bytes for arrays), so an output loaded from disk and the same output
+    freshly computed share one digest.
+    """
+    h = hashlib.sha256()
+    _update_digest(h, obj)
+    return h.hexdigest()
+
+
+def _update_digest(h: "hashlib._Hash", obj: Any) -> None:
+    if isinstance(obj, dict):
+        h.update(b"dict")
+        for key in sorted(obj, key=str):
+            _update_digest(h, str(key))
+            _update_digest(h, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"seq{len(obj)}".encode())
+        for item in obj:
+            _update_digest(h, item)
+    elif isinstance(obj, np.ndarray):
+        arr = np.ascontiguousarray(obj)
+        h.update(f"nd{arr.dtype.str}{arr.shape}".encode())
+        h.update(arr.tobytes() if arr.dtype != object else repr(arr.tolist()).encode())
+    elif isinstance(obj, Path):
+        h.update(f"path{obj}".encode())
+        h.update(file_digest(obj).encode() if obj.exists() else b"missing")
+    else:
+        h.update(f"{type(obj).__name__}:{obj!r}".encode())
+
+
+class StageCache:
+    """On-disk store of stage outputs keyed by (stage name, cache key)."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+
+    def _paths(self, name: str, key: str) -> Tuple[Path, Path, Path]:
+        stem = self.root / f"{name}-{key[:16]}"
+        return stem.with_suffix(".json"), stem.with_suffix(".parquet"), stem.with_suffix(".pkl")
+
+    def load(self, name: str, key: str) -> Tuple[Any, str] | None:
+        """Return (output, digest) for a cached stage or None on a miss."""
+        meta_path, parquet_path, pickle_path = self._paths(name, key)
+        if not meta_path.exists():
+            return None
+        meta = json.loads(meta_path.read_text())
+        if meta.get("key") != key:
+            return None
+        data_path = parquet_path if meta["format"] == "parquet" else pickle_path
+        if not data_path.exists():
+            return None
+        if meta["format"] == "parquet":
+            output = pd.read_parquet(data_path)
+        else:
+            with open(data_path, "rb") as f:
+                output = pickle.load(f)
+        if isinstance(output, Path) and not output.exists():
+            return None
+        return output, meta["digest"]
+
+    def save(self, name: str, key: str, output: Any) -> str:
+        """Persist a stage output and return its content digest."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        meta_path, parquet_path, pickle_path = self._paths(name, key)
+        if isinstance(output, pd.DataFrame):
+            output.to_parquet(parquet_path)
+            data_path, fmt = parquet_path, "parquet"
+        else:
+            with open(pickle_path, "wb") as f:
+                pickle.dump(output, f, protocol=pickle.HIGHEST_PROTOCOL)
+            data_path, fmt = pickle_path, "pickle"
+        # DataFrames are identified by their parquet bytes, everything else
+        # (including file outputs such as the HTML report) structurally.
+        digest = file_digest(data_path) if fmt == "parquet" else content_digest(output)
+        meta = {"stage": name, "key": key, "format": fmt, "digest": digest, "created": time.time()}
+        if isinstance(output, Path):
+            meta["output_path"] = str(output)
+        meta_path.write_text(json.dumps(meta, indent=2))
+        return digest
+
+    def digest(self, name: str, key: str) -> str | None:
+        """Content digest of a loadable cached stage, without loading its output."""
+        meta_path, parquet_path, pickle_path = self._paths(name, key)
+        if not meta_path.exists():
+            return None
+        meta = json.loads(meta_path.read_text())
+        if meta.get("key") != key:
+            return None
+        if not (parquet_path if meta["format"] == "parquet" else pickle_path).exists():
+            return None
+        if "output_path" in meta and not Path(meta["output_path"]).exists():
+            return None
+        return meta.get("digest")
@@ -0,0 +1,145 @@
+"""Closed-loop state-space form of the inventory control loop.
+
+The lead time enters through a controllable-canonical realization of its
+Padé approximation, so the loop (plant, optional integral state and delay)
+is a plain linear system with inputs [I_target, D]. Realizations and their
+zero-order-hold discretizations are LRU-cached by (Kp, delay, dt) and
+returned read-only.
+"""
+from functools import lru_cache
+from math import factorial
+from typing import Tuple
+
+import numpy as np
+
+
+def pade_polynomials(delay: float, order: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """Padé approximation of e^{-Ls} as (num, den), highest power first.
+
+    Uses c_k = (2n - k)! n! / ((2n)! k! (n - k)!) so that
+    e^{-Ls} ~ sum_k c_k (-Ls)^k / sum_k c_k (Ls)^k.
+    """
+    if delay <= 0.0 or order <= 0:
+        return np.array([1.0]), np.array([1.0])
+    n = int(order)
+    c = np.array(
+        [
+            factorial(2 * n - k) * factorial(n) / (factorial(2 * n) * factorial(k) * factorial(n - k))
+            for k in range(n + 1)
+        ]
+    )
+    powers = delay ** np.arange(n + 1)
+    den = (c * powers)[::-1]
+    num = (c * powers * (-1.0) ** np.arange(n + 1))[::-1]
+    return num, den
+
+
+def _delay_state_space(delay: float, order: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float]:
+    """Controllable-canonical realization (A, B, C, D) of the Padé delay."""
+    num, den = pade_polynomials(delay, order)
+    n = len(den) - 1
+    if n == 0:
+        return np.zeros((0, 0)), np.zeros(0), np.zeros(0), 1.0
+    num = num / den[0]
+    den = den / den[0]
+    feedthrough = float(num[0])
+    a = np.zeros((n, n))
+    a[0, :] = -den[1:]
+    a[np.arange(1, n), np.arange(n - 1)] = 1.0
+    b = np.zeros(n)
+    b[0] = 1.0
+    return a, b, num[1:] - feedthrough * den[1:], feedthrough
+
+
+@lru_cache(maxsize=512)
+def closed_loop_state_space(
+    kp: float,
+    delay: float,
+    pade_order: int = 1,
+    ki: float = 0.0,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Closed-loop realization with state [I, x_delay(, z)] and inputs [I_target, D].
+
+    I' = u(t - L) - D with u = Kp * (I_target - I) + Ki * z and z' = I_target - I
+    (the integral state exists only when ki != 0); the delayed order is the
+    output of the Padé realization driven by u. Built directly from the loop
+    structure, so no polynomial products are formed. Results are cached and
+    returned read-only.
+
+    Returns:
+        (A, B, C, D) with A (m, m), B (m, 2), C (1, m), D (1, 2).
+    """
+    ad, bd, cd, dd = _delay_state_space(delay, pade_order)
+    n = ad.shape[0]
+    m = n + 1 + (ki != 0.0)
+    # u = Kp * (r - I) + Ki * z = ctrl_x @ x + Kp * r
+    ctrl_x = np.zeros(m)
+    ctrl_x[0] = -kp
+    if ki != 0.0:
+        ctrl_x[-1] = ki
+    a = np.zeros((m, m))
+    b = np.zeros((m, 2))
+    a[0] = dd * ctrl_x
+    a[0, 1 : n + 1] += cd
+    a[1 : n + 1] = np.outer(bd, ctrl_x)
+    a[1 : n + 1, 1 : n + 1] += ad
+    b[0] = [dd * kp, -1.0]
+    b[1 : n + 1, 0] = bd * kp
+    if ki != 0.0:
+        a[-1, 0] = -1.0
+        b[-1, 0] = 1.0
+    c = np.zeros((1, m))
+    c[0, 0] = 1.0
+    return _frozen(a, b, c, np.zeros((1, 2)))
+
+
+@lru_cache(maxsize=512)
+def discretize_closed_loop(
+    kp: float,
+    delay: float,
+    dt: float,
+    pade_order: int = 1,
+    ki: float = 0.0,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Zero-order-hold discretization of `closed_loop_state_space`, cached by (Kp, delay, dt).
+
+    Returns:
+        (Phi, Gamma, C, D) so that x[k+1] = Phi x[k] + Gamma u[k].
+    """
+    from scipy.linalg import expm
+
+    a, b, c, d = closed_loop_state_space(kp, delay, pade_order, ki)
+    n, m = b.shape
+    block = np.zeros((n + m, n + m))
+    block[:n, :n] = a
+    block[:n, n:] = b
+    phi_gamma = expm(block * dt)
+    return _frozen(phi_gamma[:n, :n], phi_gamma[:n, n:], c, d)
+
+
+def _frozen(*arrays: np.ndarray) -> Tuple[np.ndarray, ...]:
+    for arr in arrays:
+        arr.setflags(write=False)
+    return arrays
+
+
+def simulate_state_space(
+    phi: np.ndarray,
+    gamma: np.ndarray,
+    c: np.ndarray,
+    u: np.ndarray,
+) -> np.ndarray:
+    """Output of x[k+1] = Phi x[k] + Gamma u[k] from x[0] = 0.
+
+    Args:
+        phi, gamma, c: Discretized system (see `discretize_closed_loop`).
+        u: Inputs per step, shape (n, inputs).
+
+    Returns:
+        Outputs y[0..n], shape (n + 1,).
+    """
+    x = np.zeros((len(u) + 1, phi.shape[0]))
+    drive = np.asarray(u, dtype=float) @ gamma.T
+    for k in range(len(u)):
+        x[k + 1] = phi @ x[k] + drive[k]
+    return x @ c[0]
@@ -18,45 +18,112 @@ def plot_time_series_with_stockouts(
     time_col: str,
     sales_col: str,
     stockout_col: str,
+    max_points: int = 4000,
 ):
-    """Plot sales time series with stockout markers."""
+    """Plot sales time series with stockout markers.
+
+    Series longer than max_points are drawn from their M4 (per-pixel first,
+    last, min, max) subsample, so every spike stays visible. Stockout hours
+    are never dropped: they are drawn as individual markers, or as exact
+    [start, end] episodes when there are more than max_points of them (episodes
+    less than one pixel apart are joined once they too exceed max_points).
+    """
     import plotly.graph_objects as go
 
+    from src import downsampling
+
+    x = df[time_col].to_numpy()
+    y = df[sales_col].to_numpy(dtype=float)
+    n_pixels = max(1, max_points // 4)
+    if len(df) > max_points:
+        keep = downsampling.minmax_indices(downsampling.numeric_x(x), y, n_pixels)
+        x_line, y_line = x[keep], y[keep]
+    else:
+        x_line, y_line = x, y
+
     fig = go.Figure()
     fig.add_trace(
         go.Scatter(
-            x=df[time_col],
-            y=df[sales_col],
+            x=x_line,
+            y=y_line,
             name="Sales",
             line=dict(color="blue", width=1),
         )
     )
     if stockout_col in df.columns:
-        stockouts = df[df[stockout_col] == 1]
-        fig.add_trace(
-            go.Scatter(
-                x=stockouts[time_col],
-                y=stockouts[sales_col],
-                mode="markers",
-                name="Stockout",
-                marker=dict(color="red", size=4),
+        flags = df[stockout_col].to_numpy() == 1
+        if flags.sum() <= max_points:
+            fig.add_trace(
+                go.Scatter(
+                    x=x[flags],
+                    y=y[flags],
+                    mode="markers",
+                    name="Stockout",
+                    marker=dict(color="red", size=4),
+                )
+            )
+        else:
+            runs = downsampling.true_runs(flags)
+            if len(runs) > max_points:
+                # Close gaps narrower than one pixel column: at most n_pixels + 1 episodes.
+                x_num = downsampling.numeric_x(x)
+                runs = downsampling.merge_runs(runs, x_num, (x_num[-1] - x_num[0]) / n_pixels)
+            floor = float(np.nanmin(y)) if len(y) else 0.0
+            gap = np.full(len(runs), None)
+            # Via pd.Index so datetimes stay Timestamps (an object cast of datetime64[ns] gives ints).
+            x_runs = np.empty((len(runs), 3), dtype=object)
+            x_runs[:, 0] = pd.Index(x[runs[:, 0]]).tolist()
+            x_runs[:, 1] = pd.Index(x[runs[:, 1]]).tolist()
+            fig.add_trace(
+                go.Scatter(
+                    x=x_runs.ravel(),
+                    y=np.column_stack([np.full((len(runs), 2), floor), gap]).ravel(),
+                    mode="lines+markers",
+                    name=f"Stockout ({len(runs)} episodes)",
+                    line=dict(color="red", width=4),
+                    marker=dict(color="red", size=3),
+                )
             )
-        )
     fig.update_layout(title="Sales with Stockouts", template="plotly_white")
     return fig
 
 
-def plot_phase_portrait(series: np.ndarray, delay: int = 1):
-    """2D phase portrait x(t) vs x(t+tau)."""
+def plot_phase_portrait(
+    series: np.ndarray,
+    delay: int = 1,
+    raster_threshold: int = 10000,
+    bins: int = 300,
+):
+    """2D phase portrait x(t) vs x(t+tau).
+
+    Embeddings with more than raster_threshold points are rendered as a
+    log-density heatmap (bins x bins pixels) instead of a line, so the figure
+    size no longer grows with the series.
+    """
     import plotly.graph_objects as go
 
+    from src import downsampling
+
     if delay <= 0 or delay >= len(series):
         raise ValueError("delay must be in [1, len(series)-1]")
     x = series[:-delay]
     y = series[delay:]
-    fig = go.Figure(
-        data=go.Scatter(x=x, y=y, mode="lines", line=dict(width=0.5, color="purple"), opacity=0.7)
-    )
+    if len(x) > raster_threshold:
+        raster = downsampling.density_raster(x, y, bins=bins)
+        fig = go.Figure(
+            data=go.Heatmap(
+                z=raster["z"],
+                x=raster["x"],
+                y=raster["y"],
+                colorscale="Purples",
+                colorbar=dict(title="log(1 + count)"),
+                hoverongaps=False,
+            )
+        )
+    else:
+        fig = go.Figure(
+            data=go.Scatter(x=x, y=y, mode="lines", line=dict(width=0.5, color="purple"), opacity=0.7)
+        )
     fig.update_layout(
         title=f"Phase Space Reconstruction (delay={delay})",
         xaxis_title="x(t)",
@@ -75,6 +142,8 @@ def plot_phase_portrait_with_nullclines(
     grid_size: int = 15,
     t: np.ndarray | None = None,
     y0: np.ndarray | None = None,
+    trajectory_grid: int = 0,
+    scale: float = 0.25,
 ):
     """Phase portrait with nullclines and vector field for (I, R).
 
@@ -82,11 +151,14 @@ def plot_phase_portrait_with_nullclines(
         params: Model parameters.
         i_range: (min, max) range for inventory axis.
         r_range: (min, max) range for replenishment axis.
-        grid_size: Grid resolution for quiver field.
+        grid_size: Grid resolution for quiver field (dense grids such as 100
+            are fine; the arrows are one NumPy-built trace).
         t: Optional time vector for trajectory.
-        y0: Optional initial state [I0, R0].
+        y0: Optional initial state [I0, R0], or (N, 2) initial states.
+        trajectory_grid: If > 0, also start trajectories from a
+            trajectory_grid x trajectory_grid grid spanning the axes ranges.
+        scale: Arrow length per unit of (dI/dt, dR/dt).
     """
-    import plotly.figure_factory as ff
     import plotly.graph_objects as go
 
     from src import nonlinear_model
@@ -96,28 +168,12 @@ def plot_phase_portrait_with_nullclines(
     i_vals = np.linspace(i_min, i_max, grid_size)
     r_vals = np.linspace(r_min, r_max, grid_size)
     ii, rr = np.meshgrid(i_vals, r_vals)
+    d_i, d_r = nonlinear_model.vector_field(params, ii, rr)
 
-    decay = params.get("inventory_decay_rate", 0.01)
-    temp_sens = params.get("temperature_sensitivity", 0.0)
-    temperature = params.get("temperature", 20.0)
-    decay = decay * (1 + temp_sens * (temperature - 20.0))
-    demand = params.get("demand", 0.0)
-    alpha = params.get("replenishment_gain", 1.0)
-    beta = params.get("replenishment_decay", 1.0)
-    i_target = params.get("i_target", 1.0)
-
-    d_i = rr - demand - decay * ii
-    d_r = alpha * (i_target - ii) - beta * rr
-
-    fig = ff.create_quiver(
-        ii.flatten(),
-        rr.flatten(),
-        d_i.flatten(),
-        d_r.flatten(),
-        scale=0.25,
-        arrow_scale=0.3,
-        name="Vector Field",
+    qx, qy = _quiver_xy(
+        ii.ravel(), rr.ravel(), d_i.ravel(), d_r.ravel(), scale=scale, arrow_scale=0.3
     )
+    fig = go.Figure(go.Scatter(x=qx, y=qy, mode="lines", name="Vector Field"))
 
     nullcline_i, nullcline_r = nonlinear_model.compute_nullclines(params)
     i_line = np.linspace(i_min, i_max, 200)
@@ -163,23 +219,31 @@ def plot_phase_portrait_with_nullclines(
             ],
             dtype=float,
         )
-    traj = nonlinear_model.integrate_inventory_system(y0, t, params)
+    starts = np.atleast_2d(np.asarray(y0, dtype=float))
+    if trajectory_grid > 0:
+        gi, gr = np.meshgrid(
+            np.linspace(i_min, i_max, trajectory_grid), np.linspace(r_min, r_max, trajectory_grid)
+        )
+        starts = np.vstack([starts, np.column_stack([gi.ravel(), gr.ravel()])])
+    traj = nonlinear_model.phase_trajectories(starts, t, params)
+    # All trajectories share one trace, separated by NaN breaks.
+    gap = np.full((1, traj.shape[1]), np.nan)
     fig.add_trace(
         go.Scatter(
-            x=traj[:, 0],
-            y=traj[:, 1],
+            x=np.vstack([traj[:, :, 0], gap]).T.ravel(),
+            y=np.vstack([traj[:, :, 1], gap]).T.ravel(),
             mode="lines",
-            name="Trajectory",
-            line=dict(color="purple", width=2),
+            name="Trajectory" if len(starts) == 1 else f"Trajectories ({len(starts)})",
+            line=dict(color="purple", width=2 if len(starts) == 1 else 1),
         )
     )
     fig.add_trace(
         go.Scatter(
-            x=[y0[0]],
-            y=[y0[1]],
+            x=starts[:, 0],
+            y=starts[:, 1],
             mode="markers",
             name="Start",
-            marker=dict(symbol="circle", size=8, color="purple"),
+            marker=dict(symbol="circle", size=8 if len(starts) == 1 else 5, color="purple"),
         )
     )
 
@@ -194,6 +258,117 @@ def plot_phase_portrait_with_nullclines(
     return fig
 
 
+def plot_stability_map(result: dict, decay_index: int = 0):
+    """Heatmap of equilibrium type over (alpha, beta) at one decay slice.
+
+    Args:
+        result: Output of `stability_map.stability_map`.
+        decay_index: Index into the decay axis to render.
+    """
+    import plotly.graph_objects as go
+
+    names = result["label_names"]
+    codes = sorted(names)
+    labels = result["labels"][:, :, decay_index].astype(float)
+    stable = result["is_stable"][:, :, decay_index]
+    palette = ["#d62728", "#1f77b4", "#2ca02c", "#7f7f7f"]
+    n = len(codes)
+    colorscale = []
+    for i, code in enumerate(codes):
+        color = palette[code % len(palette)]
+        colorscale += [[i / n, color], [(i + 1) / n, color]]
+    text = np.vectorize(names.get)(labels.astype(int))
+    text = np.where(stable, text, np.char.add(text.astype(str), " (unstable)"))
+    decay = result["axes"]["decay"][decay_index]
+    fig = go.Figure(
+        data=go.Heatmap(
+            x=result["axes"]["beta"],
+            y=result["axes"]["alpha"],
+            z=labels,
+            zmin=-0.5,
+            zmax=n - 0.5,
+            text=text,
+            hovertemplate="alpha=%{y:.3f}<br>beta=%{x:.3f}<br>%{text}<extra></extra>",
+            colorscale=colorscale,
+            colorbar=dict(tickvals=codes, ticktext=[names[c] for c in codes]),
+        )
+    )
+    fig.update_layout(
+        title=f"Equilibrium Type Map (decay={decay:.3g})",
+        xaxis_title="Replenishment decay beta",
+        yaxis_title="Replenishment gain alpha",
+        template="plotly_white",
+    )
+    return fig
+
+
+def plot_bode(response: dict):
+    """Bode magnitude/phase of the open loop with crossover markers.
+
+    Args:
+        response: Output of `InventoryControlSystem.frequency_response`.
+    """
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    w = response["w"]
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.06)
+    fig.add_trace(go.Scatter(x=w, y=response["magnitude_db"], mode="lines", name="|L(jw)|"), row=1, col=1)
+    fig.add_trace(go.Scatter(x=w, y=response["phase_deg"], mode="lines", name="arg L(jw)"), row=2, col=1)
+    fig.add_hline(y=0.0, line=dict(color="gray", dash="dot"), row=1, col=1)
+    fig.add_hline(y=-180.0, line=dict(color="gray", dash="dot"), row=2, col=1)
+    for key, color in (("gain_crossover", "#2ca02c"), ("phase_crossover", "#d62728")):
+        if np.isfinite(response.get(key, np.nan)):
+            fig.add_vline(x=response[key], line=dict(color=color, dash="dash"))
+    pm = response.get("phase_margin_deg", np.nan)
+    gm = response.get("gain_margin_db", np.nan)
+    fig.update_xaxes(type="log")
+    fig.update_xaxes(title_text="frequency (rad/hour)", row=2, col=1)
+    fig.update_yaxes(title_text="magnitude (dB)", row=1, col=1)
+    fig.update_yaxes(title_text="phase (deg)", row=2, col=1)
+    fig.update_layout(
+        title=f"Open-Loop Bode Diagram (PM={pm:.1f}°, GM={gm:.1f} dB)",
+        template="plotly_white",
+    )
+    return fig
+
+
+def plot_nyquist(response: dict, max_radius: float = 10.0):
+    """Nyquist plot of L(jw) (and its mirror image) around the -1 point.
+
+    Args:
+        response: Output of `InventoryControlSystem.frequency_response`.
+        max_radius: Points with |L| above this are dropped (the integrator
+            pole sends |L| to infinity as w -> 0).
+    """
+    import plotly.graph_objects as go
+
+    loop = response["open_loop"]
+    loop = loop[np.abs(loop) <= max_radius]
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=loop.real, y=loop.imag, mode="lines", name="L(jw), w > 0"))
+    fig.add_trace(
+        go.Scatter(
+            x=loop.real,
+            y=-loop.imag,
+            mode="lines",
+            name="L(jw), w < 0",
+            line=dict(dash="dash"),
+        )
+    )
+    fig.add_trace(
+        go.Scatter(x=[-1.0], y=[0.0], mode="markers", name="-1", marker=dict(symbol="x", size=10, color="red"))
+    )
+    fig.update_layout(
+        title="Nyquist Diagram",
+        xaxis_title="Re L(jw)",
+        yaxis_title="Im L(jw)",
+        yaxis=dict(scaleanchor="x"),
+        template="plotly_white",
+    )
+    return fig
+
+
 def plot_hurst_fit(metrics: dict):
     """Log-log plot for R/S analysis."""
     import plotly.graph_objects as go
@@ -215,6 +390,45 @@ def plot_hurst_fit(metrics: dict):
     return fig
 
 
+def plot_power_spectrum(metrics: dict):
+    """Log-log Welch PSD with the low-frequency spectral-slope fit."""
+    import plotly.graph_objects as go
+
+    freqs = metrics.get("freqs")
+    psd = metrics.get("psd")
+    log_f = metrics.get("freqs_log")
+    log_p = metrics.get("psd_log")
+    h = metrics.get("H", 0.5)
+    period = metrics.get("dominant_period")
+    fig = go.Figure()
+    if freqs is not None and psd is not None:
+        fig.add_trace(go.Scatter(x=freqs[1:], y=psd[1:], mode="lines", name="Welch PSD"))
+    if log_f is not None and log_p is not None:
+        beta = metrics.get("beta", 0.0)
+        fit = 10 ** (np.mean(log_p) - beta * (log_f - np.mean(log_f)))
+        fig.add_trace(
+            go.Scatter(
+                x=10**log_f,
+                y=fit,
+                mode="lines",
+                name=f"Low-f fit (H={h:.3f})",
+                line=dict(dash="dash"),
+            )
+        )
+    if period:
+        fig.add_vline(x=1.0 / period, line=dict(color="gray", dash="dot"))
+    period_text = f", period={period:.1f}" if period else ""
+    fig.update_layout(
+        title=f"Power Spectrum (H_spectral={h:.3f}{period_text})",
+        xaxis_title="frequency (1/hour)",
+        yaxis_title="PSD",
+        xaxis_type="log",
+        yaxis_type="log",
+        template="plotly_white",
+    )
+    return fig
+
+
 def plot_correlation_dim(metrics: dict):
     """Log-log plot for correlation dimension."""
     import plotly.graph_objects as go
@@ -269,6 +483,32 @@ def plot_dimension_saturation(m_values: list[int], d2_values: list[float]):
     return fig
 
 
+def _quiver_xy(x, y, u, v, scale: float = 0.1, arrow_scale: float = 0.3, angle: float = np.pi / 9):
+    """Arrow polyline coordinates for a quiver plot, built with array ops.
+
+    Same geometry as plotly's `ff.create_quiver` (shafts first, then the
+    heads, NaN-separated) without its per-arrow Python loops.
+
+    Returns:
+        Tuple (xs, ys) for a single lines trace.
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    dx, dy = np.asarray(u, dtype=float) * scale, np.asarray(v, dtype=float) * scale
+    end_x, end_y = x + dx, y + dy
+    head = np.hypot(dx, dy) * arrow_scale
+    theta = np.arctan2(dy, dx)
+    gap = np.full_like(x, np.nan)
+    shafts_x = np.column_stack([x, end_x, gap]).ravel()
+    shafts_y = np.column_stack([y, end_y, gap]).ravel()
+    heads_x = np.column_stack(
+        [end_x - head * np.cos(theta + angle), end_x, end_x - head * np.cos(theta - angle), gap]
+    ).ravel()
+    heads_y = np.column_stack(
+        [end_y - head * np.sin(theta + angle), end_y, end_y - head * np.sin(theta - angle), gap]
+    ).ravel()
+    return np.concatenate([shafts_x, heads_x]), np.concatenate([shafts_y, heads_y])
+
+
 def _safe_line_plot(df: pd.DataFrame, x: str, y: str, title: str):
     try:
         import plotly.express as px
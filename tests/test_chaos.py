@@ -1,9 +1,17 @@
+import json
+import pickle
+import time
+
 import numpy as np
 import pandas as pd
 
 from src import chaos_metrics
+from src import entropy_metrics
+from src import spectral_analysis
 from src import chaos_analysis
 from src import report_generator
+from src import batch_reports
+from src import html_report
 
 
 def _ar1(phi: float, n: int, seed: int = 0) -> np.ndarray:
@@ -117,9 +125,477 @@ def test_generate_task3_report_writes_html(tmp_path, monkeypatch):
         return df
 
     monkeypatch.setattr(pd, "read_parquet", _fake_read_parquet)
+    monkeypatch.setattr("src.metrics_bundle.DEFAULT_CACHE_DIR", tmp_path / "metrics")
     output_path = tmp_path / "task3.html"
     report_generator.generate_task3_report(
         data_path=tmp_path / "golden_sample.parquet",
         output_path=output_path,
     )
     assert output_path.exists()
+
+
+def test_report_spectrum_uses_full_day_series(tmp_path, monkeypatch):
+    days = 60
+    hours = np.tile(np.arange(24), days)
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame(
+        {
+            # Golden sample layout: dt is the day, hour_index the hour.
+            "dt": np.repeat(pd.date_range("2024-01-01", periods=days, freq="D").strftime("%Y-%m-%d"), 24),
+            "hour_index": hours,
+            "sales": 5.0 + 3.0 * np.sin(2 * np.pi * hours / 24) + rng.normal(0.0, 0.3, 24 * days),
+            "is_stockout": 0,
+        }
+    )
+    monkeypatch.setattr("src.metrics_bundle.DEFAULT_CACHE_DIR", tmp_path / "metrics")
+    captured = {}
+    original = report_generator.report_body
+
+    def capture(dataset, start, end, metrics, plots):
+        captured.update(metrics)
+        return original(dataset, start, end, metrics, plots)
+
+    monkeypatch.setattr(report_generator, "report_body", capture)
+    output_path = tmp_path / "task3.html"
+    report_generator.generate_task3_report(tmp_path / "unused.parquet", output_path, df=df)
+
+    assert abs(captured["spectral"]["dominant_period"] - 24.0) < 0.5
+    assert "dominant period = 24.0 h" in output_path.read_text(encoding="utf-8")
+    # The daytime-only series would alias the cycle to a shorter period.
+    daytime = df[(df["hour_index"] >= 8) & (df["hour_index"] <= 22)]["sales"].to_numpy()
+    assert abs(spectral_analysis.spectral_details(daytime)["dominant_period"] - 24.0) > 2.0
+
+
+def test_sample_entropy_matches_naive_count():
+    rng = np.random.default_rng(3)
+    ts = rng.normal(size=300)
+    m, tol = 2, 0.2 * np.std(ts)
+
+    def _naive_pairs(length):
+        templates = np.array([ts[i : i + length] for i in range(len(ts) - m)])
+        count = 0
+        for i in range(len(templates)):
+            dist = np.max(np.abs(templates[i + 1 :] - templates[i]), axis=1)
+            count += int(np.sum(dist <= tol))
+        return count
+
+    details = entropy_metrics.sample_entropy_details(ts, m=m, r=0.2)
+    assert details["valid"] is True
+    assert details["B"] == _naive_pairs(m)
+    assert details["A"] == _naive_pairs(m + 1)
+
+
+def test_sample_entropy_regular_lower_than_noise():
+    rng = np.random.default_rng(4)
+    noise = rng.normal(size=1000)
+    sine = np.sin(np.arange(1000) * 0.2)
+    assert entropy_metrics.sample_entropy(sine) < entropy_metrics.sample_entropy(noise)
+
+
+def test_multiscale_entropy_white_noise_decreases():
+    rng = np.random.default_rng(8)
+    ts = rng.normal(size=3000)
+    details = entropy_metrics.multiscale_entropy_details(ts, scales=[1, 5, 10])
+    assert details["valid"] is True
+    assert details["sampen"][0] > details["sampen"][-1]
+
+
+def test_compute_entropy_panel_one_row_per_sku():
+    rng = np.random.default_rng(10)
+    df = pd.DataFrame(
+        {
+            "store_id": ["s1"] * 400 + ["s2"] * 400,
+            "product_id": ["p1"] * 800,
+            "sales": rng.poisson(5.0, size=800).astype(float),
+        }
+    )
+    panel = entropy_metrics.compute_entropy_panel(df, scales=[1, 2])
+    assert list(panel["store_id"]) == ["s1", "s2"]
+    assert {"n", "sampen", "mse_ci", "valid"}.issubset(panel.columns)
+
+
+def test_spectral_details_detects_daily_cycle():
+    rng = np.random.default_rng(13)
+    t = np.arange(24 * 120)
+    ts = np.sin(2 * np.pi * t / 24) + 0.3 * rng.normal(size=len(t))
+    details = spectral_analysis.spectral_details(ts)
+    assert details["valid"] is True
+    assert abs(details["dominant_period"] - 24.0) < 0.5
+
+
+def test_spectral_hurst_white_noise_near_half():
+    rng = np.random.default_rng(14)
+    ts = rng.normal(size=4096)
+    details = spectral_analysis.spectral_details(ts)
+    assert 0.3 < details["H"] < 0.7
+
+
+def test_spectral_batch_matches_single_series():
+    rng = np.random.default_rng(15)
+    panel = rng.normal(size=(3, 1024))
+    batch = spectral_analysis.spectral_batch(panel)
+    single = spectral_analysis.spectral_details(panel[1])
+    assert batch["psd"].shape[0] == 3
+    assert np.isclose(batch["H"][1], single["H"])
+    assert np.isclose(batch["dominant_period"][1], single["dominant_period"])
+
+
+def test_compute_spectral_panel_truncates_to_common_length():
+    rng = np.random.default_rng(16)
+    df = pd.DataFrame(
+        {
+            "store_id": ["s1"] * 300 + ["s2"] * 200,
+            "product_id": ["p1"] * 500,
+            "sales": rng.poisson(5.0, size=500).astype(float),
+        }
+    )
+    panel = spectral_analysis.compute_spectral_panel(df)
+    assert len(panel) == 2
+    assert (panel["n"] == 200).all()
+    assert {"dominant_period", "H_spectral"}.issubset(panel.columns)
+
+
+def test_metrics_bundle_cached_and_invalidated(tmp_path, monkeypatch):
+    from src import metrics_bundle
+
+    rng = np.random.default_rng(4)
+    series = rng.poisson(5.0, 600).astype(float)
+    calls = []
+    original = metrics_bundle.compute_metrics_bundle
+
+    def counting(x, params=None, spectral_series=None):
+        calls.append(len(x))
+        return original(x, params, spectral_series)
+
+    monkeypatch.setattr(metrics_bundle, "compute_metrics_bundle", counting)
+    first = metrics_bundle.get_metrics_bundle(series, cache_dir=tmp_path)
+    second = metrics_bundle.get_metrics_bundle(series.copy(), cache_dir=tmp_path)
+    assert len(calls) == 1
+    assert np.isclose(first["hurst"]["H"], second["hurst"]["H"])
+    assert second["d2_scan"]["m"] == first["d2_scan"]["m"]
+
+    metrics_bundle.get_metrics_bundle(series, params={"spectral": {"nperseg": 128}}, cache_dir=tmp_path)
+    series[0] += 1.0
+    metrics_bundle.get_metrics_bundle(series, cache_dir=tmp_path)
+    assert len(calls) == 3
+
+    # An edited metric module (new source digest) invalidates the bundle.
+    from src import result_cache
+
+    monkeypatch.setitem(result_cache._MODULE_DIGESTS, "src.chaos_metrics", "edited")
+    metrics_bundle.get_metrics_bundle(series, cache_dir=tmp_path)
+    assert len(calls) == 4
+
+
+def test_light_report_references_shared_plotly_asset(tmp_path, monkeypatch):
+    n = 24 * 400
+    df = pd.DataFrame(
+        {
+            "dt": pd.date_range("2024-01-01", periods=n, freq="h"),
+            "hour_index": [i % 24 for i in range(n)],
+            "sales": np.random.default_rng(2).poisson(4.0, n).astype(float),
+            "is_stockout": [0] * n,
+        }
+    )
+    monkeypatch.setattr("src.metrics_bundle.DEFAULT_CACHE_DIR", tmp_path / "metrics")
+    full_path, light_path = tmp_path / "full.html", tmp_path / "light.html"
+    report_generator.generate_task3_report(tmp_path / "unused.parquet", full_path, df=df)
+    metrics = report_generator.metrics_bundle.get_metrics_bundle(
+        report_generator.metrics_bundle.load_daytime_sample(df=df)["sales"].to_numpy()
+    )
+    report_generator.generate_task3_report(
+        tmp_path / "unused.parquet", light_path, df=df, metrics=metrics, light=True, max_points=500
+    )
+    html = light_path.read_text(encoding="utf-8")
+    assert 'src="assets/plotly-' in html
+    assert html.count("renderFigure(") == 8  # definition + seven figures
+    assert len(list((tmp_path / "assets").glob("plotly-*.min.js"))) == 1
+    assert light_path.stat().st_size * 10 < full_path.stat().st_size
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    from src import downsampling
+
+    x = np.arange(10_000, dtype=float)
+    y = np.sin(x / 300.0)
+    y[4321] = 25.0
+    idx = downsampling.lttb_indices(x, y, 200)
+    assert len(idx) == 200
+    assert idx[0] == 0 and idx[-1] == len(x) - 1
+    assert np.all(np.diff(idx) > 0)
+    assert 4321 in idx
+    assert np.array_equal(downsampling.lttb_indices(x[:50], y[:50], 200), np.arange(50))
+
+
+def test_generate_batch_reports_shares_assets(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.metrics_bundle.DEFAULT_CACHE_DIR", tmp_path / "metrics")
+    rng = np.random.default_rng(3)
+    n = 24 * 30
+    frames = [
+        pd.DataFrame(
+            {
+                "store_id": store,
+                "product_id": product,
+                "dt": pd.date_range("2024-01-01", periods=n, freq="h"),
+                "hour_index": np.arange(n) % 24,
+                "sales": rng.poisson(3.0 + product, n).astype(float),
+                "is_stockout": rng.integers(0, 2, n),
+            }
+        )
+        for store, product in [(1, 1), (1, 2), (2, 1)]
+    ]
+    panel = pd.concat(frames, ignore_index=True)
+    out_dir = tmp_path / "reports"
+    summary = batch_reports.generate_batch_reports(
+        panel,
+        out_dir,
+        skus=[(1, 1), (2, 1)],
+        n_jobs=2,
+        max_points=300,
+        store_dir=tmp_path / "store",
+        run_date="2024-02-01",
+    )
+
+    assert list(zip(summary["store_id"], summary["product_id"])) == [(1, 1), (2, 1)]
+    assert summary["error"].isna().all()
+    assert (summary["n_hours"] == 30 * 15).all()
+    index = (out_dir / "index.html").read_text(encoding="utf-8")
+    for name in summary["report"]:
+        assert f'href="{name}"' in index
+        page = (out_dir / name).read_text(encoding="utf-8")
+        assert 'src="assets/report-templates-' in page
+        assert "const TEMPLATES" not in page
+    assert len(list((out_dir / "assets").glob("*.js"))) == 2
+
+    from src import metric_store
+
+    stored = metric_store.MetricStore(tmp_path / "store").query(metrics=["hurst"], columns=["sku", "value"])
+    assert sorted(stored["sku"]) == ["1/1", "2/1"]
+    assert np.allclose(stored.sort_values("sku")["value"], summary["H"])
+
+
+def test_minmax_decimation_keeps_pixel_extremes():
+    from src import downsampling
+
+    rng = np.random.default_rng(5)
+    y = rng.normal(size=100_000)
+    x = np.arange(len(y), dtype=float)
+    idx = downsampling.minmax_indices(x, y, 500)
+    assert len(idx) <= 2000
+    bins = np.minimum((x / x[-1] * 500).astype(int), 499)
+    for b in (0, 123, 499):
+        sel = bins == b
+        kept = idx[bins[idx] == b]
+        assert y[kept].max() == y[sel].max() and y[kept].min() == y[sel].min()
+
+    runs = downsampling.true_runs([0, 1, 1, 0, 1, 0, 0, 1])
+    assert runs.tolist() == [[1, 2], [4, 4], [7, 7]]
+    raster = downsampling.density_raster(x, y, bins=50)
+    assert raster["z"].shape == (50, 50) and raster["n"] == len(y)
+
+
+def test_large_series_figures_stay_bounded():
+    from src import visualization
+
+    rng = np.random.default_rng(6)
+    n = 24 * 365 * 3
+    stockout = (rng.random(n) < 0.3).astype(int)
+    df = pd.DataFrame(
+        {
+            "dt": pd.date_range("2021-01-01", periods=n, freq="h"),
+            "sales": rng.poisson(5.0, n).astype(float),
+            "is_stockout": stockout,
+        }
+    )
+    fig = visualization.plot_time_series_with_stockouts(df, "dt", "sales", "is_stockout", max_points=6000)
+    assert len(fig.data[0].x) <= 6000
+    assert "episodes" in fig.data[1].name
+    assert fig.data[0].y.max() == df["sales"].max()
+    # Every stockout hour lies inside one of the drawn episodes.
+    starts = pd.to_datetime(fig.data[1].x[0::3])
+    ends = pd.to_datetime(fig.data[1].x[1::3])
+    covered = np.zeros(n, dtype=int)
+    hours = ((starts - df["dt"].iloc[0]) // pd.Timedelta("1h")).to_numpy()
+    lengths = ((ends - starts) // pd.Timedelta("1h")).to_numpy() + 1
+    for h, length in zip(hours, lengths):
+        covered[h : h + length] = 1
+    assert np.array_equal(covered, stockout)
+
+    coarse = visualization.plot_time_series_with_stockouts(df, "dt", "sales", "is_stockout", max_points=2000)
+    assert len(coarse.data[1].x) <= 3 * 501
+
+    phase = visualization.plot_phase_portrait(df["sales"].to_numpy(), bins=120)
+    assert phase.data[0].type == "heatmap"
+    assert np.asarray(phase.data[0].z).shape == (120, 120)
+
+
+def test_result_cache_memory_disk_tiers_and_eviction(tmp_path):
+    from src import result_cache
+
+    rng = np.random.default_rng(5)
+    series = rng.normal(size=400)
+    calls = []
+
+    def counting(ts, k=10):
+        calls.append(k)
+        return chaos_metrics.compute_chaos_metrics(ts, k=k)
+
+    cache = result_cache.ResultCache(tmp_path)
+    first = cache.call(counting, series)
+    first["hurst"] = -1.0  # callers get copies, never the cached object
+    assert cache.call(counting, series.copy(), k=10)["hurst"] != -1.0
+    assert cache.call(counting, pd.Series(series)) == cache.call(counting, series)
+    assert calls == [10]
+    assert cache.stats["memory_hits"] == 3
+
+    fresh = result_cache.ResultCache(tmp_path)
+    assert fresh.call(counting, series) == cache.call(counting, series)
+    assert fresh.stats["disk_hits"] == 1 and calls == [10]
+    cache.call(counting, series, k=5)
+    assert calls == [10, 5]
+
+    size = len(pickle.dumps({"i": 0}, protocol=pickle.HIGHEST_PROTOCOL))
+    small = result_cache.ResultCache(tmp_path / "small", max_memory_bytes=size, max_disk_bytes=2 * size)
+    for i in range(4):
+        small.put(f"k{i}", {"i": i})
+        time.sleep(0.01)  # distinct mtimes for the disk LRU
+    assert list(small._memory) == ["k3"]
+    assert sorted(p.stem for p in (tmp_path / "small").glob("*.pkl")) == ["k2", "k3"]
+    assert small.get("k2") == {"i": 2} and small.stats["disk_hits"] == 1
+    assert small.get("k0") is None and small.stats["misses"] == 1
+
+
+def test_chaos_analysis_reuses_shared_result_cache(tmp_path, monkeypatch):
+    from src import result_cache
+
+    rng = np.random.default_rng(6)
+    df = pd.DataFrame(
+        {
+            "dt": pd.date_range("2024-01-01", periods=24 * 40, freq="h"),
+            "sales": rng.poisson(4.0, 24 * 40).astype(float),
+        }
+    )
+    df.to_parquet(tmp_path / "golden.parquet")
+    cache = result_cache.ResultCache(tmp_path / "results")
+    monkeypatch.setitem(result_cache._CACHES, result_cache.DEFAULT_CACHE_DIR.resolve(), cache)
+
+    first = chaos_analysis.analyze_golden_sample(tmp_path / "golden.parquet")
+    assert cache.stats["misses"] == 2
+    second = chaos_analysis.analyze_golden_sample(tmp_path / "golden.parquet")
+    assert cache.stats["memory_hits"] == 2
+    assert second == first
+    assert chaos_analysis.analyze_golden_sample(tmp_path / "golden.parquet", use_cache=False) == first
+
+
+def test_metric_store_replaces_text_parsing_for_comparisons(tmp_path):
+    from src import chaos_analysis_sklearn, metric_store
+
+    rng = np.random.default_rng(7)
+    x = rng.normal(size=600)
+    baseline = {
+        "sku": "1/2",
+        "daytime_hourly": {"hurst": 0.61, "d2": 0.0},
+        "daytime_daily": {"hurst": 0.99, "d2": 0.0},
+        "n_hourly": 600,
+        "n_daily": 40,
+        "start_hour": 8,
+        "end_hour": 22,
+    }
+    sklearn = {
+        **baseline,
+        "daytime_hourly": {
+            "hurst": chaos_metrics.hurst_rs_details(x),
+            "d2": chaos_metrics.correlation_dimension_details(x),
+        },
+        "daytime_daily": {"hurst": {"H": 0.97, "r2": 0.9, "valid": True}, "d2": {"D2": 0.0, "valid": False}},
+    }
+    store = metric_store.MetricStore(tmp_path / "store")
+    chaos_analysis.record_analysis(baseline, "2026-02-01", store)
+    chaos_analysis.record_analysis({**baseline, "daytime_daily": {"hurst": 0.95, "d2": 0.0}}, "2026-02-01", store)
+    chaos_analysis_sklearn.record_analysis(sklearn, "2026-02-01", store)
+    assert len(list(store.root.glob("part-*.parquet"))) == 2  # same keys overwrite their part file
+    assert json.loads((store.root / "_schema.json").read_text())["version"] == metric_store.SCHEMA_VERSION
+
+    rows = store.query(skus=["1/2"], sources=["sklearn"], metrics=["hurst"], series=["daytime_hourly"])
+    assert len(rows) == 1
+    row = rows.iloc[0]
+    assert np.isclose(row["value"], sklearn["daytime_hourly"]["hurst"]["H"])
+    assert np.allclose(row["x"], sklearn["daytime_hourly"]["hurst"]["scales_log"])
+    assert np.allclose(row["y"], sklearn["daytime_hourly"]["hurst"]["rs_log"])
+    assert json.loads(row["params"])["use_sklearn"] is True
+    assert store.query(skus=["other"]).empty
+
+    out = tmp_path / "comparison.txt"
+    table = chaos_analysis_sklearn.save_comparison(out, store, sku="1/2", date="2026-02-01")
+    daily = table.set_index(["series", "metric"]).loc[("daytime_daily", "hurst")]
+    assert np.isclose(daily["baseline"], 0.95) and np.isclose(daily["delta"], 0.97 - 0.95)
+    assert "Daily Hurst: 0.9500 -> 0.9700 (Δ=0.0200)" in out.read_text()
+
+
+def test_light_renderer_keeps_every_stockout_exact():
+    from src import visualization
+
+    rng = np.random.default_rng(8)
+    n = 24 * 400
+    df = pd.DataFrame(
+        {
+            "dt": pd.date_range("2024-01-01", periods=n, freq="h"),
+            "sales": rng.poisson(3.0, n).astype(float),
+            "is_stockout": (rng.random(n) < 0.27).astype(int),
+        }
+    )
+    n_stockouts = int(df["is_stockout"].sum())
+    assert 2000 < n_stockouts <= 4000
+    renderer = html_report.LightFigureRenderer(max_points=2000)
+
+    markers = visualization.plot_time_series_with_stockouts(df, "dt", "sales", "is_stockout")
+    renderer(markers)
+    assert len(markers.data[0].x) == 2000
+    assert len(markers.data[1].x) == n_stockouts
+
+    episodes = visualization.plot_time_series_with_stockouts(df, "dt", "sales", "is_stockout", max_points=1500)
+    n_runs = len(episodes.data[1].x) // 3
+    renderer(episodes)
+    x = np.asarray(episodes.data[1].x, dtype=float)
+    assert len(x) == 3 * n_runs and np.isnan(x[2::3]).all()
+    start_ms = df["dt"].iloc[0].value / 1e6
+    assert np.nanmin(x) >= start_ms and np.nanmax(x) <= df["dt"].iloc[-1].value / 1e6
+    assert episodes.layout.xaxis.type == "date"
+
+
+def test_batch_reports_push_multi_column_sku_filter_into_parquet(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.metrics_bundle.DEFAULT_CACHE_DIR", tmp_path / "metrics")
+    rng = np.random.default_rng(9)
+    n = 24 * 20
+    panel = pd.concat(
+        [
+            pd.DataFrame(
+                {
+                    "store_id": store,
+                    "product_id": product,
+                    "dt": pd.date_range("2024-01-01", periods=n, freq="h"),
+                    "hour_index": np.arange(n) % 24,
+                    "sales": rng.poisson(3.0, n).astype(float),
+                }
+            )
+            for store, product in [(1, 1), (1, 2), (2, 1), (2, 2)]
+        ],
+        ignore_index=True,
+    )
+    panel.to_parquet(tmp_path / "panel", partition_cols=["store_id", "product_id"])
+    reads = []
+    original = pd.read_parquet
+
+    def spy(path, **kwargs):
+        frame = original(path, **kwargs)
+        reads.append((kwargs.get("filters"), len(frame)))
+        return frame
+
+    monkeypatch.setattr(pd, "read_parquet", spy)
+    summary = batch_reports.generate_batch_reports(
+        tmp_path / "panel", tmp_path / "reports", skus=[(1, 2), (2, 2)], max_points=300
+    )
+    assert reads[0][0] == [("store_id", "in", [1, 2]), ("product_id", "in", [2])]
+    assert reads[0][1] == 2 * n
+    assert list(zip(summary["store_id"], summary["product_id"])) == [(1, 2), (2, 2)]
+    assert summary["error"].isna().all()
@@ -1,5 +1,16 @@
 import numpy as np
-from src import linear_model, nonlinear_model
+import pytest
+from src import (
+    acs_simulation,
+    calibration,
+    control_analysis,
+    controller_tuning,
+    forcing,
+    linear_model,
+    nonlinear_model,
+    spoilage_model,
+    stability_map,
+)
 
 
 def test_build_acs_transfer_function_returns_structure():
@@ -121,3 +132,487 @@ def test_compute_nullclines_lines():
     expected_slope_r = -params["replenishment_gain"] / params["replenishment_decay"]
     observed_slope_r = (r1 - r0) / (i1 - i0)
     assert np.isclose(observed_slope_r, expected_slope_r)
+
+
+def _base_ode_params():
+    return {
+        "inventory_decay_rate": 0.05,
+        "temperature_sensitivity": 0.01,
+        "temperature": 25.0,
+        "demand": 4.0,
+        "replenishment_gain": 1.0,
+        "replenishment_decay": 0.5,
+        "i_target": 50.0,
+    }
+
+
+def test_integrate_inventory_ensemble_matches_single_solves():
+    params = _base_ode_params()
+    gains = np.array([0.2, 1.0, 3.0])
+    t = np.linspace(0.0, 20.0, 101)
+    y0 = np.array([40.0, 5.0])
+    ensemble = nonlinear_model.integrate_inventory_ensemble(
+        y0, t, {**params, "replenishment_gain": gains}
+    )
+    assert ensemble.shape == (len(t), 3, 2)
+    for k, gain in enumerate(gains):
+        single = nonlinear_model.integrate_inventory_system(
+            y0, t, {**params, "replenishment_gain": gain}
+        )
+        assert np.allclose(ensemble[:, k, :], single, atol=1e-4)
+
+
+def test_integrate_inventory_ensemble_per_system_initial_state():
+    params = _base_ode_params()
+    params["i_target"] = np.array([10.0, 20.0])
+    y0 = np.array([[10.0, 0.0], [30.0, 1.0]])
+    t = np.linspace(0.0, 5.0, 11)
+    ensemble = nonlinear_model.integrate_inventory_ensemble(y0, t, params)
+    assert np.allclose(ensemble[0], y0)
+
+
+def test_solve_inventory_system_matches_odeint():
+    t = np.linspace(0.0, 40.0, 201)
+    y0 = np.array([30.0, 2.0])
+    cases = [
+        _base_ode_params(),
+        {**_base_ode_params(), "inventory_decay_rate": 3.0, "replenishment_gain": 0.1},
+        {**_base_ode_params(), "inventory_decay_rate": 0.5, "temperature_sensitivity": 0.0,
+         "replenishment_gain": 0.0, "replenishment_decay": 0.5},
+    ]
+    for params in cases:
+        exact = nonlinear_model.solve_inventory_system(y0, t, params)
+        numeric = nonlinear_model.integrate_inventory_system(y0, t, params)
+        assert exact.shape == (len(t), 2)
+        assert np.allclose(exact, numeric, atol=1e-4)
+
+
+def test_solve_inventory_system_array_params_and_convergence():
+    params = {**_base_ode_params(), "replenishment_gain": np.array([0.5, 2.0])}
+    t = np.linspace(0.0, 500.0, 51)
+    exact = nonlinear_model.solve_inventory_system(np.array([0.0, 0.0]), t, params)
+    assert exact.shape == (len(t), 2, 2)
+    assert np.allclose(exact[-1].T, nonlinear_model.compute_equilibrium(params), atol=1e-6)
+
+
+def test_hourly_forcing_interpolation_kinds():
+    values = np.array([0.0, 10.0, 20.0])
+    step = forcing.HourlyForcing(values, kind="previous")
+    linear = forcing.HourlyForcing(values, kind="linear")
+    assert step(1.5) == 10.0
+    assert np.isclose(linear(1.5), 15.0)
+    assert linear(10.0) == 20.0
+    assert np.allclose(linear.segment_values(), [5.0, 15.0, 20.0])
+
+
+def test_hourly_forcing_segments_past_table_hold_last_value():
+    values = np.array([0.0, 10.0, 20.0])
+    step = forcing.HourlyForcing(values, kind="previous")
+    linear = forcing.HourlyForcing(values, kind="linear")
+    assert np.allclose(step.segment_values(5), [0.0, 10.0, 20.0, 20.0, 20.0])
+    assert np.allclose(linear.segment_values(5), [5.0, 15.0, 20.0, 20.0, 20.0])
+    assert step(4.5) == linear(4.5) == 20.0
+    assert np.allclose(linear.segment_values(2), [5.0, 15.0])
+
+
+def test_plain_callable_forcing_raises_clear_type_error():
+    hourly = forcing.HourlyForcing(np.full(5, 4.0))
+    params = {**_base_ode_params(), "demand": hourly, "temperature": lambda t: 20.0 + t}
+    with pytest.raises(TypeError, match="HourlyForcing"):
+        forcing.integrate_forced_system(np.array([10.0, 1.0]), params)
+    with pytest.raises(TypeError, match="'demand' is a callable forcing"):
+        nonlinear_model.transition_matrices({**_base_ode_params(), "demand": lambda t: 4.0}, 1.0)
+
+
+def test_integrate_forced_system_constant_forcing_matches_exact():
+    params = _base_ode_params()
+    n_hours = 48
+    forced = {
+        **params,
+        "demand": forcing.HourlyForcing(np.full(n_hours, params["demand"])),
+        "temperature": forcing.HourlyForcing(np.full(n_hours, params["temperature"])),
+    }
+    y0 = np.array([30.0, 2.0])
+    t, states = forcing.integrate_forced_system(y0, forced)
+    exact = nonlinear_model.solve_inventory_system(y0, t, params)
+    assert states.shape == (n_hours + 1, 2)
+    assert np.allclose(states, exact)
+
+
+def test_replenishment_ode_evaluates_forcing_from_sample():
+    import pandas as pd
+
+    df = pd.DataFrame({"time_step": range(24), "sales": np.arange(24.0), "temp": 20.0})
+    params = {**_base_ode_params(), **forcing.forcing_from_sample(df)}
+    rhs = nonlinear_model.inventory_replenishment_ode(np.array([0.0, 0.0]), 5.5, params)
+    assert np.isclose(rhs[0], -5.0)
+    t = np.linspace(0.0, 23.0, 24)
+    traj = nonlinear_model.integrate_inventory_system(np.array([10.0, 1.0]), t, params)
+    assert traj.shape == (24, 2)
+
+
+def test_arrhenius_decay_increases_with_temperature():
+    cold = spoilage_model.arrhenius_decay(0.01, 4.0, activation_energy=8000.0)
+    ref = spoilage_model.arrhenius_decay(0.01, 20.0, activation_energy=8000.0)
+    warm = spoilage_model.arrhenius_decay(0.01, 30.0, activation_energy=8000.0)
+    assert cold < ref < warm
+    assert np.isclose(ref, 0.01)
+
+
+def test_spoilage_system_reduces_to_linear_model():
+    params = {**_base_ode_params(), "temperature_sensitivity": 0.0}
+    t = np.linspace(0.0, 30.0, 61)
+    y0 = np.array([40.0, 5.0])
+    result = spoilage_model.integrate_spoilage_system(y0, t, params, nonnegative=False)
+    exact = nonlinear_model.solve_inventory_system(y0, t, params)
+    assert np.allclose(result["states"], exact, atol=1e-3)
+
+
+def test_spoilage_system_capacity_triggers_stockout_event():
+    params = {**_base_ode_params(), "replenishment_capacity": 2.0}
+    t = np.linspace(0.0, 50.0, 101)
+    result = spoilage_model.integrate_spoilage_system(np.array([5.0, 0.0]), t, params)
+    assert result["states"][:, 0].min() >= 0.0
+    assert len(result["stockouts"]) == 1
+    assert 0.0 < result["stockouts"][0][0] < 5.0
+
+
+def test_spoilage_ensemble_matches_single_system():
+    params = {**_base_ode_params(), "replenishment_capacity": np.array([3.0, 50.0])}
+    t = np.linspace(0.0, 30.0, 61)
+    y0 = np.array([10.0, 1.0])
+    ensemble = spoilage_model.integrate_spoilage_ensemble(y0, t, params)
+    assert ensemble.shape == (len(t), 2, 2)
+    for k, cap in enumerate(params["replenishment_capacity"]):
+        single = spoilage_model.integrate_spoilage_system(
+            y0, t, {**params, "replenishment_capacity": cap}
+        )
+        assert np.allclose(ensemble[:, k, :], single["states"], atol=1e-2)
+
+
+def test_compiled_spoilage_kernel_matches_python_kernel():
+    pytest.importorskip("numba")
+    assert spoilage_model.spoilage_kernel is not spoilage_model._spoilage_kernel
+    scalar = (5.0, 2.0, 1.5, 25.0, 0.01, 8000.0, 20.0, 0.3, 0.5, 10.0, 4.0)
+    assert np.allclose(
+        spoilage_model.spoilage_kernel(*scalar), spoilage_model._spoilage_kernel(*scalar)
+    )
+    # Ensemble layout: state rows, a grid-table row and broadcast read-only parameter rows.
+    theta = np.broadcast_to(
+        spoilage_model.pack_parameters({**_base_ode_params(), "replenishment_capacity": 4.0}), (7, 3)
+    )
+    args = (np.array([5.0, 0.0, -1.0]), np.array([2.0, -1.0, 0.5]), np.array([1.5]), 25.0, *theta)
+    for got, want in zip(spoilage_model.spoilage_kernel(*args), spoilage_model._spoilage_kernel(*args)):
+        assert np.allclose(got, want)
+
+
+def test_sensitivities_match_finite_differences():
+    params = {**_base_ode_params(), "replenishment_gain": 0.3}
+    y0 = np.array([10.0, 2.0])
+    states, sens = calibration.simulate_with_sensitivities(y0, 50, 1.0, params)
+    exact = nonlinear_model.solve_inventory_system(y0, np.arange(50.0), params)
+    assert np.allclose(states, exact)
+    for j, name in enumerate(calibration.FIT_PARAMS):
+        h = 1e-6 * max(1.0, abs(params[name]))
+        bumped_params = {**params, name: params[name] + h}
+        bumped, _ = calibration.simulate_with_sensitivities(y0, 50, 1.0, bumped_params)
+        assert np.allclose((bumped - states) / h, sens[:, :, j], rtol=1e-3, atol=1e-3)
+
+
+def test_calibrate_series_recovers_parameters():
+    truth = {**_base_ode_params(), "replenishment_gain": 0.3}
+    y0 = np.array([10.0, 2.0])
+    states, _ = calibration.simulate_with_sensitivities(y0, 300, 1.0, truth)
+    observed = states[:, 1] + 0.01 * np.random.default_rng(0).normal(size=300)
+    start = {**truth, "inventory_decay_rate": 0.1, "replenishment_gain": 0.5,
+             "replenishment_decay": 1.0, "i_target": 30.0}
+    result = calibration.calibrate_series(observed, start, state="replenishment", y0=y0)
+    assert result["success"] is True
+    for name in calibration.FIT_PARAMS:
+        assert np.isclose(result["fitted"][name], truth[name], rtol=0.05)
+    assert result["rmse"] < 0.02
+
+
+def test_calibrate_panel_process_pool():
+    import pandas as pd
+
+    truth = {**_base_ode_params(), "replenishment_gain": 0.3}
+    states, _ = calibration.simulate_with_sensitivities(np.array([10.0, 2.0]), 120, 1.0, truth)
+    df = pd.DataFrame(
+        {
+            "store_id": ["s1"] * 120 + ["s2"] * 120,
+            "product_id": ["p1"] * 240,
+            "sales": np.concatenate([states[:, 1], states[:, 1] * 1.1]),
+        }
+    )
+    panel = calibration.calibrate_panel(df, truth, n_jobs=2)
+    assert list(panel["store_id"]) == ["s1", "s2"]
+    assert {"replenishment_gain", "rmse", "success"}.issubset(panel.columns)
+
+
+def test_stability_map_matches_classify_equilibrium():
+    alpha = np.linspace(-0.5, 3.0, 15)
+    beta = np.linspace(0.0, 3.0, 13)
+    decay = np.array([0.0, 0.1, 1.5])
+    result = stability_map.stability_map(alpha, beta, decay)
+    assert result["labels"].shape == (15, 13, 3)
+    for i in range(0, 15, 4):
+        for j in range(0, 13, 3):
+            for k in range(3):
+                params = {
+                    "inventory_decay_rate": decay[k],
+                    "temperature_sensitivity": 0.0,
+                    "replenishment_gain": alpha[i],
+                    "replenishment_decay": beta[j],
+                }
+                expected = nonlinear_model.classify_equilibrium(params)
+                label = stability_map.LABELS[int(result["labels"][i, j, k])]
+                assert label == expected["type"]
+                assert bool(result["is_stable"][i, j, k]) == expected["is_stable"]
+
+
+def test_stability_map_region_fractions_sum_to_one():
+    result = stability_map.stability_map(np.linspace(-1, 2, 20), np.linspace(0.1, 2, 20), [0.05])
+    fractions = stability_map.region_fractions(result)
+    assert np.isclose(sum(fractions[name] for name in stability_map.LABELS.values()), 1.0)
+    assert fractions["saddle"] > 0.0
+
+
+def test_pade_first_order_coefficients():
+    num, den = linear_model.pade_polynomials(2.0, order=1)
+    assert np.allclose(num, [-1.0, 1.0])
+    assert np.allclose(den, [1.0, 1.0])
+
+
+def test_stability_sweep_matches_analyze_stability():
+    kp = np.array([0.2, 0.8, 1.5, 3.0])
+    delay = np.array([0.0, 0.5, 2.0])
+    sweep = control_analysis.stability_sweep(kp, delay)
+    assert sweep["poles"].shape == (4, 3, 2)
+    for i, gain in enumerate(kp):
+        for j, lead in enumerate(delay):
+            system = linear_model.InventoryControlSystem(kp=gain, delay=lead)
+            expected = system.analyze_stability()
+            poles = sweep["poles"][i, j]
+            poles = poles[~np.isnan(poles)]
+            assert bool(sweep["is_stable"][i, j]) == expected["is_stable"]
+            assert np.allclose(np.sort_complex(poles), np.sort_complex(expected["poles"]))
+
+
+def test_stability_margins_exact_delay():
+    margins = control_analysis.stability_margins(np.array([0.5, 1.0]), np.array([1.0, 0.0]))
+    assert np.allclose(margins["phase_margin_deg"], [90.0 - np.degrees(0.5), 90.0])
+    assert np.isclose(margins["gain_margin"][0], np.pi / 2.0 / 0.5)
+    assert np.isinf(margins["gain_margin"][1])
+
+
+def test_stability_sweep_paired_skus():
+    kp = np.array([0.5, 1.0, 2.0])
+    delay = np.array([1.0, 2.0, 0.5])
+    sweep = control_analysis.stability_sweep(kp, delay, grid=False, pade_order=3)
+    assert sweep["poles"].shape == (3, 4)
+    assert list(sweep["is_stable_exact"]) == [True, False, True]
+
+
+def test_discrete_step_response_matches_first_order_without_delay():
+    system = linear_model.InventoryControlSystem(kp=0.8, delay=0.0)
+    t, y = system.simulate_discrete_step_response(duration=5.0, dt=0.001)
+    assert np.max(np.abs(y - (1.0 - np.exp(-0.8 * t)))) < 1e-3
+
+
+def test_discrete_simulation_exact_delay_policies():
+    res = acs_simulation.simulate_discrete(1.0, 10.0, delay=3.0, n_steps=8, policy="order_up_to")
+    assert res["lead_steps"] == 3
+    assert np.allclose(res["inventory"][:4], 0.0)
+    assert np.allclose(res["inventory"][4:], 10.0)
+    assert res["orders"][0] == 10.0 and np.allclose(res["orders"][1:], 0.0)
+
+    demand = np.full(20, 2.0)
+    ss = acs_simulation.simulate_discrete(
+        1.0, 10.0, delay=1.0, n_steps=20, policy="s_S", demand=demand,
+        reorder_point=4.0, initial_inventory=10.0,
+    )
+    assert np.all(ss["orders"][ss["orders"] > 0] >= 6.0)
+    assert np.allclose(ss["inventory"][1:] - ss["inventory"][:-1], ss["arrivals"] - demand)
+
+
+def test_higher_pade_order_extends_denominator():
+    low = linear_model.InventoryControlSystem(kp=0.5, delay=2.0, pade_order=1)
+    high = linear_model.InventoryControlSystem(kp=0.5, delay=2.0, pade_order=4)
+    assert len(np.ravel(high._closed_loop_tf().den)) == len(np.ravel(low._closed_loop_tf().den)) + 3
+
+
+def test_simulate_batch_matches_single_runs():
+    rng = np.random.default_rng(3)
+    demand = rng.poisson(4.0, size=(200, 3)).astype(float)
+    kp = np.array([0.3, 0.6, 1.0])
+    delay = np.array([0.0, 2.0, 5.0])
+    batch = acs_simulation.simulate_batch(demand, kp, 30.0, delay, policy="order_up_to")
+    for j in range(3):
+        single = acs_simulation.simulate_discrete(
+            kp[j], 30.0, delay[j], 200, demand=demand[:, j], policy="order_up_to", initial_inventory=30.0
+        )
+        assert np.allclose(batch["inventory"][:, j], single["inventory"])
+
+
+def test_simulate_sales_panel_metrics():
+    import pandas as pd
+
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame(
+        {
+            "store_id": np.repeat([1, 2], [300, 240]),
+            "product_id": 7,
+            "sales": np.concatenate([rng.poisson(5.0, 300), np.full(240, 3.0)]),
+        }
+    )
+    out = acs_simulation.simulate_sales_panel(df, kp=0.5, delay=2.0, policy="order_up_to")
+    metrics = out["metrics"]
+    assert list(metrics["hours"]) == [300.0, 240.0]
+    # Order-up-to with constant demand passes demand through: no bullwhip, no stockouts.
+    assert np.isnan(metrics.loc[1, "bullwhip"]) or np.isclose(metrics.loc[1, "bullwhip"], 0.0)
+    assert metrics.loc[1, "stockout_hours"] == 0.0
+    assert 0.0 < metrics.loc[0, "fill_rate"] <= 1.0
+    low = acs_simulation.simulate_sales_panel(df, kp=0.5, delay=2.0, i_target=1.0)["metrics"]
+    assert (low["stockout_hours"] > metrics["stockout_hours"]).all()
+
+
+def test_demand_response_steady_state_offset():
+    system = linear_model.InventoryControlSystem(kp=0.5, i_target=20.0, delay=2.0)
+    out = system.simulate_demand_response(np.full(300, 2.0))
+    # P control with constant demand settles at I_target - D / Kp.
+    assert np.isclose(out["inventory"][-1, 0], 20.0 - 2.0 / 0.5)
+    assert out["stockout_hours"][0] == 0.0
+
+
+def test_state_space_matches_transfer_functions():
+    from scipy.signal import lsim
+
+    system = linear_model.InventoryControlSystem(kp=0.7, i_target=2.0, delay=1.5, pade_order=3)
+    t = np.linspace(0.0, 20.0, 401)
+    demand = np.where(t > 5.0, 1.0, 0.0)
+    _, y = system.simulate_state_space(t[1] - t[0], demand=demand[:-1])
+    _, y_ref, _ = lsim(system.transfer_function_reference(), np.full_like(t, 2.0), t, interp=False)
+    _, y_dist, _ = lsim(system.transfer_function_disturbance(), demand, t, interp=False)
+    assert np.allclose(y, y_ref + y_dist, atol=1e-6)
+
+
+def test_discretization_is_cached_and_read_only():
+    linear_model.discretize_closed_loop.cache_clear()
+    first = linear_model.InventoryControlSystem(kp=0.4, delay=2.0).discretize(0.5)
+    second = linear_model.InventoryControlSystem(kp=0.4, delay=2.0).discretize(0.5)
+    assert first[0] is second[0]
+    assert linear_model.discretize_closed_loop.cache_info().hits == 1
+    assert not first[0].flags.writeable
+
+
+def test_pi_state_space_matches_transfer_function():
+    from scipy.signal import lsim
+
+    system = linear_model.InventoryControlSystem(kp=0.5, i_target=1.0, delay=1.0, pade_order=2, ki=0.05)
+    t = np.linspace(0.0, 60.0, 601)
+    _, y = system.simulate_state_space(t[1] - t[0], n_steps=600)
+    _, y_ref, _ = lsim(system.transfer_function_reference(), np.ones_like(t), t, interp=False)
+    assert np.allclose(y, y_ref, atol=1e-6)
+    assert system.analyze_stability()["is_stable"]
+    assert len(system.analyze_stability()["poles"]) == 4
+
+
+def test_autotune_pi_removes_demand_offset():
+    rng = np.random.default_rng(0)
+    demand = rng.poisson(5.0, 400).astype(float)
+    p = controller_tuning.autotune(2.0, i_target=25.0, demand=demand, mode="p")
+    pi = controller_tuning.autotune(2.0, i_target=25.0, demand=demand, mode="pi")
+    assert pi["ki"] > 0.0
+    assert pi["cost"] < p["cost"]
+    scores = controller_tuning.evaluate_candidates(
+        np.array([pi["kp"], 5.0]), np.array([pi["ki"], 0.0]), np.zeros(2), 2.0, 25.0, demand
+    )
+    assert np.isclose(scores["cost"][0], pi["cost"])
+    assert scores["cost"][1] > 1e3 * scores["cost"][0]
+
+
+def test_tune_panel_process_pool():
+    import pandas as pd
+
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame(
+        {
+            "store_id": np.repeat([1, 2, 3], 200),
+            "product_id": 4,
+            "sales": rng.poisson(3.0, 600),
+        }
+    )
+    serial = controller_tuning.tune_panel(df, delay=1.0, points=7, refine=1)
+    pooled = controller_tuning.tune_panel(df, delay=1.0, points=7, refine=1, n_jobs=2)
+    assert list(serial["store_id"]) == [1, 2, 3]
+    assert serial["success"].all()
+    assert np.allclose(serial["kp"], pooled["kp"])
+
+
+def test_frequency_response_margins_match_closed_forms():
+    system = linear_model.InventoryControlSystem(kp=0.5, delay=1.0)
+    response = system.frequency_response()
+    exact = control_analysis.stability_margins(0.5, 1.0)
+    assert np.isclose(response["gain_crossover"], exact["gain_crossover"], rtol=1e-4)
+    assert np.isclose(response["phase_crossover"], exact["phase_crossover"], rtol=1e-4)
+    assert np.isclose(response["phase_margin_deg"], exact["phase_margin_deg"], atol=1e-2)
+    assert np.isclose(response["gain_margin"], exact["gain_margin"], rtol=1e-4)
+    assert linear_model.frequency_grid() is response["w"]
+
+
+def test_polyval_horner_batched_matches_polyval():
+    coeffs = np.array([[1.0, -2.0, 3.0], [0.0, 4.0, 1.0]])
+    x = 1j * np.logspace(-2, 2, 7)
+    values = linear_model.polyval_horner(coeffs, x)
+    assert values.shape == (2, 7)
+    assert np.allclose(values[0], np.polyval(coeffs[0], x))
+    assert np.allclose(values[1], np.polyval(coeffs[1], x))
+    pade = linear_model.InventoryControlSystem(kp=0.5, delay=1.0, pade_order=4).frequency_response(exact_delay=False)
+    assert np.isclose(pade["phase_crossover"], np.pi / 2.0, rtol=1e-2)
+
+
+def test_phase_trajectories_match_odeint_and_field():
+    params = {
+        "inventory_decay_rate": 0.05,
+        "demand": 2.0,
+        "replenishment_gain": 0.4,
+        "replenishment_decay": 0.3,
+        "i_target": 20.0,
+    }
+    t = np.linspace(0.0, 30.0, 301)
+    starts = np.array([[0.0, 0.0], [30.0, 5.0], [10.0, -3.0]])
+    traj = nonlinear_model.phase_trajectories(starts, t, params)
+    assert traj.shape == (len(t), 3, 2)
+    for k, y0 in enumerate(starts):
+        ref = nonlinear_model.integrate_inventory_system(y0, t, params)
+        assert np.allclose(traj[:, k], ref, atol=1e-5)
+
+    ii, rr = np.meshgrid(np.linspace(0, 30, 4), np.linspace(-5, 5, 3))
+    d_i, d_r = nonlinear_model.vector_field(params, ii, rr)
+    ref = nonlinear_model.inventory_replenishment_ode([ii[1, 2], rr[1, 2]], 0.0, params)
+    assert np.allclose([d_i[1, 2], d_r[1, 2]], ref)
+
+
+def test_quiver_geometry_matches_figure_factory():
+    import plotly.figure_factory as ff
+
+    from src import visualization
+
+    rng = np.random.default_rng(0)
+    x, y, u, v = rng.normal(size=(4, 40))
+    reference = ff.create_quiver(x, y, u, v, scale=0.25, arrow_scale=0.3).data[0]
+    xs, ys = visualization._quiver_xy(x, y, u, v, scale=0.25, arrow_scale=0.3)
+    as_float = lambda seq: np.array([np.nan if s is None else s for s in seq], dtype=float)
+    assert np.allclose(xs, as_float(reference.x), equal_nan=True)
+    assert np.allclose(ys, as_float(reference.y), equal_nan=True)
+
+    fig = visualization.plot_phase_portrait_with_nullclines(
+        {"demand": 1.0, "i_target": 10.0},
+        i_range=(0.0, 20.0),
+        r_range=(-5.0, 5.0),
+        grid_size=100,
+        trajectory_grid=4,
+    )
+    assert len(fig.data[0].x) == 7 * 100 * 100
+    assert fig.data[-1].x.shape == (17,)
@@ -0,0 +1,207 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src import pipeline
+
+
+def _daily_frame(days: int = 70) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    rows = []
+    for product, scale in (("p1", 8.0), ("p2", 2.0)):
+        for day in pd.date_range("2024-01-01", periods=days, freq="D"):
+            rows.append(
+                {
+                    "store_id": "s1",
+                    "product_id": product,
+                    "dt": day.strftime("%Y-%m-%d"),
+                    "hours_sale": list(rng.poisson(scale, 24).astype(float)),
+                    "hours_stock_status": [1] * 22 + [0] * 2,
+                    "discount": 0.1,
+                    "avg_temperature": 20.0,
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+def _config(tmp_path):
+    return {
+        "ode": {"demand": 10.0, "i_target": 100.0},
+        "linear_model": {"integrator_gain": 0.5, "delay": 1.0},
+        "chaos": {"hurst_window": 1024},
+        "pipeline": {
+            "cache_dir": str(tmp_path / "cache"),
+            "metrics_cache_dir": str(tmp_path / "metrics"),
+            "golden_sample_path": str(tmp_path / "golden.parquet"),
+            "report_path": str(tmp_path / "report.html"),
+            "summary_path": str(tmp_path / "summary.json"),
+        },
+    }
+
+
+def test_pipeline_caches_stages_by_content(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_load(repo, split="train"):
+        calls.append(repo)
+        return _daily_frame()
+
+    monkeypatch.setattr("src.data_loader.load_full_dataset", fake_load)
+    config = _config(tmp_path)
+
+    first = pipeline.run_pipeline(config, log=lambda msg: None)
+    assert all(state != "cached" for state in first["status"].values())
+    assert first["outputs"]["select"] == {"store_id": "s1", "product_id": "p1"}
+    assert (tmp_path / "report.html").exists()
+    assert (tmp_path / "golden.parquet").exists()
+    assert set(pipeline.pipeline_status(config).values()) == {"cached"}
+
+    second = pipeline.run_pipeline(config, log=lambda msg: None)
+    assert set(second["status"].values()) == {"cached"}
+    assert calls == ["Dingdong-Inc/FreshRetailNet-50K"]
+    # Cache hits are resolved from digests: only the target output is read.
+    assert list(second["outputs"]) == ["report"]
+
+    # chaos settings the bundle does not use leave the stage cached; per-metric
+    # sections are passed to the bundle and change its result.
+    config["chaos"] = {"hurst_window": 512}
+    assert set(pipeline.run_pipeline(config, log=lambda msg: None)["status"].values()) == {"cached"}
+    config["chaos"]["hurst"] = {"num_scales": 10}
+    third = pipeline.run_pipeline(config, targets=["metrics"], log=lambda msg: None)
+    assert third["status"]["metrics"] != "cached"
+    assert len(third["outputs"]["metrics"]["hurst"]["scales_log"]) <= 10
+    assert third["digests"]["metrics"] != second["digests"]["metrics"]
+    assert sorted(third["outputs"]) == ["explode", "metrics", "preprocess"]
+
+    config["pipeline"]["start_hour"] = 10
+    fourth = pipeline.run_pipeline(config, targets=["preprocess"], log=lambda msg: None)
+    assert list(fourth["status"]) == ["load", "select", "explode", "preprocess"]
+    assert fourth["status"]["preprocess"] != "cached"
+    assert fourth["outputs"]["preprocess"]["hour_index"].min() == 10
+
+    # The report's phase portrait uses the config's ODE section, not config/params.yaml.
+    from src import report_generator
+
+    seen = []
+    original = report_generator.phase_nl_figure
+    monkeypatch.setattr(report_generator, "phase_nl_figure", lambda ode=None: seen.append(ode) or original(ode))
+    config["ode"] = {"demand": 12.0, "i_target": 80.0}
+    fifth = pipeline.run_pipeline(config, log=lambda msg: None)
+    assert fifth["status"]["report"] != "cached"
+    assert seen == [config["ode"]]
+
+
+def test_figure_exporter_batches_and_skips_unchanged(tmp_path, monkeypatch):
+    import plotly.graph_objects as go
+
+    from src import figure_export
+
+    batches = []
+
+    def fake_batch(figs, paths, scales):
+        batches.append([p.name for p in paths])
+        for path in paths:
+            path.write_bytes(b"png")
+
+    monkeypatch.setattr(figure_export, "_write_plotly_batch", fake_batch)
+
+    def run(y):
+        exporter = figure_export.FigureExporter(tmp_path)
+        exporter.add("a", go.Figure(go.Scatter(y=[1, 2, 3])))
+        exporter.add("b", go.Figure(go.Scatter(y=y)), formats=("png", "svg"))
+        return exporter.export()
+
+    assert set(run([3, 2, 1]).values()) == {"exported"}
+    assert batches == [["a.png", "b.png", "b.svg"]]
+    assert set(run([3, 2, 1]).values()) == {"skipped"}
+    assert len(batches) == 1
+
+    status = run([3, 2, 0])
+    assert status == {"a.png": "skipped", "b.png": "exported", "b.svg": "exported"}
+    assert batches[-1] == ["b.png", "b.svg"]
+
+    (tmp_path / "a.png").unlink()
+    assert run([3, 2, 0])["a.png"] == "exported"
+
+
+def test_convert_svg_falls_back_to_cairosvg_when_rsvg_fails(tmp_path, monkeypatch):
+    import subprocess
+    import sys
+    import types
+
+    from src import figure_export
+
+    def failing_run(cmd, **kwargs):
+        raise subprocess.CalledProcessError(1, cmd, stderr=b"unsupported feature")
+
+    calls = []
+    fake = types.SimpleNamespace(
+        svg2pdf=lambda url, write_to: calls.append(("pdf", write_to)),
+        svg2png=lambda url, write_to, dpi: calls.append(("png", write_to)),
+    )
+    monkeypatch.setattr(figure_export.subprocess, "run", failing_run)
+    monkeypatch.setitem(sys.modules, "cairosvg", fake)
+    svg = tmp_path / "diagram.svg"
+    svg.write_text("<svg xmlns='http://www.w3.org/2000/svg'/>")
+    figure_export.convert_svg(svg, tmp_path / "diagram.png", "png")
+    assert calls == [("png", str(tmp_path / "diagram.png"))]
+
+
+def test_benchmarks_record_history_and_flag_regressions(tmp_path):
+    from src import benchmark_cases, benchmarks
+
+    panel = benchmark_cases.synthetic_daily_panel(3, n_days=70)
+    assert len(panel) == 210 and len(panel["hours_sale"].iloc[0]) == 24
+
+    history = tmp_path / "history.jsonl"
+    baseline = tmp_path / "baseline.json"
+    names = ["integrate_inventory_system", "find_golden_sample_vectorized"]
+    records = benchmarks.run_benchmarks(["sku"], names, repeat=1, history_path=history)
+    assert [r["benchmark"] for r in records] == names
+    assert all(r["median_s"] > 0 and r["peak_mb"] > 0 for r in records)
+    benchmarks.save_baseline(records, baseline)
+
+    latest = benchmarks.latest_records(benchmarks.load_history(history))
+    assert not benchmarks.compare(latest, baseline)["regression"].any()
+
+    stored = json.loads(baseline.read_text())
+    stored["find_golden_sample_vectorized@sku"]["median_s"] = latest[0]["median_s"] / 10
+    stored["find_golden_sample_vectorized@sku"]["peak_mb"] = latest[0]["peak_mb"] / 10
+    baseline.write_text(json.dumps(stored))
+    result = benchmarks.compare(latest, baseline).set_index("benchmark")
+    assert result.loc["find_golden_sample_vectorized", "regression"]
+    assert not result.loc["integrate_inventory_system", "regression"]
+
+
+def test_traced_pipeline_records_nested_stage_spans(tmp_path, monkeypatch):
+    from src import chaos_metrics, instrumentation
+
+    monkeypatch.setattr("src.data_loader.load_full_dataset", lambda repo, split="train": _daily_frame())
+    config = _config(tmp_path)
+    trace_path = tmp_path / "trace" / "trace.json"
+    with instrumentation.tracing(trace_path, profile="cprofile", profile_stages=["pipeline.metrics"]):
+        pipeline.run_pipeline(config, targets=["metrics"], log=lambda msg: None)
+
+    spans = json.loads(trace_path.read_text())["spans"]
+    by_name = {s["name"]: s for s in spans}
+    assert [s["name"] for s in spans if s["depth"] == 0] == [
+        "pipeline.load",
+        "pipeline.select",
+        "pipeline.explode",
+        "pipeline.preprocess",
+        "pipeline.metrics",
+    ]
+    explode = by_name["data_loader.explode_sku"]
+    assert spans[explode["parent"]]["name"] == "pipeline.explode"
+    assert explode["rows_in"] == 140 and explode["rows_out"] == 70 * 24
+    assert by_name["pipeline.preprocess"]["rows_out"] == by_name["preprocessing.filter_daytime_hours"]["rows_out"]
+    assert by_name["pipeline.load"]["meta"]["cached"] is False
+    assert all(s["wall_s"] >= 0 and s["cpu_s"] >= 0 and s["peak_rss_mb"] > 0 for s in spans)
+    assert Path(by_name["pipeline.metrics"]["profile"]).exists()
+    assert by_name["pipeline.load"]["profile"] is None
+    assert instrumentation.summarize(trace_path)[0]["wall_s"] >= by_name["pipeline.metrics"]["wall_s"] - 1e-9
+
+    # Outside a trace the decorated functions run untraced.
+    assert chaos_metrics.hurst_rs_details(np.random.default_rng(0).normal(size=256))["valid"]